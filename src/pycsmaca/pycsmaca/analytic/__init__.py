@@ -1,2 +1,3 @@
 from . import bianchi
-from .bianchi import bianchi_time
+from .bianchi import bianchi_time, get_bianchi_grid, \
+    solve_bianchi_model_parameters
@@ -3,7 +3,6 @@ from collections import namedtuple
 import numpy as np
 from scipy.optimize import fsolve
 
-from pyqumo.distributions import SemiMarkovAbsorb, LinComb, Constant, VarChoice
 from pycsmaca.utilities import SPEED_OF_LIGHT
 
 
@@ -34,6 +33,118 @@ def get_bianchi_model_parameters(num_clients, cwmin, cwmax):
     )
 
 
+BIANCHI_PARAMS_DTYPE = np.dtype([
+    ('n', int), ('W', int), ('m', int), ('p', float), ('tau', float),
+])
+
+BIANCHI_GRID_DTYPE = np.dtype(BIANCHI_PARAMS_DTYPE.descr + [
+    ('t_empty', float), ('t_data', float), ('t_collided', float),
+    ('p_collision', float), ('throughput', float),
+])
+
+
+def _get_bianchi_tau(p, cwmin, num_stages, max_stages):
+    # Sum of (2p)^i for i < m is computed term by term, since the closed
+    # form (1 - (2p)^m) / (1 - 2p) is unstable near p = 1/2:
+    total = np.zeros_like(p)
+    term = np.ones_like(p)
+    for i in range(max_stages):
+        total += np.where(i < num_stages, term, 0)
+        term = term * 2 * p
+    return 2 / (1 + cwmin + p * cwmin * total)
+
+
+def solve_bianchi_model_parameters(num_clients, cwmin, cwmax, tol=1e-12):
+    """Solve Bianchi model fixed point for arrays of parameters at once.
+
+    Arguments are broadcast against each other. Collision probability `p`
+    is found with vectorized bisection on `[0, 1]`, where the residual
+    `p - 1 + (1 - tau(p)) ** (n - 1)` is increasing, so the solution is
+    unique. Unlike `get_bianchi_model_parameters()`, values are not rounded.
+
+    Returns
+    -------
+    params : structured array of `BIANCHI_PARAMS_DTYPE`
+        fields `n`, `W`, `m`, `p` and `tau`, like the fields of
+        `get_bianchi_model_parameters()` result.
+    """
+    num_clients, cwmin, cwmax = np.broadcast_arrays(
+        np.asarray(num_clients), np.asarray(cwmin), np.asarray(cwmax))
+    if np.any(num_clients < 1) or np.any(cwmin < 1) or np.any(cwmax < cwmin):
+        raise ValueError('expected n >= 1 and 1 <= cwmin <= cwmax')
+    num_stages = np.log2(cwmax / cwmin)
+    if np.any(np.abs(num_stages - np.round(num_stages)) > 0):
+        raise ValueError('cwmax / cwmin must be a power of 2')
+    num_stages = np.round(num_stages).astype(int)
+    max_stages = int(num_stages.max(initial=0))
+
+    lo = np.zeros(num_clients.shape)
+    hi = np.ones(num_clients.shape)
+    while np.any(hi - lo > tol):
+        p = (lo + hi) / 2
+        tau = _get_bianchi_tau(p, cwmin, num_stages, max_stages)
+        positive = p - 1 + (1 - tau) ** (num_clients - 1) > 0
+        hi = np.where(positive, p, hi)
+        lo = np.where(positive, lo, p)
+    p = (lo + hi) / 2
+
+    result = np.empty(num_clients.shape, dtype=BIANCHI_PARAMS_DTYPE)
+    result['n'] = num_clients
+    result['W'] = cwmin
+    result['m'] = num_stages
+    result['p'] = p
+    result['tau'] = _get_bianchi_tau(p, cwmin, num_stages, max_stages)
+    return result
+
+
+def get_bianchi_grid(num_clients, cwmin, cwmax, payload, ack, machdr, phyhdr,
+                     preamble, bitrate, difs, sifs, slot, distance=100,
+                     c=SPEED_OF_LIGHT):
+    """Solve Bianchi model and compute slot times for arrays of parameters.
+
+    All arguments are broadcast against each other, `payload` is the mean
+    payload size. Slot times are the means of `get_bianchi_slot_times()`
+    distributions, collision probability and throughput are the same as
+    `get_bianchi_collision_probability()` and `get_bianchi_throughput()`.
+
+    Returns
+    -------
+    grid : structured array of `BIANCHI_GRID_DTYPE`
+        fields of `solve_bianchi_model_parameters()` result and `t_empty`,
+        `t_data`, `t_collided`, `p_collision` and `throughput`.
+    """
+    params = solve_bianchi_model_parameters(num_clients, cwmin, cwmax)
+    (payload, ack, machdr, phyhdr, preamble, bitrate, difs, sifs, slot,
+     distance, c) = np.broadcast_arrays(*map(np.asarray, (
+        payload, ack, machdr, phyhdr, preamble, bitrate, difs, sifs, slot,
+        distance, c)))
+    shape = np.broadcast_shapes(params.shape, payload.shape)
+
+    propagation = distance / c
+    t_data_ctrl = preamble + (machdr + phyhdr) / bitrate
+    t_ack = preamble + (phyhdr + ack) / bitrate
+    t_tail = difs + sifs + t_data_ctrl + t_ack + payload / bitrate
+    t_data = t_tail + 2 * propagation
+    t_collided = t_tail + 6 * propagation
+
+    n, tau = params['n'], params['tau']
+    p_tr = 1 - (1 - tau) ** n
+    p_succ = n * tau * (1 - tau) ** (n - 1)     # equals p_tr * p_s
+    p_collision = p_tr - p_succ
+    throughput = p_succ * payload / (
+        (1 - p_tr) * slot + p_succ * t_data + p_collision * t_collided)
+
+    grid = np.empty(shape, dtype=BIANCHI_GRID_DTYPE)
+    for name in BIANCHI_PARAMS_DTYPE.names:
+        grid[name] = params[name]
+    grid['t_empty'] = slot
+    grid['t_data'] = t_data
+    grid['t_collided'] = t_collided
+    grid['p_collision'] = p_collision
+    grid['throughput'] = throughput
+    return grid
+
+
 def get_bianchi_chain_state_index(stage, backoff, cwmin):
     # On each stage:
     # - states 1, ..., Wi-1: backoff slots
@@ -43,6 +154,9 @@ def get_bianchi_chain_state_index(stage, backoff, cwmin):
 
 def get_bianchi_slot_times(payload, ack, machdr, phyhdr, preamble, bitrate,
                            difs, sifs, slot, distance=100, c=SPEED_OF_LIGHT):
+    # Legacy pyqumo API is imported here, so the solver and grid functions
+    # of this module are available without it:
+    from pyqumo.distributions import LinComb, Constant
     propagation = distance / c
     t_data_ctrl = preamble + (machdr + phyhdr) / bitrate
     t_ack = preamble + (phyhdr + ack) / bitrate
@@ -127,6 +241,7 @@ def bianchi_time(
         num_clients, payload_size, ack_size, mac_header_size, phy_header_size,
         preamble, bitrate, difs, sifs, slot, cwmin, cwmax, distance=100,
         c=SPEED_OF_LIGHT):
+    from pyqumo.distributions import SemiMarkovAbsorb, Constant, VarChoice
     #
     # 1) Estimate Bianchi model parameters:
     #
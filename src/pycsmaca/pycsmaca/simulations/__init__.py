@@ -1,4 +1,6 @@
-from .wired_networks import WiredLineNetwork
+from .wired_networks import WiredLineNetwork, WiredTopologyNetwork
 from .wireless_networks import WirelessHalfDuplexLineNetwork, \
-    CollisionDomainNetwork, CollisionDomainSaturatedNetwork
+    CollisionDomainNetwork, CollisionDomainSaturatedNetwork, \
+    WirelessTopologyNetwork
+from .topology import Topology
 from pycsmaca.simulations.modules.station import Station
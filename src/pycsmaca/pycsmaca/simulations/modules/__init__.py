@@ -1,5 +1,6 @@
 from .app_layer import RandomSource, Sink, AppData
-from .network_layer import NetworkPacket, NetworkSwitch, NetworkService
+from .network_layer import NetworkPacket, NetworkSwitch, NetworkService, \
+    SwitchTable, RoutingTables
 from .queues import Queue, SaturatedQueue
 from .wired_interface import WireFrame, WiredInterface, WiredTransceiver
 from .radio import Radio, AirFrame, ConnectionManager
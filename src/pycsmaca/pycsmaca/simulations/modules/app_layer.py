@@ -1,9 +1,22 @@
-from pydesim import Model, Intervals, Statistic
+from pydesim import (Model, Intervals, Statistic, RandomBuffer,
+                     register_global_seeder)
+from pyqumo.cqumo.randoms import RandomsFactory
+from pyqumo.random import Distribution, default_randoms_factory
 
 from pycsmaca.utilities import ReadOnlyDict
 
 
+@register_global_seeder
+def seed_default_randoms(seed):
+    """Seed the default pyqumo engine, shared by distributions created
+    without a factory, with a value derived from the run seed.
+    """
+    default_randoms_factory.seed(seed)
+
+
 class AppData:
+    __slots__ = ('__dest_addr', '__size', '__source_id', '__created_at')
+
     def __init__(self, dest_addr=0, size=0, source_id=0, created_at=0):
         self.__dest_addr = dest_addr
         self.__size = size
@@ -34,30 +47,66 @@ class AppData:
         return f'AppData{{{fields}}}'
 
 
+def _eval_many(distribution, size):
+    # Compiled pyqumo variables do not accept `size` as a keyword argument.
+    return distribution.rnd.eval_many(size)
+
+
+class _DistributionSampler:
+    """Iterator over samples of pyqumo distribution drawn in blocks.
+
+    By default, pyqumo variables share the engine of the default factory,
+    which is seeded with the clock. Here the distribution is bound to its
+    own `RandomsFactory` seeded from the `module` random stream, so samples
+    are reproduced with the simulator seed. The factory is created on the
+    first call, since the module stream can not be used in constructors.
+    """
+    def __init__(self, module, distribution, block_size):
+        self.__module = module
+        self.__distribution = distribution
+        self.__block_size = block_size
+        self.__buffer = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.__buffer is None:
+            seed = int(self.__module.rng.integers(1 << 32))
+            distribution = self.__distribution.with_factory(
+                RandomsFactory(seed))
+            self.__buffer = RandomBuffer(
+                _eval_many, distribution, size=self.__block_size)
+        return self.__buffer()
+
+
 class _SourceBase(Model):
-    def __init__(self, sim, data_size, source_id, dest_addr):
+    def __init__(self, sim, data_size, source_id, dest_addr, block_size=None):
         """Constructor.
 
         :param sim: `pydesim.Simulator` object;
-        :param data_size: callable without arguments, iterable or constant;
-            represents application data size distribution;
+        :param data_size: pyqumo `Distribution`, callable without arguments,
+            iterable or constant; represents application data size
+            distribution;
         :param source_id: this source ID (more like IP address, not MAC)
-        :param dest_addr: destination MAC address.
+        :param dest_addr: destination MAC address;
+        :param block_size: number of samples drawn at once from pyqumo
+            distributions (by default, `sim.params.source_block_size`
+            or 1024).
         """
         super().__init__(sim)
         self.__data_size = data_size
         self.__source_id = source_id
         self.__dest_addr = dest_addr
+        self.__block_size = block_size
 
         # Attempt to build iterators for data size and intervals:
-        try:
-            self.__data_size_iter = iter(self.__data_size)
-        except TypeError:
-            self.__data_size_iter = None
+        self.__data_size_iter = self._get_sampler(data_size)
 
         # Statistics:
-        self.__arrival_intervals = Intervals()
-        self.__data_size_stat = Statistic()
+        keep_samples = sim.params.get('keep_samples', True)
+        self.__arrival_intervals = Intervals(keep_samples=keep_samples)
+        self.__data_size_stat = Statistic(keep_samples=keep_samples)
         self.__num_packets_sent = 0
 
     @property
@@ -84,6 +133,30 @@ class _SourceBase(Model):
     def num_packets_sent(self):
         return self.__num_packets_sent
 
+    @property
+    def block_size(self):
+        if self.__block_size is None:
+            self.__block_size = self.sim.params.get(
+                'source_block_size', RandomBuffer.SIZE)
+        return self.__block_size
+
+    def _get_sampler(self, value):
+        """Get iterator over the values of pyqumo distribution or iterable,
+        or `None` for callables and constants.
+
+        Distributions are sampled in blocks of `block_size` with a single
+        `rnd.eval_many()` call. The random variable of the distribution
+        keeps its state between calls, so MAP and other correlated
+        processes continue from the previous block. Each distribution gets
+        a random engine seeded from `rng`, see `_DistributionSampler`.
+        """
+        if isinstance(value, Distribution):
+            return _DistributionSampler(self, value, self.block_size)
+        try:
+            return iter(value)
+        except TypeError:
+            return None
+
     def _generate(self):
         try:
             data_size = self.__get_next_size()
@@ -99,11 +172,11 @@ class _SourceBase(Model):
             self.arrival_intervals.record(self.sim.stime)
             self.data_size_stat.append(data_size)
             self.__num_packets_sent += 1
-            self.sim.logger.debug(f'generated new packet {app_data}', src=self)
+            self.sim.logger.debug('generated new packet %s', app_data, src=self)
             return True
 
     def __get_next_size(self):
-        if self.__data_size_iter:
+        if self.__data_size_iter is not None:
             return next(self.__data_size_iter)
         try:
             return self.data_size()
@@ -123,7 +196,9 @@ class RandomSource(_SourceBase):
     and this distribution is independent from data size distribution.
 
     Note: distributions are passed to the constructor as callable objects,
-    but they also can be specified with constants.
+    but they also can be specified with constants. pyqumo distributions
+    and random processes (e.g. `MarkovArrival`) are sampled in blocks,
+    see `block_size` constructor argument.
 
     Source directs its packets to network layer. Packets have a given
     destination address. Source is specified with its SourceID.
@@ -139,28 +214,32 @@ class RandomSource(_SourceBase):
     - 'network': connected network layer module; should implement
         `handle_message(app_data)` method.
     """
-    def __init__(self, sim, data_size, interval, source_id, dest_addr):
+    def __init__(self, sim, data_size, interval, source_id, dest_addr,
+                 block_size=None):
         """Create `RandomSource` module.
 
         :param sim: `pydesim.Simulator` object;
-        :param data_size: callable without arguments, iterable or constant;
-            represents application data size distribution;
-        :param interval: callable without arguments, iterable or constant;
-            represents inter-arrival intervals distribution;
+        :param data_size: pyqumo `Distribution`, callable without arguments,
+            iterable or constant; represents application data size
+            distribution;
+        :param interval: pyqumo `Distribution` or `RandomProcess`, callable
+            without arguments, iterable or constant; represents
+            inter-arrival intervals distribution;
         :param source_id: this source ID (more like IP address, not MAC)
-        :param dest_addr: destination MAC address.
+        :param dest_addr: destination MAC address;
+        :param block_size: number of samples drawn at once from pyqumo
+            distributions (by default, `sim.params.source_block_size`
+            or 1024).
         """
-        super().__init__(sim, data_size, source_id, dest_addr)
+        super().__init__(sim, data_size, source_id, dest_addr, block_size)
         self.__interval = interval
 
         # Attempt to build iterators for data size and intervals:
-        try:
-            self.__interval_iter = iter(self.__interval)
-        except TypeError:
-            self.__interval_iter = None
+        self.__interval_iter = self._get_sampler(interval)
 
-        # Initialize:
-        self._schedule_next_arrival()
+        # Initialize (the first interval is drawn when the module is
+        # already in the model tree, so `rng` can be used):
+        sim.schedule(0, self._schedule_next_arrival)
 
     @property
     def interval(self):
@@ -207,16 +286,20 @@ class ControlledSource(_SourceBase):
     - 'network': connected network layer module; should implement
         `handle_message(app_data)` method.
     """
-    def __init__(self, sim, data_size, source_id, dest_addr):
+    def __init__(self, sim, data_size, source_id, dest_addr, block_size=None):
         """Create `ControlledSource` module.
 
         :param sim: `pydesim.Simulator` object;
-        :param data_size: callable without arguments, iterable or constant;
-            represents application data size distribution;
+        :param data_size: pyqumo `Distribution`, callable without arguments,
+            iterable or constant; represents application data size
+            distribution;
         :param source_id: this source ID (more like IP address, not MAC)
-        :param dest_addr: destination MAC address.
+        :param dest_addr: destination MAC address;
+        :param block_size: number of samples drawn at once from pyqumo
+            distributions (by default, `sim.params.source_block_size`
+            or 1024).
         """
-        super().__init__(sim, data_size, source_id, dest_addr)
+        super().__init__(sim, data_size, source_id, dest_addr, block_size)
 
     def get_next(self):
         self._generate()
@@ -247,8 +330,9 @@ class Sink(Model):
         super().__init__(sim)
         self.__source_delays_data = {}
         self.__source_delays = ReadOnlyDict(self.__source_delays_data)
-        self.__arrival_intervals = Intervals()
-        self.__data_size_stat = Statistic()
+        self.__keep_samples = sim.params.get('keep_samples', True)
+        self.__arrival_intervals = Intervals(keep_samples=self.__keep_samples)
+        self.__data_size_stat = Statistic(keep_samples=self.__keep_samples)
         self.__num_packets_received = 0
 
     @property
@@ -270,12 +354,13 @@ class Sink(Model):
     def handle_message(self, app_data, sender=None, connection=None):
         sid = app_data.source_id
         if sid not in self.source_delays:
-            self.__source_delays_data[sid] = Statistic()
+            self.__source_delays_data[sid] = Statistic(
+                keep_samples=self.__keep_samples)
         self.source_delays[sid].append(self.sim.stime - app_data.created_at)
         self.arrival_intervals.record(self.sim.stime)
         self.data_size_stat.append(app_data.size)
         self.__num_packets_received += 1
-        self.sim.logger.debug(f'received {app_data}', src=self)
+        self.sim.logger.debug('received %s', app_data, src=self)
 
     def __str__(self):
         prefix = f'{self.parent}.' if self.parent else ''
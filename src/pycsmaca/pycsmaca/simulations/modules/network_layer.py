@@ -1,3 +1,4 @@
+import numpy as np
 from pydesim import Model
 
 from pycsmaca.utilities import ReadOnlyDict
@@ -26,8 +27,14 @@ class NetworkPacket:
     it ignores the message (see `NetworkSwitch` for details).
 
     `NetworkPacket` can also handle a payload (`data`), which is expected
-    to be `AppData`.
+    to be `AppData`. Packet size is the payload size, it is computed when
+    `data` is assigned.
     """
+    __slots__ = (
+        'destination_address', 'originator_address', 'sender_address',
+        'receiver_address', 'osn', '__data', '__size',
+    )
+
     def __init__(
             self, destination_address=None, originator_address=None,
             receiver_address=None, sender_address=None, osn=None, data=None):
@@ -38,9 +45,18 @@ class NetworkPacket:
         self.osn = osn
         self.data = data
 
+    @property
+    def data(self):
+        return self.__data
+
+    @data.setter
+    def data(self, data):
+        self.__data = data
+        self.__size = data.size if data else 0
+
     @property
     def size(self):
-        return self.data.size if self.data else 0
+        return self.__size
 
     def __str__(self):
         fields = []
@@ -98,6 +114,93 @@ class NetworkService(Model):
         return f'{prefix}NetworkService'
 
 
+class RoutingTables:
+    """Routes of all network switches stored in flat arrays.
+
+    Routes are stored for a set of destination stations only (e.g., servers
+    of the network). Each destination station gets a column in two arrays
+    of shape `(num_switches, num_destinations)`:
+
+    - `ports[i, j]`: index of the interface the switch `i` forwards packets
+        to the destination `j` through, or -1 if there is no route;
+    - `next_hops[i, j]`: address of the next hop interface.
+
+    All interface addresses of the destination station are mapped to its
+    column with `address_columns` dict. Interface with index `k` is expected
+    to be connected to the switch via `f'{connection_prefix}{k}'` connection,
+    as in `Station`.
+
+    A single `RoutingTables` object is shared by `SwitchTable` objects of all
+    switches, each of them reads its own row (see `SwitchTable`).
+    """
+    def __init__(self, address_columns, ports, next_hops,
+                 connection_prefix='if'):
+        ports = np.asarray(ports)
+        next_hops = np.asarray(next_hops)
+        if ports.ndim != 2 or ports.shape != next_hops.shape:
+            raise ValueError(f'ports and next hops must be 2-D arrays of the '
+                             f'same shape, {ports.shape} and '
+                             f'{next_hops.shape} found')
+        self.__columns = dict(address_columns)
+        self.__ports = ports
+        self.__next_hops = next_hops
+        max_port = int(ports.max()) if ports.size > 0 else -1
+        self.__connections = tuple(
+            f'{connection_prefix}{i}' for i in range(max_port + 1))
+
+    @property
+    def num_switches(self):
+        return self.__ports.shape[0]
+
+    @property
+    def num_destinations(self):
+        return self.__ports.shape[1]
+
+    @property
+    def address_columns(self):
+        return ReadOnlyDict(self.__columns)
+
+    @property
+    def ports(self):
+        return self.__ports
+
+    @property
+    def next_hops(self):
+        return self.__next_hops
+
+    def get(self, index, dst):
+        """Get route `(connection, next_hop)` of the switch `index` to
+        the destination address `dst`, or `None` if the route is unknown.
+        """
+        column = self.__columns.get(dst)
+        if column is None:
+            return None
+        port = self.__ports[index, column]
+        if port < 0:
+            return None
+        return self.__connections[port], int(self.__next_hops[index, column])
+
+    def find_connection(self, index, next_hop):
+        """Get connection of any route of the switch `index` via `next_hop`,
+        or `None` if there is no such route.
+        """
+        columns = np.flatnonzero((self.__next_hops[index] == next_hop) &
+                                 (self.__ports[index] >= 0))
+        if len(columns) == 0:
+            return None
+        return self.__connections[self.__ports[index, columns[0]]]
+
+    def as_dict(self, index):
+        """Get routes of the switch `index` in the form
+        `dst -> (connection, next_hop)`.
+        """
+        ports, next_hops = self.__ports[index], self.__next_hops[index]
+        return {
+            dst: (self.__connections[ports[column]], int(next_hops[column]))
+            for dst, column in self.__columns.items() if ports[column] >= 0
+        }
+
+
 class SwitchTable:
     """Represents network layer routing table.
 
@@ -109,6 +212,11 @@ class SwitchTable:
     Links are added using `add()` method. They later can be grabbed with
     square brackets (like in dictionary).
 
+    If `routes` (`RoutingTables`) are given, the table also provides routes
+    stored in the row `index` of the shared arrays. Links added with `add()`
+    take precedence over the shared routes. Since shared routes are not
+    expected to change, their links are cached after the first lookup.
+
     Records MAY be updated later during the simulation.
     """
     class Link:
@@ -122,30 +230,71 @@ class SwitchTable:
         def __str__(self):
             return f'conn={self.connection}, next_hop={self.next_hop}'
 
-    def __init__(self):
+    def __init__(self, routes=None, index=None):
+        if routes is not None and index is None:
+            raise ValueError('switch index is required for shared routes')
         self.__records = {}
+        self.__routes = routes
+        self.__index = index
+        self.__shared_links = {}
+
+    @property
+    def routes(self):
+        return self.__routes
+
+    @property
+    def index(self):
+        return self.__index
 
     def add(self, dst, connection, next_hop):
         self.__records[dst] = SwitchTable.Link(connection, next_hop)
 
     def as_dict(self):
-        return ReadOnlyDict({
+        d = {} if self.__routes is None else \
+            self.__routes.as_dict(self.__index)
+        d.update({
             dst: link.as_tuple() for dst, link in self.__records.items()
         })
+        return ReadOnlyDict(d)
+
+    def find_connection(self, next_hop):
+        """Get connection of any link with the given `next_hop`, or `None`.
+        """
+        for link in self.__records.values():
+            if link.next_hop == next_hop:
+                return link.connection
+        if self.__routes is not None:
+            return self.__routes.find_connection(self.__index, next_hop)
+        return None
 
     def __getitem__(self, dst):
-        return self.__records[dst]
+        link = self.get(dst)
+        if link is None:
+            raise KeyError(dst)
+        return link
 
     def get(self, dst, default=None):
-        return self.__records.get(dst, default)
+        try:
+            return self.__records[dst]
+        except KeyError:
+            pass
+        if self.__routes is None:
+            return default
+        try:
+            link = self.__shared_links[dst]
+        except KeyError:
+            route = self.__routes.get(self.__index, dst)
+            link = None if route is None else SwitchTable.Link(*route)
+            self.__shared_links[dst] = link
+        return default if link is None else link
 
     def __contains__(self, dst):
-        return dst in self.__records
+        return self.get(dst) is not None
 
     def __str__(self):
         records = (
-            f'{dst}: ({link.connection}, {link.next_hop})'
-            for dst, link in self.__records.items()
+            f'{dst}: ({connection}, {next_hop})'
+            for dst, (connection, next_hop) in self.as_dict().items()
         )
         return f'SwitchTable{{{", ".join(records)}}}'
 
@@ -167,6 +316,9 @@ class NetworkSwitch(Model):
     from, and sends the packet via `Link.connection`, stored in the routing
     table.
 
+    The table can be passed to the constructor, e.g. a `SwitchTable` reading
+    routes from `RoutingTables` shared by all switches of the network.
+
     `NetworkSwitch` also records and checks SSN values. If the packet is too
     old (previous stored value of the SSN is less or equal to the received one),
     the packet is discarded.
@@ -176,9 +328,9 @@ class NetworkSwitch(Model):
     `source_address` before forwarding the packet to any of its network
     interfaces.
     """
-    def __init__(self, sim):
+    def __init__(self, sim, table=None):
         super().__init__(sim)
-        self.__table = SwitchTable()
+        self.__table = SwitchTable() if table is None else table
         self.__osn_table = {}
 
     @property
@@ -264,8 +416,8 @@ class NetworkSwitch(Model):
         message.sender_address = iface_connection.module.address
         iface_connection.send(message)
         self.sim.logger.debug(
-            f'forward packet {message} from connection {connection.name} '
-            f'to {iface_connection.name}', src=self
+            'forward packet %s from connection %s to %s',
+            message, connection.name, iface_connection.name, src=self
         )
 
     def __str__(self):
@@ -4,13 +4,12 @@ from pydesim import Model, Trace, Intervals, Statistic
 
 
 class QueuedPacket:
+    __slots__ = ('packet', 'arrived_at', 'size')
+
     def __init__(self, packet, arrived_at):
         self.packet = packet
         self.arrived_at = arrived_at
-    
-    @property
-    def size(self):
-        return self.packet.size
+        self.size = packet.size
     
     def __str__(self):
         return ('QPkt('
@@ -67,15 +66,16 @@ class Queue(Model):
         self.__packets = deque()
         self.__data_requests = deque()
         # Statistics:
+        keep_samples = sim.params.get('keep_samples', True)
         self.__num_dropped = 0
         self.__num_arrived = 0
-        self.__size_trace = Trace()
-        self.__bitsize_trace = Trace()
+        self.__size_trace = Trace(keep_samples=keep_samples)
+        self.__bitsize_trace = Trace(keep_samples=keep_samples)
         self.__size_trace.record(sim.stime, 0)
         self.__bitsize_trace.record(sim.stime, 0)
-        self.__arrival_intervals = Intervals()
+        self.__arrival_intervals = Intervals(keep_samples=keep_samples)
         self.__arrival_intervals.record(self.sim.stime)
-        self.__wait_intervals = Statistic()
+        self.__wait_intervals = Statistic(keep_samples=keep_samples)
 
     @property
     def capacity(self):
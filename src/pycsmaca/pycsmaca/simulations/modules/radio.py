@@ -1,13 +1,18 @@
+from math import ceil, floor
+
 import numpy as np
 from numpy.linalg import norm
 from pydesim import Model
 
 
 class AirFrame:
+    __slots__ = ('__pdu', '__preamble', '__bitrate', '__duration')
+
     def __init__(self, pdu, preamble, bitrate):
         self.__pdu = pdu
         self.__preamble = preamble
         self.__bitrate = bitrate
+        self.__duration = pdu.size / bitrate + preamble
 
     @property
     def pdu(self):
@@ -23,7 +28,7 @@ class AirFrame:
 
     @property
     def duration(self):
-        return self.pdu.size / self.bitrate + self.preamble
+        return self.__duration
 
     def __str__(self):
         return f"Frame[{self.duration:.6f}s with {self.pdu}]"
@@ -65,14 +70,22 @@ class Radio(Model):
         `Radio` informs both `Transmitter` and `Receiver` about this by
         calling `finish_transmit()` (without scheduling, using direct call).
 
+    - `handle_broadcast_start(frame, deliveries, started_at, index)` and
+        `handle_broadcast_end(...)`: fired when the frame first symbol
+        (or the frame end) reaches the next peers of this radio. Peers
+        with equal delays get the frame in one event, and the event is
+        rescheduled for the next delay. For each peer, this is the same as
+        `receive(frame)` and `handle_frame_received(frame)` calls.
+
 
     Methods:
 
-    - `transmit(pdu)`: schedules `receive(frame)` on all peers and
-        schedules `handle_frame_transmitted()`. When scheduling
-        `receive(frame)`, it computes the propagation delay based on the
-        distance between this radio module and the peer using
-        `position` property.
+    - `transmit(pdu)`: schedules the frame broadcast to all peers and
+        schedules `handle_frame_transmitted()`. Peers are taken from
+        `ConnectionManager` sorted by propagation delays (computed from
+        the distance between this radio module and the peer when
+        the radio is registered). Only one start and one end event of
+        the broadcast is pending at any time, instead of an event per peer.
     """
     def __init__(
             self, sim, conn_manager, preamble=None, bitrate=None,
@@ -127,15 +140,54 @@ class Radio(Model):
 
     def transmit(self, pdu):
         frame = AirFrame(pdu, self.preamble, self.bitrate)
-        self.sim.logger.debug(f'transmitting frame: {frame}', src=self)
-        peers = self.connection_manager.get_peers(self)
-        for peer in peers:
-            distance = norm(self.position - peer.position)
-            delay = distance / self.sim.params.speed_of_light
-            self.sim.schedule(delay, peer.receive, args=(frame,))
+        self.sim.logger.debug('transmitting frame: %s', frame, src=self)
+        deliveries = self.connection_manager.get_deliveries(self)
+        if deliveries:
+            self.sim.schedule(
+                deliveries[0][1], self.handle_broadcast_start,
+                args=(frame, deliveries, self.sim.stime, 0)
+            )
         self.sim.schedule(frame.duration, self.handle_frame_transmitted)
         self.receiver.start_transmit()
 
+    def handle_broadcast_start(self, frame, deliveries, started_at, index):
+        """Deliver the frame first symbol to the peers with the same delay
+        starting from `index`, and schedule the delivery to the next ones.
+        """
+        if index == 0:
+            self.sim.schedule(
+                frame.duration, self.handle_broadcast_end,
+                args=(frame, deliveries, started_at, 0)
+            )
+        delay = deliveries[index][1]
+        num_deliveries = len(deliveries)
+        while index < num_deliveries and deliveries[index][1] == delay:
+            deliveries[index][0].receiver.start_receive(frame.pdu)
+            index += 1
+        if index < num_deliveries:
+            self.sim.schedule(
+                started_at + deliveries[index][1] - self.sim.stime,
+                self.handle_broadcast_start,
+                args=(frame, deliveries, started_at, index)
+            )
+
+    def handle_broadcast_end(self, frame, deliveries, started_at, index):
+        """Deliver the frame end to the peers with the same delay starting
+        from `index`, and schedule the delivery to the next ones.
+        """
+        delay = deliveries[index][1]
+        num_deliveries = len(deliveries)
+        while index < num_deliveries and deliveries[index][1] == delay:
+            deliveries[index][0].handle_frame_received(frame)
+            index += 1
+        if index < num_deliveries:
+            self.sim.schedule(
+                started_at + deliveries[index][1] + frame.duration -
+                self.sim.stime,
+                self.handle_broadcast_end,
+                args=(frame, deliveries, started_at, index)
+            )
+
     def receive(self, frame):
         """This method is called by peers when they send a frame to this radio.
         """
@@ -162,34 +214,156 @@ class Radio(Model):
 
 
 class ConnectionManager(Model):
-    def __init__(self, sim):
+    """Keeps connections between radio modules.
+
+    Two radios are connected if the distance between them doesn't exceed
+    connection radius of each of them. To avoid comparing each radio with
+    all others, radios are stored in a uniform grid with cell size
+    `cell_size` (by default, connection radius of the first registered
+    radio, which must be positive then), so only radios from nearby cells
+    are checked.
+
+    Peers lists keep radios registration order. Propagation delays to
+    peers are computed once when radios are registered, using
+    `sim.params.speed_of_light`.
+
+    Methods:
+
+    - `add_radio(radio)`: register the radio and connect it with peers;
+        if the radio was registered before and moved, its peers are found
+        again (peers of the old position are not disconnected), and delays
+        from its peers are updated.
+
+    - `add_radios(radios)`: register many radios at once, e.g. when
+        the network is built.
+
+    - `get_peers(radio)`: get a list of radios connected to the given one.
+
+    - `get_peer_delays(radio)`: get a list of `(peer, delay)` pairs.
+
+    - `get_deliveries(radio)`: get `(peer, delay)` pairs sorted by delays.
+    """
+    def __init__(self, sim, cell_size=None):
         super().__init__(sim)
+        if cell_size is not None and cell_size <= 0:
+            raise ValueError(f'positive cell size expected, {cell_size} found')
         self.connected_radios = {}
+        self.__cell_size = cell_size
+        self.__cells = {}
+        # Records [index, cell, position] by registered radios:
+        self.__records = {}
+        self.__peer_sets = {}
+        self.__peer_delays = {}
+        self.__deliveries = {}
+
+    @property
+    def cell_size(self):
+        return self.__cell_size
 
     def add_radio(self, radio):
-        if radio not in self.connected_radios:
+        record = self.__records.get(radio)
+        if record is not None:
+            if np.array_equal(record[2], radio.position):
+                return
+            old_cell = self.__cells[record[1]]
+            old_cell.remove(radio)
+            if not old_cell:
+                del self.__cells[record[1]]
+        if self.__cell_size is None:
+            if radio.connection_radius <= 0:
+                raise ValueError(
+                    f'positive cell size expected, but it is not given and '
+                    f'connection radius is {radio.connection_radius}')
+            self.__cell_size = radio.connection_radius
+        cell = self.__get_cell(radio.position)
+        self.__cells.setdefault(cell, []).append(radio)
+        if record is None:
+            self.__records[radio] = [len(self.__records), cell,
+                                     radio.position.copy()]
             self.connected_radios[radio] = []
-
-        peers = []
-        for peer in self.connected_radios.keys():
-            if peer == radio:
+            self.__peer_sets[radio] = set()
+            self.__peer_delays[radio] = []
+        else:
+            record[1:] = [cell, radio.position.copy()]
+
+        # Looking for peers in cells covered by the connection radius. If
+        # the radius is much larger than the cell size, most of the covered
+        # cells are empty, so occupied cells are checked instead:
+        span = max(ceil(radio.connection_radius / self.__cell_size), 1)
+        candidates = []
+        if (2 * span + 1) ** 2 <= len(self.__cells):
+            for i in range(cell[0] - span, cell[0] + span + 1):
+                for j in range(cell[1] - span, cell[1] + span + 1):
+                    candidates.extend(self.__cells.get((i, j), ()))
+        else:
+            for (i, j), radios in self.__cells.items():
+                if abs(i - cell[0]) <= span and abs(j - cell[1]) <= span:
+                    candidates.extend(radios)
+        candidates.sort(key=lambda item: self.__records[item][0])
+
+        speed_of_light = self.sim.params.speed_of_light
+        peers, peer_set, delays = [], set(), []
+        for peer in candidates:
+            if peer is radio:
                 continue
             d = norm(peer.position - radio.position)
             if peer.connection_radius >= d and radio.connection_radius >= d:
+                delay = d / speed_of_light
                 peers.append(peer)
-                if radio not in self.connected_radios[peer]:
+                peer_set.add(peer)
+                delays.append((peer, delay))
+                if radio not in self.__peer_sets[peer]:
                     self.connected_radios[peer].append(radio)
+                    self.__peer_sets[peer].add(radio)
+                    self.__peer_delays[peer].append((radio, delay))
+                    self.__deliveries.pop(peer, None)
+                elif record is not None:
+                    # Radio moved, so update the delay from the peer:
+                    self.__peer_delays[peer] = [
+                        (item, delay if item is radio else item_delay)
+                        for item, item_delay in self.__peer_delays[peer]
+                    ]
+                    self.__deliveries.pop(peer, None)
                 self.sim.logger.debug(
-                    f'connected radio@{tuple(radio.position)} to '
-                    f'radio@{tuple(peer.position)}',
+                    lambda: f'connected radio@{tuple(radio.position)} to '
+                            f'radio@{tuple(peer.position)}',
                     src=self
                 )
 
         self.connected_radios[radio] = peers
+        self.__peer_sets[radio] = peer_set
+        self.__peer_delays[radio] = delays
+        self.__deliveries.pop(radio, None)
+
+    def add_radios(self, radios):
+        for radio in radios:
+            self.add_radio(radio)
 
     def get_peers(self, radio):
         return self.connected_radios[radio]
 
+    def get_peer_delays(self, radio):
+        return self.__peer_delays[radio]
+
+    def get_deliveries(self, radio):
+        """Get a tuple of `(peer, delay)` pairs sorted by delays (peers with
+        equal delays keep registration order).
+
+        Tuples are cached and replaced (not changed) when peers change, so
+        broadcasts in progress keep their deliveries.
+        """
+        try:
+            return self.__deliveries[radio]
+        except KeyError:
+            deliveries = tuple(sorted(
+                self.__peer_delays[radio], key=lambda item: item[1]))
+            self.__deliveries[radio] = deliveries
+            return deliveries
+
+    def __get_cell(self, position):
+        return (floor(position[0] / self.__cell_size),
+                floor(position[1] / self.__cell_size))
+
     def __str__(self):
         prefix = f'{self.parent}.' if self.parent else ''
         return f'{prefix}ConnectionManager'
@@ -4,13 +4,13 @@ from pycsmaca.simulations.modules import Sink, NetworkService, NetworkSwitch
 
 
 class Station(Model):
-    def __init__(self, sim, source, interfaces):
+    def __init__(self, sim, source, interfaces, switch_table=None):
         super().__init__(sim)
 
         # Creating missing modules:
         sink = Sink(sim)
         network_service = NetworkService(sim)
-        switch = NetworkSwitch(sim)
+        switch = NetworkSwitch(sim, table=switch_table)
 
         # Registering children:
         if source is not None:
@@ -27,6 +27,11 @@ class Station(Model):
         network_service.connections.set('network', switch, rname='user')
         for i, iface in enumerate(interfaces):
             switch.connections.set(f'if{i}', iface, rname='user')
+
+        # Lookup caches, see `get_interface_by_address()` and
+        # `get_interface_to()`:
+        self.__ifaces_by_address = None
+        self.__neighbour_ifaces = {}
     
     @property
     def source(self):
@@ -49,42 +54,43 @@ class Station(Model):
         return self.children['interfaces']
 
     def get_interface_by_address(self, address):
-        for iface in self.children['interfaces']:
-            if iface.address == address:
-                return iface
+        if self.__ifaces_by_address is None:
+            self.__ifaces_by_address = {}
+            for iface in self.children['interfaces']:
+                self.__ifaces_by_address.setdefault(iface.address, iface)
+        return self.__ifaces_by_address.get(address)
 
     def get_interface_to(self, remote_sta):
         #
         # If remote_sta is found in switching table, return the interface
         # described by it:
         #
+        table = self.switch.table
         for remote_address in (nif.address for nif in remote_sta.interfaces):
-            if remote_address in self.switch.table:
-                conn_name = self.switch.table[remote_address].connection
+            link = table.get(remote_address)
+            conn_name = (link.connection if link is not None else
+                         table.find_connection(remote_address))
+            if conn_name is not None:
                 return self.switch.connections[conn_name].module
-            for link in self.switch.table.as_dict().values():
-                if link[1] == remote_address:
-                    conn_name = link[0]
-                    return self.switch.connections[conn_name].module
 
         #
-        # Otherwise, inspect neighbours:
+        # Otherwise, inspect neighbours. Stations owning the peers of wired
+        # interfaces are cached, and the cache is rebuilt on misses, since
+        # wires may be connected after the first lookup:
         #
-        def test_parent_is_remote_sta(module):
-            if module.parent is None:
-                return False
-            return module.parent == remote_sta or test_parent_is_remote_sta(
-                module.parent)
-        for iface in self.interfaces:
-            if 'wire' in iface.connections:
-                peer = iface.connections['wire'].module
-                if test_parent_is_remote_sta(peer):
-                    return iface
+        if remote_sta not in self.__neighbour_ifaces:
+            self.__neighbour_ifaces = {}
+            for iface in self.interfaces:
+                if 'wire' in iface.connections:
+                    module = iface.connections['wire'].module.parent
+                    while module is not None:
+                        self.__neighbour_ifaces.setdefault(module, iface)
+                        module = module.parent
 
         #
         # If neither found, return None:
         #
-        return None
+        return self.__neighbour_ifaces.get(remote_sta)
 
     def get_switch_connection_for(self, iface):
         for conn_name in self.switch.connections.names():
@@ -3,6 +3,8 @@ from pydesim import Model, Trace, Statistic
 
 
 class WireFrame:
+    __slots__ = ('packet', 'duration', 'header_size', 'preamble')
+
     def __init__(self, packet, duration=0, header_size=0, preamble=0):
         self.packet = packet
         self.duration = duration
@@ -71,15 +73,16 @@ class WiredTransceiver(Model):
         self.__wait_ifs = False
         self.__rx_frame = None
         # Statistics:
+        keep_samples = sim.params.get('keep_samples', True)
         self.__num_received_frames = 0
         self.__num_received_bits = 0
-        self.__rx_busy_trace = Trace()
+        self.__rx_busy_trace = Trace(keep_samples=keep_samples)
         self.__rx_busy_trace.record(0, 0)
         self.__num_transmitted_packets = 0
         self.__num_transmitted_bits = 0
-        self.__tx_busy_trace = Trace()
+        self.__tx_busy_trace = Trace(keep_samples=keep_samples)
         self.__tx_busy_trace.record(0, 0)
-        self.__service_time = Statistic()
+        self.__service_time = Statistic(keep_samples=keep_samples)
         self.__service_started_at = None
         # Initialization:
         self.sim.schedule(self.sim.stime, self.start)
@@ -155,14 +158,14 @@ class WiredTransceiver(Model):
             self.__tx_frame = frame
             self.__tx_busy_trace.record(self.sim.stime, 1)
             self.__service_started_at = self.sim.stime
-            self.sim.logger.debug(f'start transmitting frame {frame}', src=self)
+            self.sim.logger.debug('start transmitting frame %s', frame, src=self)
         elif connection.name == 'peer':
             self.sim.schedule(
                 message.duration, self.handle_rx_end, args=(message,)
             )
             self.__rx_frame = message
             self.__rx_busy_trace.record(self.sim.stime, 1)
-            self.sim.logger.debug(f'start receiving frame {message}', src=self)
+            self.sim.logger.debug('start receiving frame %s', message, src=self)
 
     def handle_tx_end(self):
         self.sim.schedule(self.ifs, self.handle_ifs_end)
@@ -172,7 +175,7 @@ class WiredTransceiver(Model):
         # Update state variables:
         self.__wait_ifs = True
         self.__tx_frame = None
-        self.sim.logger.debug(f'finish transmitting, waiting IFS', src=self)
+        self.sim.logger.debug('finish transmitting, waiting IFS', src=self)
 
     def handle_ifs_end(self):
         self.__wait_ifs = False
@@ -181,7 +184,7 @@ class WiredTransceiver(Model):
         self.__tx_busy_trace.record(self.sim.stime, 0)
         self.__service_time.append(self.sim.stime - self.__service_started_at)
         self.__service_started_at = None
-        self.sim.logger.debug(f'IFS end, ready to transmit', src=self)
+        self.sim.logger.debug('IFS end, ready to transmit', src=self)
 
     def handle_rx_end(self, frame):
         if 'up' in self.connections:
@@ -190,7 +193,7 @@ class WiredTransceiver(Model):
         self.__num_received_frames += 1
         self.__num_received_bits += frame.size
         self.__rx_busy_trace.record(self.sim.stime, 0)
-        self.sim.logger.debug(f'finish receiving frame', src=self)
+        self.sim.logger.debug('finish receiving frame', src=self)
 
     def __str__(self):
         prefix = f'{self.parent}.' if self.parent else ''
@@ -1,13 +1,14 @@
 import math
 from enum import Enum
 
-from numpy.random.mtrand import randint
 from pydesim import Model, Statistic, Trace
 
 from pycsmaca.simulations.modules import NetworkPacket
 
 
 class PDUBase:
+    __slots__ = ()
+
     class Type(Enum):
         DATA = 0
         ACK = 1
@@ -33,6 +34,9 @@ class PDUBase:
 
 
 class DataPDU(PDUBase):
+    __slots__ = ('__packet', '__sender', '__receiver', '__header_size',
+                 '__seqn', '__size')
+
     def __init__(
             self, packet, header_size, seqn,
             sender_address=None,
@@ -50,6 +54,7 @@ class DataPDU(PDUBase):
         )
         self.__header_size = header_size
         self.__seqn = seqn
+        self.__size = header_size + packet.size
 
     @property
     def packet(self):
@@ -61,7 +66,7 @@ class DataPDU(PDUBase):
 
     @property
     def size(self):
-        return self.header_size + self.packet.size
+        return self.__size
 
     @property
     def type(self):
@@ -86,15 +91,16 @@ class DataPDU(PDUBase):
 
 
 class AckPDU(PDUBase):
+    __slots__ = ('__sender_address', '__receiver_address', '__size')
+
     def __init__(self, header_size, ack_size, sender_address, receiver_address):
-        self.__header_size = header_size
-        self.__ack_size = ack_size
         self.__sender_address = sender_address
         self.__receiver_address = receiver_address
+        self.__size = header_size + ack_size
 
     @property
     def size(self):
-        return self.__header_size + self.__ack_size
+        return self.__size
 
     @property
     def type(self):
@@ -148,6 +154,10 @@ class Transmitter(Model):
     - `'channel'`: mandatory, to `Channel` instance;
     - `'radio'`: mandatory, to `Radio` module
     - `'queue'`: optional, to `Queue` module
+
+    Backoff countdown is simulated with a single timeout, so `backoff`
+    keeps the number of slots remaining when the countdown was (re)started,
+    and is updated only when the channel becomes busy.
     """
     class State(Enum):
         IDLE = 0
@@ -156,6 +166,9 @@ class Transmitter(Model):
         TX = 3
         WAIT_ACK = 4
 
+    # Relative (to slot) tolerance when counting passed backoff slots:
+    BACKOFF_EPS = 1e-9
+
     def __init__(
             self, sim, address=None, phy_header_size=None, mac_header_size=None,
             ack_size=None, bitrate=None, preamble=None, max_propagation=0,
@@ -186,18 +199,20 @@ class Transmitter(Model):
         self.timeout = None
         self.cw = 65536
         self.backoff = -1
+        self.__backoff_started_at = None
         self.num_retries = None
         self.pdu = None
         self.__state = Transmitter.State.IDLE
         self.__seqn = 0
 
         # Statistics:
-        self.backoff_vector = Statistic()
+        keep_samples = sim.params.get('keep_samples', True)
+        self.backoff_vector = Statistic(keep_samples=keep_samples)
         self.__start_service_time = None
-        self.service_time = Statistic()
+        self.service_time = Statistic(keep_samples=keep_samples)
         self.num_sent = 0
-        self.num_retries_vector = Statistic()
-        self.__busy_trace = Trace()
+        self.num_retries_vector = Statistic(keep_samples=keep_samples)
+        self.__busy_trace = Trace(keep_samples=keep_samples)
         self.__busy_trace.record(sim.stime, 0)
 
         # Initialize:
@@ -211,7 +226,7 @@ class Transmitter(Model):
     def state(self, state):
         if self.state != state:
             self.sim.logger.debug(
-                f'{self.state.name} -> {state.name}', src=self
+                '%s -> %s', self.state.name, state.name, src=self
             )
         self.__state = state
 
@@ -271,7 +286,7 @@ class Transmitter(Model):
             assert self.state == Transmitter.State.IDLE
 
             self.cw = self.sim.params.cwmin
-            self.backoff = randint(0, self.cw)
+            self.backoff = int(self.rng.integers(0, self.cw))
             self.num_retries = 1
 
             #
@@ -290,17 +305,15 @@ class Transmitter(Model):
             self.__busy_trace.record(self.sim.stime, 1)
 
             self.sim.logger.debug(
-                f'backoff={self.backoff}; CW={self.cw},NR={self.num_retries}',
-                src=self
+                'backoff=%s; CW=%s,NR=%s',
+                self.backoff, self.cw, self.num_retries, src=self
             )
 
             if self.channel.is_busy:
                 self.state = Transmitter.State.BUSY
             else:
                 self.state = Transmitter.State.BACKOFF
-                self.timeout = self.sim.schedule(
-                    self.sim.params.difs, self.handle_backoff_timeout
-                )
+                self.__start_backoff()
         else:
             raise RuntimeError(
                 f'unexpected handle_message({packet}, connection={connection}, '
@@ -309,14 +322,13 @@ class Transmitter(Model):
 
     def channel_ready(self):
         if self.state == Transmitter.State.BUSY:
-            self.timeout = self.sim.schedule(
-                self.sim.params.difs, self.handle_backoff_timeout
-            )
+            self.__start_backoff()
             self.state = Transmitter.State.BACKOFF
 
     def channel_busy(self):
         if self.state == Transmitter.State.BACKOFF:
             self.sim.cancel(self.timeout)
+            self.__freeze_backoff()
             self.state = Transmitter.State.BUSY
 
     def finish_transmit(self):
@@ -355,35 +367,53 @@ class Transmitter(Model):
         assert self.state == Transmitter.State.WAIT_ACK
         self.num_retries += 1
         self.cw = min(2 * self.cw, self.sim.params.cwmax)
-        self.backoff = randint(0, self.cw)
+        self.backoff = int(self.rng.integers(0, self.cw))
 
         self.backoff_vector.append(self.backoff)
 
         self.sim.logger.debug(
-            f'backoff={self.backoff}; CW={self.cw}, NR={self.num_retries})',
-            src=self
+            'backoff=%s; CW=%s, NR=%s)',
+            self.backoff, self.cw, self.num_retries, src=self
         )
 
         if self.channel.is_busy:
             self.state = Transmitter.State.BUSY
         else:
             self.state = Transmitter.State.BACKOFF
-            self.timeout = self.sim.schedule(
-                self.sim.params.difs, self.handle_backoff_timeout
-            )
+            self.__start_backoff()
 
     def handle_backoff_timeout(self):
-        if self.backoff == 0:
-            self.state = Transmitter.State.TX
-            self.sim.logger.debug(f'transmitting {self.pdu}', src=self)
-            self.radio.transmit(self.pdu)
-        else:
-            assert self.backoff > 0
-            self.backoff -= 1
-            self.timeout = self.sim.schedule(
-                self.sim.params.slot, self.handle_backoff_timeout
-            )
-            self.sim.logger.debug(f'backoff := {self.backoff}', src=self)
+        self.backoff = 0
+        self.__backoff_started_at = None
+        self.state = Transmitter.State.TX
+        self.sim.logger.debug('transmitting %s', self.pdu, src=self)
+        self.radio.transmit(self.pdu)
+
+    def __start_backoff(self):
+        # Instead of a timeout per slot, we schedule the whole countdown
+        # at once. If the channel becomes busy, `__freeze_backoff()` finds
+        # the number of slots passed, and the countdown is resumed from
+        # the remaining value after DIFS when the channel is ready again.
+        self.__backoff_started_at = self.sim.stime
+        self.timeout = self.sim.schedule(
+            self.sim.params.difs + self.backoff * self.sim.params.slot,
+            self.handle_backoff_timeout
+        )
+
+    def __freeze_backoff(self):
+        # Counter is decremented at the end of DIFS and at the end of each
+        # slot except the last one, so at `t` it was decremented
+        # `floor((t - DIFS) / slot) + 1` times. Slot borders coinciding with
+        # the busy moment (up to rounding) are treated as already passed.
+        elapsed = (
+            self.sim.stime - self.__backoff_started_at - self.sim.params.difs
+        )
+        self.__backoff_started_at = None
+        if elapsed < -self.BACKOFF_EPS * self.sim.params.slot:
+            return
+        num_slots = int(elapsed / self.sim.params.slot + self.BACKOFF_EPS) + 1
+        self.backoff = max(self.backoff - num_slots, 0)
+        self.sim.logger.debug('backoff := %s', self.backoff, src=self)
 
     def __str__(self):
         prefix = f'{self.parent}.' if self.parent else ''
@@ -433,7 +463,8 @@ class Receiver(Model):
         # Statistics:
         self.__num_collisions = 0
         self.__num_received = 0
-        self.__busy_trace = Trace()
+        self.__busy_trace = Trace(
+            keep_samples=sim.params.get('keep_samples', True))
         self.__busy_trace.record(sim.stime, 0)
 
     @property
@@ -449,7 +480,7 @@ class Receiver(Model):
                 self.__busy_trace.record(self.sim.stime, 0)
 
             self.sim.logger.debug(
-                f'{self.__state.name} -> {state.name}', src=self
+                '%s -> %s', self.__state.name, state.name, src=self
             )
             if state is Receiver.State.COLLIDED:
                 self.__num_collisions += 1
@@ -520,7 +551,7 @@ class Receiver(Model):
     def start_receive(self, pdu):
         if pdu in self.__rxbuf:
             self.sim.logger.error(
-                f"PDU {pdu} is already in the buffer:\n{self.__rxbuf}",
+                'PDU %s is already in the buffer:\n%s', pdu, self.__rxbuf,
                 src=self
             )
             raise RuntimeError(f'PDU is already in the buffer, PDU={pdu}')
@@ -1,21 +1,63 @@
 from collections import namedtuple
+from functools import partial
+
+import numpy as np
 
 from .wireless_networks import CollisionDomainNetwork, \
     CollisionDomainSaturatedNetwork, WirelessHalfDuplexLineNetwork
 from .wired_networks import WiredLineNetwork
-from pydesim import simulate, Logger
+from .slotted import SlottedCollisionDomain
+from pydesim import simulate, Logger, Statistic
 
 
 SPEED_OF_LIGHT = 299792458.0
 
 
+# Results types are defined at module level, so they can be pickled when
+# simulations are run in worker processes:
+SimRet = namedtuple('SimRet', ['clients', 'server', 'network'])
+CollisionDomainClient = namedtuple('CollisionDomainClient', [
+    'service_time', 'num_retries', 'queue_size', 'busy',
+    'source_intervals', 'num_packets_sent', 'queue_drop_ratio',
+    'queue_wait',
+])
+SaturatedClient = namedtuple('SaturatedClient', [
+    'service_time', 'num_retries', 'queue_size', 'busy',
+    'source_intervals', 'num_packets_sent',
+])
+WirelessLineClient = namedtuple('WirelessLineClient', [
+    'service_time', 'num_retries', 'queue_size', 'tx_busy', 'rx_busy',
+    'source_intervals', 'num_packets_sent', 'delay', 'sid',
+    'arrival_intervals', 'queue_drop_ratio', 'collision_ratio',
+    'queue_wait',
+])
+WirelessServer = namedtuple('WirelessServer', [
+    'arrival_intervals', 'num_rx_collided', 'num_rx_success',
+    'num_packets_received', 'collision_ratio',
+])
+SlottedNetwork = namedtuple('SlottedNetwork', [
+    'stime', 'num_empty_slots', 'num_success_slots', 'num_collided_slots',
+    'throughput', 'collision_probability',
+])
+WiredLineClient = namedtuple('WiredLineClient', [
+    'service_time', 'queue_size', 'tx_busy', 'rx_busy',
+    'source_intervals', 'num_packets_sent', 'delay', 'sid',
+    'arrival_intervals', 'queue_drop_ratio', 'queue_wait',
+])
+WiredLineServer = namedtuple('WiredLineServer', [
+    'arrival_intervals', 'num_packets_received',
+])
+
+
 def collision_domain_network(
         num_clients, payload_size, source_interval, ack_size, mac_header_size,
         phy_header_size, preamble, bitrate, difs, sifs, slot, cwmin, cwmax,
         queue_capacity=None, connection_radius=100,
         speed_of_light=SPEED_OF_LIGHT, sim_time_limit=1000,
-        log_level=Logger.Level.INFO):
-    ret = simulate(
+        log_level=Logger.Level.INFO, replications=None, workers=None,
+        seed=None, keep_samples=True,
+        immediate_events=False):
+    return simulate(
         CollisionDomainNetwork,
         stime_limit=sim_time_limit,
         params=dict(
@@ -35,22 +77,16 @@ def collision_domain_network(
             connection_radius=connection_radius,
             speed_of_light=speed_of_light,
             queue_capacity=queue_capacity,
-        ), loglevel=log_level
+            keep_samples=keep_samples,
+        ), loglevel=log_level, replications=replications, workers=workers,
+        seed=seed, immediate_events=immediate_events, extract=_get_extractor(
+            _extract_collision_domain_results, workers)
     )
 
-    simret_class = namedtuple('SimRet', ['clients', 'server', 'network'])
-    client_class = namedtuple('Client', [
-        'service_time', 'num_retries', 'queue_size', 'busy',
-        'source_intervals', 'num_packets_sent', 'queue_drop_ratio',
-        'queue_wait',
-    ])
-    server_class = namedtuple('Server', [
-        'arrival_intervals', 'num_rx_collided', 'num_rx_success',
-        'num_packets_received', 'collision_ratio',
-    ])
 
+def _extract_collision_domain_results(sim, keep_network=True):
     clients = [
-        client_class(
+        CollisionDomainClient(
             service_time=cli.interfaces[0].transmitter.service_time,
             num_retries=cli.interfaces[0].transmitter.num_retries_vector,
             queue_size=cli.interfaces[0].queue.size_trace,
@@ -59,19 +95,18 @@ def collision_domain_network(
             num_packets_sent=cli.interfaces[0].transmitter.num_sent,
             queue_drop_ratio=cli.interfaces[0].queue.drop_ratio,
             queue_wait=cli.interfaces[0].queue.wait_intervals,
-        ) for cli in ret.data.clients
+        ) for cli in sim.data.clients
     ]
-
-    srv = ret.data.server
-    server = server_class(
+    srv = sim.data.server
+    server = WirelessServer(
         arrival_intervals=srv.sink.arrival_intervals.statistic(),
         num_rx_collided=srv.interfaces[0].receiver.num_collisions,
         num_rx_success=srv.interfaces[0].receiver.num_received,
         num_packets_received=srv.sink.num_packets_received,
         collision_ratio=srv.interfaces[0].receiver.collision_ratio,
     )
-
-    return simret_class(clients=clients, server=server, network=ret.data)
+    return SimRet(clients=clients, server=server,
+                  network=(sim.data if keep_network else None))
 
 
 def collision_domain_saturated_network(
@@ -79,8 +114,10 @@ def collision_domain_saturated_network(
         phy_header_size, preamble, bitrate, difs, sifs, slot, cwmin, cwmax,
         queue_capacity=None, connection_radius=100,
         speed_of_light=SPEED_OF_LIGHT, sim_time_limit=1000,
-        log_level=Logger.Level.INFO):
-    ret = simulate(
+        log_level=Logger.Level.INFO, replications=None, workers=None,
+        seed=None, keep_samples=True,
+        immediate_events=False):
+    return simulate(
         CollisionDomainSaturatedNetwork,
         stime_limit=sim_time_limit,
         params=dict(
@@ -99,40 +136,113 @@ def collision_domain_saturated_network(
             connection_radius=connection_radius,
             speed_of_light=speed_of_light,
             queue_capacity=queue_capacity,
-        ), loglevel=log_level
+            keep_samples=keep_samples,
+        ), loglevel=log_level, replications=replications, workers=workers,
+        seed=seed, immediate_events=immediate_events, extract=_get_extractor(
+            _extract_saturated_network_results, workers)
     )
 
-    simret_class = namedtuple('SimRet', ['clients', 'server', 'network'])
-    client_class = namedtuple('Client', [
-        'service_time', 'num_retries', 'queue_size', 'busy',
-        'source_intervals', 'num_packets_sent',
-    ])
-    server_class = namedtuple('Server', [
-        'arrival_intervals', 'num_rx_collided', 'num_rx_success',
-        'num_packets_received', 'collision_ratio',
-    ])
 
+def _extract_saturated_network_results(sim, keep_network=True):
     clients = [
-        client_class(
+        SaturatedClient(
             service_time=cli.interfaces[0].transmitter.service_time,
             num_retries=cli.interfaces[0].transmitter.num_retries_vector,
             queue_size=cli.interfaces[0].queue.size_trace,
             busy=cli.interfaces[0].transmitter.busy_trace,
             source_intervals=cli.source.arrival_intervals.statistic(),
             num_packets_sent=cli.interfaces[0].transmitter.num_sent,
-        ) for cli in ret.data.clients
+        ) for cli in sim.data.clients
     ]
-
-    srv = ret.data.server
-    server = server_class(
+    srv = sim.data.server
+    server = WirelessServer(
         arrival_intervals=srv.sink.arrival_intervals.statistic(),
         num_rx_collided=srv.interfaces[0].receiver.num_collisions,
         num_rx_success=srv.interfaces[0].receiver.num_received,
         num_packets_received=srv.sink.num_packets_received,
         collision_ratio=srv.interfaces[0].receiver.collision_ratio,
     )
+    return SimRet(clients=clients, server=server,
+                  network=(sim.data if keep_network else None))
+
+
+def slotted_collision_domain_saturated_network(
+        num_clients, payload_size, ack_size, mac_header_size,
+        phy_header_size, preamble, bitrate, difs, sifs, slot, cwmin, cwmax,
+        connection_radius=100, speed_of_light=SPEED_OF_LIGHT,
+        sim_time_limit=1000, replications=None, seed=None,
+        keep_samples=True):
+    """Simulate saturated collision domain with `SlottedCollisionDomain`.
+
+    This is a fast alternative to `collision_domain_saturated_network()`
+    for large networks, which follows Bianchi slotted model instead of
+    simulating stations modules. Results have the same shape: `SimRet`
+    with `SaturatedClient` and `WirelessServer` records, but client queue
+    sizes and busy traces are not available (`None`), and `network` is
+    a `SlottedNetwork` record with slots counts, throughput (payload bits
+    per second received by the server) and probability that
+    a transmission collides.
 
-    return simret_class(clients=clients, server=server, network=ret.data)
+    All replications are simulated at once. If `replications` is given,
+    a list of results is returned.
+    """
+    engine = SlottedCollisionDomain(
+        num_clients, payload_size=payload_size, ack_size=ack_size,
+        mac_header_size=mac_header_size, phy_header_size=phy_header_size,
+        preamble=preamble, bitrate=bitrate, difs=difs, sifs=sifs, slot=slot,
+        cwmin=cwmin, cwmax=cwmax, connection_radius=connection_radius,
+        speed_of_light=speed_of_light,
+        replications=(1 if replications is None else replications),
+        seed=seed,
+    ).run(sim_time_limit)
+    results = [
+        _extract_slotted_results(engine, index, sim_time_limit, keep_samples)
+        for index in range(engine.num_replications)
+    ]
+    return results if replications is not None else results[0]
+
+
+def _extract_slotted_results(engine, index, sim_time_limit,
+                             keep_samples=True):
+    clients = []
+    for client in range(engine.num_clients):
+        service_times = engine.get_service_times(index, client)
+        clients.append(SaturatedClient(
+            service_time=Statistic(service_times, keep_samples=keep_samples),
+            num_retries=Statistic(engine.get_num_retries(index, client),
+                                  keep_samples=keep_samples),
+            queue_size=None,
+            busy=None,
+            # Saturated source generates the first packet at zero time and
+            # the next ones when previous packets are served:
+            source_intervals=Statistic(
+                [0.0] + service_times.tolist(), keep_samples=keep_samples),
+            num_packets_sent=len(service_times),
+        ))
+    arrivals = engine.get_arrivals(index)
+    num_success = int(engine.num_success_slots[index])
+    num_collided = int(engine.num_collided_slots[index])
+    num_attempts = int(engine.num_attempts[index].sum())
+    server = WirelessServer(
+        arrival_intervals=Statistic(
+            np.diff(arrivals, prepend=0.0), keep_samples=keep_samples),
+        num_rx_collided=num_collided,
+        num_rx_success=num_success,
+        num_packets_received=len(arrivals),
+        collision_ratio=(num_collided / (num_collided + num_success)
+                         if num_collided + num_success > 0 else 0),
+    )
+    stime = float(engine.stime[index])
+    network = SlottedNetwork(
+        stime=stime,
+        num_empty_slots=int(engine.num_empty_slots[index]),
+        num_success_slots=num_success,
+        num_collided_slots=num_collided,
+        throughput=engine.get_delivered_payload(index) / sim_time_limit,
+        collision_probability=(
+            1 - num_success / num_attempts if num_attempts > 0 else 0),
+    )
+    return SimRet(clients=clients, server=server, network=network)
 
 
 def wireless_half_duplex_line_network(
@@ -140,8 +250,10 @@ def wireless_half_duplex_line_network(
         phy_header_size, preamble, bitrate, difs, sifs, slot, cwmin, cwmax,
         queue_capacity=None, active_sources=(0,), connection_radius=120,
         distance=100, speed_of_light=SPEED_OF_LIGHT, sim_time_limit=1000,
-        log_level=Logger.Level.INFO):
-    ret = simulate(
+        log_level=Logger.Level.INFO, replications=None, workers=None,
+        seed=None, keep_samples=True,
+        immediate_events=False):
+    return simulate(
         WirelessHalfDuplexLineNetwork,
         stime_limit=sim_time_limit,
         params=dict(
@@ -163,28 +275,21 @@ def wireless_half_duplex_line_network(
             distance=distance,
             speed_of_light=speed_of_light,
             queue_capacity=queue_capacity,
-        ), loglevel=log_level
+            keep_samples=keep_samples,
+        ), loglevel=log_level, replications=replications, workers=workers,
+        seed=seed, immediate_events=immediate_events, extract=_get_extractor(
+            _extract_wireless_line_results, workers)
     )
 
-    simret_class = namedtuple('SimRet', ['clients', 'server', 'network'])
-    client_class = namedtuple('Client', [
-        'service_time', 'num_retries', 'queue_size', 'tx_busy', 'rx_busy',
-        'source_intervals', 'num_packets_sent', 'delay', 'sid',
-        'arrival_intervals', 'queue_drop_ratio', 'collision_ratio',
-        'queue_wait',
-    ])
-    server_class = namedtuple('Server', [
-        'arrival_intervals', 'num_rx_collided', 'num_rx_success',
-        'num_packets_received', 'collision_ratio',
-    ])
 
+def _extract_wireless_line_results(sim, keep_network=True):
     # Helper lists and objects:
-    _client_sources = [cli.source for cli in ret.data.clients]
-    _client_ifaces = [cli.interfaces[0] for cli in ret.data.clients]
-    _srv = ret.data.server
+    _client_sources = [cli.source for cli in sim.data.clients]
+    _client_ifaces = [cli.interfaces[0] for cli in sim.data.clients]
+    _srv = sim.data.server
 
     clients = [
-        client_class(
+        WirelessLineClient(
             service_time=iface.transmitter.service_time,
             num_retries=iface.transmitter.num_retries_vector,
             queue_size=iface.queue.size_trace,
@@ -201,27 +306,29 @@ def wireless_half_duplex_line_network(
             queue_wait=iface.queue.wait_intervals,
         ) for src, iface in zip(_client_sources, _client_ifaces)
     ]
-    server = server_class(
+    server = WirelessServer(
         arrival_intervals=_srv.sink.arrival_intervals.statistic(),
         num_rx_collided=_srv.interfaces[0].receiver.num_collisions,
         num_rx_success=_srv.interfaces[0].receiver.num_received,
         num_packets_received=_srv.sink.num_packets_received,
         collision_ratio=_srv.interfaces[0].receiver.collision_ratio,
     )
-
-    return simret_class(clients=clients, server=server, network=ret.data)
+    return SimRet(clients=clients, server=server,
+                  network=(sim.data if keep_network else None))
 
 
 def wired_line_network(
         num_clients, payload_size, source_interval, header_size, bitrate,
         preamble=0, ifs=None,  distance=100, queue_capacity=None,
         active_sources=(0,), speed_of_light=SPEED_OF_LIGHT,
-        sim_time_limit=1000, log_level=Logger.Level.INFO):
+        sim_time_limit=1000, log_level=Logger.Level.INFO, replications=None,
+        workers=None, seed=None, keep_samples=True,
+        immediate_events=False):
 
     if ifs is None:
         ifs = 1 / bitrate
 
-    ret = simulate(
+    return simulate(
         WiredLineNetwork,
         stime_limit=sim_time_limit,
         params=dict(
@@ -236,28 +343,23 @@ def wired_line_network(
             preamble=preamble,
             ifs=ifs,
             queue_capacity=queue_capacity,
+            keep_samples=keep_samples,
         ),
-        loglevel=log_level,
+        loglevel=log_level, replications=replications, workers=workers,
+        seed=seed, immediate_events=immediate_events,
+        extract=_get_extractor(_extract_wired_line_results, workers)
     )
 
-    simret_class = namedtuple('SimRet', ['clients', 'server', 'network'])
-    client_class = namedtuple('Client', [
-        'service_time', 'queue_size', 'tx_busy', 'rx_busy',
-        'source_intervals', 'num_packets_sent', 'delay', 'sid',
-        'arrival_intervals', 'queue_drop_ratio', 'queue_wait',
-    ])
-    server_class = namedtuple('Server', [
-        'arrival_intervals', 'num_packets_received',
-    ])
 
+def _extract_wired_line_results(sim, keep_network=True):
     # Helper lists and objects:
-    _client_sources = [cli.source for cli in ret.data.clients]
+    _client_sources = [cli.source for cli in sim.data.clients]
     _client_ifaces = [(cli.interfaces[0], cli.interfaces[-1])
-                      for cli in ret.data.clients]
-    _srv = ret.data.server
+                      for cli in sim.data.clients]
+    _srv = sim.data.server
 
     clients = [
-        client_class(
+        WiredLineClient(
             service_time=out_if.transceiver.service_time,
             queue_size=out_if.queue.size_trace,
             tx_busy=out_if.transceiver.tx_busy_trace,
@@ -272,9 +374,16 @@ def wired_line_network(
             queue_wait=out_if.queue.wait_intervals,
         ) for src, (inp_if, out_if) in zip(_client_sources, _client_ifaces)
     ]
-    server = server_class(
+    server = WiredLineServer(
         arrival_intervals=_srv.sink.arrival_intervals.statistic(),
         num_packets_received=_srv.sink.num_packets_received,
     )
+    return SimRet(clients=clients, server=server,
+                  network=(sim.data if keep_network else None))
+
 
-    return simret_class(clients=clients, server=server, network=ret.data)
+def _get_extractor(extract, workers):
+    """Get results extractor. When simulations run in worker processes,
+    the network is not returned, since only results are sent back.
+    """
+    return partial(extract, keep_network=(workers is None or workers == 1))
@@ -0,0 +1,226 @@
+import numpy as np
+from pyqumo.cqumo.randoms import RandomsFactory
+from pyqumo.random import Distribution
+
+from pycsmaca.utilities import SPEED_OF_LIGHT
+
+
+class SlottedCollisionDomain:
+    """Fast slotted model of saturated clients sending to a single server
+    in a collision domain.
+
+    Instead of simulating each station modules with a kernel, all stations
+    are advanced in lock-step over virtual slots, as in Bianchi model:
+    at each slot all stations with zero backoff transmit, and all other
+    stations decrement their backoff counters. If no station transmits,
+    the slot is empty and lasts `slot`. If a single station transmits,
+    the slot is successful and lasts until DIFS after the ACK; otherwise
+    stations collide, and the slot lasts until DIFS after the ACK timeout
+    of the longest frame. Transmitters double their contention windows
+    after collisions (up to `cwmax`) and reset them to `cwmin` after
+    successful transmissions. Since the clients are saturated, the next
+    packet service starts right after the ACK is received. Durations are
+    the same as in `pycsmaca.analytic.bianchi.get_bianchi_slot_times()`
+    with the distance equal to `connection_radius`.
+
+    Consecutive empty slots are skipped at once, so each step simulates
+    a busy slot. Replications are simulated together: states are stored in
+    arrays of shape `(num_replications, num_clients)`.
+
+    Payload size is either a number or a pyqumo `Distribution`.
+
+    After `run()`, results are available as arrays:
+
+    - `stime`: model time of each replication (may slightly exceed
+        the time limit);
+    - `num_empty_slots`, `num_success_slots`, `num_collided_slots`:
+        numbers of slots of each type per replication;
+    - `num_attempts`: number of transmissions by each client;
+    - `get_service_times(replication, client)`,
+        `get_num_retries(replication, client)`: service times and number
+        of transmission attempts of delivered packets;
+    - `get_arrivals(replication)`: times when the server received packets;
+    - `get_delivered_payload(replication)`: total size of received packets.
+    """
+    def __init__(
+            self, num_clients, payload_size, ack_size, mac_header_size,
+            phy_header_size, preamble, bitrate, difs, sifs, slot, cwmin,
+            cwmax, connection_radius=100, speed_of_light=SPEED_OF_LIGHT,
+            replications=1, seed=None):
+        if num_clients < 1:
+            raise ValueError(f'positive number of clients expected, '
+                             f'{num_clients} found')
+        if replications < 1:
+            raise ValueError(f'positive number of replications expected, '
+                             f'{replications} found')
+        if not 0 < cwmin <= cwmax:
+            raise ValueError(f'expected 0 < cwmin <= cwmax, but cwmin={cwmin}'
+                             f' and cwmax={cwmax} found')
+        self.__rng = np.random.default_rng(seed)
+        if isinstance(payload_size, Distribution):
+            # Sample payloads with an engine seeded from `seed`, not with
+            # the default pyqumo engine seeded with the clock:
+            payload_size = payload_size.with_factory(
+                RandomsFactory(int(self.__rng.integers(1 << 32))))
+        else:
+            payload_size = float(payload_size)
+        self.__payload_size = payload_size
+        self.__bitrate = bitrate
+        self.__cwmin = cwmin
+        self.__cwmax = cwmax
+        self.__slot = slot
+
+        propagation = connection_radius / speed_of_light
+        t_ack = preamble + (phy_header_size + ack_size) / bitrate
+        # Frame duration is `t_header + payload / bitrate`:
+        self.__t_header = preamble + (mac_header_size + phy_header_size) / \
+            bitrate
+        # Time from the frame end till the next slot:
+        self.__t_success_tail = sifs + t_ack + 2 * propagation + difs
+        self.__t_collided_tail = sifs + t_ack + 6 * propagation + difs
+        # Time from the frame end till the server receives it and till
+        # the transmitter gets ACK:
+        self.__t_propagation = propagation
+        self.__t_ack_tail = sifs + t_ack + 2 * propagation
+
+        shape = (replications, num_clients)
+        self.__cw = np.full(shape, cwmin)
+        self.__backoff = self.__rng.integers(0, cwmin, size=shape)
+        self.__num_retries = np.ones(shape, dtype=int)
+        self.__started_at = np.zeros(shape)
+        self.__payload = self.__draw_payload(shape)
+        self.__stime = np.full(replications, float(difs))
+
+        self.num_empty_slots = np.zeros(replications, dtype=int)
+        self.num_success_slots = np.zeros(replications, dtype=int)
+        self.num_collided_slots = np.zeros(replications, dtype=int)
+        self.num_attempts = np.zeros(shape, dtype=int)
+        # Chunks of records of delivered packets (replication, client,
+        # service time, number of retries, server arrival time, payload):
+        self.__records = []
+        self.__delivered = None
+
+    @property
+    def num_replications(self):
+        return self.__cw.shape[0]
+
+    @property
+    def num_clients(self):
+        return self.__cw.shape[1]
+
+    @property
+    def stime(self):
+        return self.__stime
+
+    def run(self, sim_time_limit):
+        """Simulate until the model time reaches `sim_time_limit` in all
+        replications. Packets are counted as delivered if ACK is received
+        before the time limit.
+        """
+        slot = self.__slot
+        backoff, cw = self.__backoff, self.__cw
+        stime = self.__stime
+        replications = np.arange(self.num_replications)
+        while True:
+            active = np.flatnonzero(stime < sim_time_limit)
+            if len(active) == 0:
+                break
+
+            # Skip empty slots till the nearest transmission:
+            skip = backoff[active].min(axis=1)
+            backoff[active] -= skip[:, None]
+            stime[active] += skip * slot
+            self.num_empty_slots[active] += skip
+            active = active[stime[active] < sim_time_limit]
+            if len(active) == 0:
+                break
+
+            # Find transmitters and decrement the others counters:
+            mask = np.zeros(backoff.shape, dtype=bool)
+            mask[active] = True
+            transmit = mask & (backoff == 0)
+            backoff[mask & ~transmit] -= 1
+            self.num_attempts += transmit
+            num_transmitters = transmit.sum(axis=1)
+            frame_ends = stime + self.__t_header + np.where(
+                transmit, self.__payload, 0).max(axis=1) / self.__bitrate
+
+            # Successful transmissions:
+            success = replications[num_transmitters == 1]
+            if len(success) > 0:
+                clients = transmit[success].argmax(axis=1)
+                acked_at = frame_ends[success] + self.__t_ack_tail
+                delivered = acked_at <= sim_time_limit
+                self.__records.append(np.column_stack((
+                    success[delivered], clients[delivered],
+                    (acked_at - self.__started_at[success, clients])[
+                        delivered],
+                    self.__num_retries[success, clients][delivered],
+                    (frame_ends[success] + self.__t_propagation)[delivered],
+                    self.__payload[success, clients][delivered],
+                )))
+                self.num_success_slots[success] += 1
+                cw[success, clients] = self.__cwmin
+                self.__num_retries[success, clients] = 1
+                self.__started_at[success, clients] = acked_at
+                self.__payload[success, clients] = \
+                    self.__draw_payload(len(success))
+                stime[success] = frame_ends[success] + self.__t_success_tail
+
+            # Collisions:
+            collided = replications[num_transmitters > 1]
+            if len(collided) > 0:
+                collided_transmit = np.zeros(backoff.shape, dtype=bool)
+                collided_transmit[collided] = transmit[collided]
+                cw[collided_transmit] = np.minimum(
+                    2 * cw[collided_transmit], self.__cwmax)
+                self.__num_retries[collided_transmit] += 1
+                self.num_collided_slots[collided] += 1
+                stime[collided] = frame_ends[collided] + \
+                    self.__t_collided_tail
+
+            # New backoff for all transmitters:
+            backoff[transmit] = self.__rng.integers(0, cw[transmit])
+
+        self.__delivered = None
+        return self
+
+    def get_service_times(self, replication, client):
+        return self.__get_delivered(replication, client)[:, 2]
+
+    def get_num_retries(self, replication, client):
+        return self.__get_delivered(replication, client)[:, 3].astype(int)
+
+    def get_arrivals(self, replication):
+        """Get ascending times of packets arrivals at the server."""
+        records = self.__get_delivered(replication)
+        return np.sort(records[:, 4])
+
+    def get_delivered_payload(self, replication):
+        """Get total size of packets received by the server."""
+        return self.__get_delivered(replication)[:, 5].sum()
+
+    def __get_delivered(self, replication, client=None):
+        if self.__delivered is None:
+            if self.__records:
+                records = np.concatenate(self.__records)
+                self.__records = [records]
+            else:
+                records = np.zeros((0, 6))
+            # Sort records by replication and client, keeping time order:
+            order = np.lexsort((records[:, 1], records[:, 0]))
+            self.__delivered = records[order]
+        records = self.__delivered
+        lo, hi = np.searchsorted(records[:, 0], [replication, replication + 1])
+        records = records[lo:hi]
+        if client is not None:
+            lo, hi = np.searchsorted(records[:, 1], [client, client + 1])
+            records = records[lo:hi]
+        return records
+
+    def __draw_payload(self, size):
+        if isinstance(self.__payload_size, Distribution):
+            num_samples = int(np.prod(size))
+            samples = self.__payload_size.rnd.eval_many(num_samples)
+            return np.reshape(samples, size)
+        return np.full(size, self.__payload_size)
@@ -0,0 +1,320 @@
+import csv
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, shortest_path
+from scipy.spatial import cKDTree
+
+from pycsmaca.simulations.modules import RoutingTables
+
+
+class Topology:
+    """Undirected graph of stations connections.
+
+    Nodes are numbered from 0 to `num_nodes - 1`, edges are given with
+    a sequence of node pairs and optional positive weights (link costs used
+    in routing, all links cost 1 by default). Nodes MAY have positions
+    (e.g., for wireless networks).
+
+    Neighbours are stored in compressed sparse rows: neighbours of the node
+    `i` are `indices[indptr[i]:indptr[i + 1]]`, sorted ascending. In wired
+    networks the `k`-th neighbour of the node is connected via its `k`-th
+    interface, so each directed link (`indptr` position) maps to exactly
+    one interface.
+
+    Topologies are built with constructor or with `from_adjacency()`,
+    `from_csv()`, `grid()`, `from_positions()` and `random_geometric()`.
+    """
+    # Maximum size of distances matrix computed at once in `get_next_hops()`:
+    DISTANCES_SIZE = 1 << 22
+
+    def __init__(self, num_nodes, edges, weights=None, positions=None):
+        if num_nodes < 1:
+            raise ValueError(f'positive number of nodes expected, '
+                             f'{num_nodes} found')
+        edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+        if np.any((edges < 0) | (edges >= num_nodes)):
+            raise ValueError(f'edge nodes must be in [0, {num_nodes - 1}]')
+        if np.any(edges[:, 0] == edges[:, 1]):
+            raise ValueError('self-loops are not allowed')
+        edges = np.sort(edges, axis=1)
+        keys = edges[:, 0] * num_nodes + edges[:, 1]
+        if len(np.unique(keys)) < len(keys):
+            raise ValueError('duplicate edges are not allowed')
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            if weights.shape != (len(edges),):
+                raise ValueError(f'expected {len(edges)} weights, '
+                                 f'{weights.shape} found')
+            if np.any(weights <= 0):
+                raise ValueError('weights must be positive')
+        if positions is not None:
+            positions = np.asarray(positions, dtype=float)
+            if positions.ndim != 2 or len(positions) != num_nodes:
+                raise ValueError(f'expected positions of {num_nodes} nodes, '
+                                 f'array of shape {positions.shape} found')
+        self.__num_nodes = num_nodes
+        self.__edges = edges
+        self.__weights = weights
+        self.__positions = positions
+
+        # Building compressed sparse rows of directed links:
+        sources = np.concatenate((edges[:, 0], edges[:, 1]))
+        targets = np.concatenate((edges[:, 1], edges[:, 0]))
+        order = np.lexsort((targets, sources))
+        self.__indices = targets[order]
+        self.__indptr = np.concatenate(([0], np.cumsum(
+            np.bincount(sources, minlength=num_nodes))))
+        if weights is not None:
+            self.__link_weights = np.concatenate((weights, weights))[order]
+        else:
+            self.__link_weights = np.ones(len(order))
+        # Directed link (j -> i) for each link (i -> j):
+        self.__link_sources = np.repeat(np.arange(num_nodes), self.degrees)
+        self.__link_keys = self.__link_sources * num_nodes + self.__indices
+        self.__reversed_links = self.__find_links(
+            self.__indices, self.__link_sources)
+
+    @classmethod
+    def from_adjacency(cls, adjacency, num_nodes=None, positions=None):
+        """Build topology from adjacency lists: a sequence of neighbours
+        lists, or a dict `node -> neighbours`. Links MAY be listed once
+        (in either direction) or twice.
+        """
+        if isinstance(adjacency, dict):
+            items, max_node = adjacency.items(), -1
+        else:
+            items, max_node = enumerate(adjacency), len(adjacency) - 1
+        edges = set()
+        for node, neighbours in items:
+            max_node = max(max_node, node)
+            for peer in neighbours:
+                max_node = max(max_node, peer)
+                edges.add((min(node, peer), max(node, peer)))
+        if num_nodes is None:
+            num_nodes = max_node + 1
+        return cls(num_nodes, sorted(edges), positions=positions)
+
+    @classmethod
+    def from_csv(cls, path, num_nodes=None, delimiter=','):
+        """Read edges from CSV file with rows `node, node[, weight]`.
+
+        Empty rows, rows starting with `#` and a non-numeric header are
+        skipped. If weights are given, they must be given for all edges.
+        If `num_nodes` is not given, it is the maximum node index plus one.
+        """
+        edges, weights = [], []
+        with open(path, newline='') as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            for line_index, row in enumerate(reader):
+                row = [item.strip() for item in row]
+                if not row or not row[0] or row[0].startswith('#'):
+                    continue
+                try:
+                    edges.append((int(row[0]), int(row[1])))
+                except ValueError:
+                    if line_index == 0:
+                        continue  # header
+                    raise ValueError(f'bad edge in line {line_index + 1}: '
+                                     f'{delimiter.join(row)}')
+                if len(row) > 2 and row[2]:
+                    weights.append(float(row[2]))
+        if weights and len(weights) != len(edges):
+            raise ValueError('weights must be given for all edges or none')
+        if num_nodes is None:
+            num_nodes = int(np.max(edges)) + 1 if edges else 1
+        return cls(num_nodes, edges, weights=(weights or None))
+
+    @classmethod
+    def grid(cls, num_rows, num_cols, distance=1.0):
+        """Build grid of `num_rows x num_cols` nodes, each connected to
+        the nearest neighbours in its row and column. Node `(row, col)` gets
+        index `row * num_cols + col` and position
+        `(col * distance, row * distance)`.
+        """
+        if num_rows < 1 or num_cols < 1:
+            raise ValueError(f'positive grid size expected, '
+                             f'{num_rows}x{num_cols} found')
+        nodes = np.arange(num_rows * num_cols).reshape(num_rows, num_cols)
+        edges = np.concatenate((
+            np.column_stack((nodes[:, :-1].ravel(), nodes[:, 1:].ravel())),
+            np.column_stack((nodes[:-1, :].ravel(), nodes[1:, :].ravel())),
+        ))
+        rows, cols = np.divmod(nodes.ravel(), num_cols)
+        positions = np.column_stack((cols, rows)) * float(distance)
+        return cls(num_rows * num_cols, edges, positions=positions)
+
+    @classmethod
+    def from_positions(cls, positions, radius):
+        """Build topology connecting all nodes within `radius` from each
+        other (e.g., stations in connection radius of each other radios).
+        """
+        positions = np.asarray(positions, dtype=float)
+        if radius <= 0:
+            raise ValueError(f'positive radius expected, {radius} found')
+        edges = cKDTree(positions).query_pairs(radius, output_type='ndarray')
+        return cls(len(positions), edges, positions=positions)
+
+    @classmethod
+    def random_geometric(cls, num_nodes, radius, width=1.0, height=None,
+                         seed=None):
+        """Build random geometric graph: nodes are placed uniformly in
+        the `width x height` rectangle (square by default) and connected if
+        they are within `radius` from each other. The graph MAY be
+        disconnected, see `is_connected()`.
+        """
+        rng = np.random.default_rng(seed)
+        height = width if height is None else height
+        positions = rng.uniform(size=(num_nodes, 2)) * [width, height]
+        return cls.from_positions(positions, radius)
+
+    @property
+    def num_nodes(self):
+        return self.__num_nodes
+
+    @property
+    def num_edges(self):
+        return len(self.__edges)
+
+    @property
+    def edges(self):
+        """Array of shape `(num_edges, 2)`, each row is sorted ascending."""
+        return self.__edges
+
+    @property
+    def weights(self):
+        return self.__weights
+
+    @property
+    def positions(self):
+        return self.__positions
+
+    @property
+    def indptr(self):
+        return self.__indptr
+
+    @property
+    def indices(self):
+        return self.__indices
+
+    @property
+    def degrees(self):
+        return np.diff(self.__indptr)
+
+    @property
+    def link_sources(self):
+        """Source node of each directed link."""
+        return self.__link_sources
+
+    @property
+    def reversed_links(self):
+        """Index of the directed link `(j -> i)` for each link `(i -> j)`."""
+        return self.__reversed_links
+
+    def get_neighbours(self, node):
+        return self.__indices[self.__indptr[node]:self.__indptr[node + 1]]
+
+    def is_connected(self):
+        hops = self.get_next_hops([0])
+        return self.__num_nodes == 1 or bool(np.all(hops[1:, 0] >= 0))
+
+    def get_next_hops(self, destinations=None):
+        """Get next hops of shortest paths to the destinations.
+
+        Returns array of shape `(num_nodes, num_destinations)`, where
+        the item `[i, j]` is the node next to `i` on the shortest path from
+        `i` to `destinations[j]`, or -1 if the destination is unreachable
+        or equals `i`. All nodes are destinations by default.
+
+        Since links are undirected, paths from all nodes to the destination
+        are found with a single pass started from the destination:
+        the predecessor of the node on the path from the destination is its
+        next hop towards it. If weights are not given, the pass is BFS,
+        otherwise Dijkstra passes are run by SciPy for many destinations
+        at once.
+        """
+        if destinations is None:
+            destinations = np.arange(self.__num_nodes)
+        destinations = np.asarray(destinations, dtype=int).reshape(-1)
+        # Links are stored in both directions, so the graph is directed:
+        graph = csr_matrix(
+            (self.__link_weights, self.__indices, self.__indptr),
+            shape=(self.__num_nodes, self.__num_nodes))
+        next_hops = np.empty((self.__num_nodes, len(destinations)),
+                             dtype=np.int32)
+        if self.__weights is None:
+            for column, destination in enumerate(destinations.tolist()):
+                _, next_hops[:, column] = breadth_first_order(
+                    graph, destination, directed=True,
+                    return_predecessors=True)
+        else:
+            # Destinations are processed in chunks to bound the memory used
+            # for distances matrices:
+            chunk = max(1, self.DISTANCES_SIZE // self.__num_nodes)
+            for start in range(0, len(destinations), chunk):
+                _, predecessors = shortest_path(
+                    graph, method='D', directed=True,
+                    indices=destinations[start:start + chunk],
+                    return_predecessors=True)
+                next_hops[:, start:start + chunk] = predecessors.T
+        next_hops[next_hops < 0] = -1
+        return next_hops
+
+    def get_routing_tables(self, destinations=None, interface_per_edge=True,
+                           first_address=1):
+        """Build `RoutingTables` of all nodes switches to `destinations`
+        (all nodes by default), see `get_next_hops()`.
+
+        If `interface_per_edge` is `True` (wired networks), each node has
+        an interface per neighbour, and the interface of the `k`-th
+        neighbour link of the node `i` gets address
+        `first_address + indptr[i] + k`. Otherwise (wireless networks),
+        each node has a single interface with address `first_address + i`.
+        """
+        if destinations is None:
+            destinations = np.arange(self.__num_nodes)
+        destinations = np.asarray(destinations, dtype=int).reshape(-1)
+        next_nodes = self.get_next_hops(destinations)
+        no_route = next_nodes < 0
+        next_nodes[no_route] = 0
+
+        if interface_per_edge:
+            if self.num_edges == 0:
+                raise ValueError('no interfaces in topology without edges')
+            links = self.__find_links(
+                np.arange(self.__num_nodes)[:, None], next_nodes)
+            ports = links - self.__indptr[:-1, None]
+            next_hops = first_address + self.__reversed_links[links]
+            indptr = self.__indptr.tolist()
+            address_columns = {
+                first_address + link: column
+                for column, node in enumerate(destinations.tolist())
+                for link in range(indptr[node], indptr[node + 1])
+            }
+        else:
+            ports = np.zeros(next_nodes.shape, dtype=int)
+            next_hops = first_address + next_nodes
+            address_columns = {
+                first_address + node: column
+                for column, node in enumerate(destinations.tolist())
+            }
+
+        ports[no_route] = 0
+        port_type = np.int16 if ports.max(initial=0) < (1 << 15) else np.int32
+        ports = ports.astype(port_type)
+        ports[no_route] = -1
+        next_hops = next_hops.astype(np.int32)
+        next_hops[no_route] = -1
+        return RoutingTables(address_columns, ports, next_hops)
+
+    def __find_links(self, sources, targets):
+        """Get indices of directed links `(sources -> targets)`. Links keys
+        are sorted, since rows are sorted by sources and then by targets.
+        Results for missing links are undefined.
+        """
+        links = np.searchsorted(
+            self.__link_keys, sources * self.__num_nodes + targets)
+        return np.minimum(links, max(len(self.__link_keys) - 1, 0))
+
+    def __str__(self):
+        return f'Topology(nodes={self.__num_nodes}, edges={self.num_edges})'
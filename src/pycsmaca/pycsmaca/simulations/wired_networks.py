@@ -1,7 +1,7 @@
 from pydesim import Model
 
 from pycsmaca.simulations.modules import RandomSource, WiredTransceiver, Queue, \
-    WiredInterface
+    WiredInterface, SwitchTable
 from pycsmaca.simulations.modules.station import Station
 
 
@@ -178,3 +178,98 @@ class WiredLineNetwork(Model):
             num_packets_received=_srv.sink.num_packets_received,
         )
         return (client_fields, clients), (server_fields, server)
+
+
+class WiredTopologyNetwork(Model):
+    """Wired network of arbitrary topology (`sim.params.topology`).
+
+    Each link of the `Topology` is a wire between two interfaces: the `k`-th
+    neighbour of the station is connected via its `k`-th interface. All wires
+    have the same propagation delay `distance / speed_of_light`.
+
+    Stations listed in `active_sources` send packets to the station with
+    index `server` (0 by default). Routes to the server are computed at once
+    with `Topology.get_routing_tables()` and shared by all switches.
+    """
+    def __init__(self, sim):
+        super().__init__(sim)
+
+        topology = sim.params.topology
+        if topology.num_nodes < 2:
+            raise ValueError('minimum number of stations in network is 2')
+        self.__topology = topology
+        self.__server = sim.params.get('server', 0)
+        if topology.degrees[self.__server] == 0:
+            raise ValueError(f'server {self.__server} has no links')
+        self.__routes = topology.get_routing_tables(
+            [self.__server], interface_per_edge=True)
+        active_sources = set(sim.params.active_sources)
+
+        # Building stations, interfaces are numbered as directed links:
+        stations, all_interfaces = [], []
+        indptr = topology.indptr.tolist()
+        for i in range(topology.num_nodes):
+            if i in active_sources:
+                source = RandomSource(
+                    sim, sim.params.payload_size, sim.params.source_interval,
+                    source_id=i, dest_addr=self.destination_address
+                )
+            else:
+                source = None
+            interfaces = []
+            for link in range(indptr[i], indptr[i + 1]):
+                transceiver = WiredTransceiver(
+                    sim, bitrate=sim.params.bitrate,
+                    header_size=sim.params.header_size,
+                    preamble=sim.params.preamble,
+                    ifs=sim.params.ifs,
+                )
+                interfaces.append(
+                    WiredInterface(sim, link + 1, Queue(sim), transceiver))
+            all_interfaces.extend(interfaces)
+            stations.append(Station(
+                sim, source=source, interfaces=interfaces,
+                switch_table=SwitchTable(self.__routes, i)))
+        self.children['stations'] = stations
+
+        # Connecting interfaces of each link, both directions have delays
+        # since packets MAY go both ways:
+        delay = sim.params.distance / sim.params.speed_of_light
+        reversed_links = topology.reversed_links.tolist()
+        for link, reversed_link in enumerate(reversed_links):
+            if link < reversed_link:
+                if1, if2 = all_interfaces[link], all_interfaces[reversed_link]
+                if1.connections.set('wire', if2, rname='wire').delay = delay
+                if2.connections['wire'].delay = delay
+
+    @property
+    def topology(self):
+        return self.__topology
+
+    @property
+    def routes(self):
+        return self.__routes
+
+    @property
+    def destination_address(self):
+        return int(self.__topology.indptr[self.__server]) + 1
+
+    @property
+    def stations(self):
+        return self.children['stations']
+
+    @property
+    def clients(self):
+        return [sta for i, sta in enumerate(self.stations)
+                if i != self.__server]
+
+    @property
+    def server(self):
+        return self.stations[self.__server]
+
+    @property
+    def num_stations(self):
+        return len(self.stations)
+
+    def __str__(self):
+        return 'Network'
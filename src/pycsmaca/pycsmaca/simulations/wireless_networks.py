@@ -1,19 +1,22 @@
 from math import pi, cos, sin
 
-from numpy.random.mtrand import uniform
+import numpy as np
 from pydesim import Model
 
 from pycsmaca.simulations.modules import RandomSource, Queue, Transmitter, \
-    Receiver, Radio, ConnectionManager, WirelessInterface, SaturatedQueue
+    Receiver, Radio, ConnectionManager, WirelessInterface, SaturatedQueue, \
+    SwitchTable
 from pycsmaca.simulations.modules.app_layer import ControlledSource
 from pycsmaca.simulations.modules.station import Station
 
 
 class _HalfDuplexNetworkBase(Model):
-    def __init__(self, sim):
+    def __init__(self, sim, num_stations=None):
         super().__init__(sim)
 
-        if sim.params.num_stations < 2:
+        if num_stations is None:
+            num_stations = sim.params.num_stations
+        if num_stations < 2:
             raise ValueError('minimum number of stations in network is 2')
 
         # Building connection manager:
@@ -22,7 +25,7 @@ class _HalfDuplexNetworkBase(Model):
         self.__stations = []
 
         conn_radius = sim.params.connection_radius
-        for i in range(sim.params.num_stations):
+        for i in range(num_stations):
             # Building elementary components:
             source = self.create_source(i)
             max_propagation = conn_radius / sim.params.speed_of_light
@@ -40,7 +43,8 @@ class _HalfDuplexNetworkBase(Model):
                                       receiver, radio)
 
             # Building station:
-            sta = Station(sim, source=source, interfaces=[iface])
+            sta = Station(sim, source=source, interfaces=[iface],
+                          switch_table=self.create_switch_table(i))
             self.__stations.append(sta)
 
             # Writing switching table:
@@ -49,6 +53,11 @@ class _HalfDuplexNetworkBase(Model):
         # Adding stations as children:
         self.children['stations'] = self.__stations
 
+        # Connecting radios at once (their own registration at time 0
+        # finds them registered and does nothing):
+        self.__conn_manager.add_radios(
+            [sta.interfaces[0].radio for sta in self.__stations])
+
     @property
     def destination_address(self):
         raise NotImplementedError
@@ -65,6 +74,9 @@ class _HalfDuplexNetworkBase(Model):
     def write_switch_table(self, index):
         raise NotImplementedError
 
+    def create_switch_table(self, index):
+        return None
+
     @property
     def stations(self):
         return self.__stations
@@ -218,6 +230,77 @@ class WirelessHalfDuplexLineNetwork(_HalfDuplexNetworkBase):
         return self.stations[-1]
 
 
+class WirelessTopologyNetwork(_HalfDuplexNetworkBase):
+    """Multi-hop wireless network of arbitrary topology
+    (`sim.params.topology`).
+
+    Stations are placed at the topology nodes positions. Packets are routed
+    along the topology links, so each link must be within the connection
+    radius (e.g., the topology is built with `Topology.from_positions()`
+    or `Topology.random_geometric()` with the same radius). Stations listed
+    in `active_sources` send packets to the station with index `server`
+    (0 by default). Routes to the server are computed at once with
+    `Topology.get_routing_tables()` and shared by all switches.
+    """
+    def __init__(self, sim):
+        topology = sim.params.topology
+        if topology.positions is None:
+            raise ValueError('topology nodes positions are required')
+        edges = topology.edges
+        lengths = np.linalg.norm(topology.positions[edges[:, 0]] -
+                                 topology.positions[edges[:, 1]], axis=1)
+        if np.any(lengths > sim.params.connection_radius):
+            raise ValueError('topology links must be within the connection '
+                             'radius')
+        self.__topology = topology
+        self.__server = sim.params.get('server', 0)
+        self.__routes = topology.get_routing_tables(
+            [self.__server], interface_per_edge=False)
+        self.__active_sources = set(sim.params.active_sources)
+        super().__init__(sim, num_stations=topology.num_nodes)
+
+    @property
+    def topology(self):
+        return self.__topology
+
+    @property
+    def routes(self):
+        return self.__routes
+
+    @property
+    def destination_address(self):
+        return self.__server + 1
+
+    def create_source(self, index):
+        if index in self.__active_sources:
+            return RandomSource(
+                self.sim,
+                self.sim.params.payload_size,
+                self.sim.params.source_interval,
+                source_id=index,
+                dest_addr=self.destination_address
+            )
+        return None
+
+    def get_position(self, index):
+        return tuple(self.__topology.positions[index])
+
+    def create_switch_table(self, index):
+        return SwitchTable(self.__routes, index)
+
+    def write_switch_table(self, index):
+        pass  # routes are shared, see `create_switch_table()`
+
+    @property
+    def clients(self):
+        return [sta for i, sta in enumerate(self.stations)
+                if i != self.__server]
+
+    @property
+    def server(self):
+        return self.stations[self.__server]
+
+
 class CollisionDomainNetwork(_HalfDuplexNetworkBase):
     def __init__(self, sim):
         super().__init__(sim)
@@ -237,7 +320,9 @@ class CollisionDomainNetwork(_HalfDuplexNetworkBase):
 
     def get_position(self, index):
         area_radius = self.sim.params.connection_radius / 2.1
-        distance, angle = uniform(0.1, 1) * area_radius, uniform(0, 2 * pi)
+        rng = self.sim.rng
+        distance = rng.uniform(0.1, 1) * area_radius
+        angle = rng.uniform(0, 2 * pi)
         position = (distance * cos(angle), distance * sin(angle))
         return position
 
@@ -0,0 +1,156 @@
+from math import floor
+
+import pytest
+from numpy.testing import assert_allclose
+from pydesim import simulate
+from pyqumo.random import Exponential
+
+from pycsmaca.simulations import WiredTopologyNetwork, \
+    WirelessTopologyNetwork, Topology
+
+
+SIM_TIME_LIMIT = 1000
+PAYLOAD_SIZE = 100.0        # 100 bits data payload
+SOURCE_INTERVAL = 1.0       # 1 second between packets
+HEADER_SIZE = 10            # 10 bits header
+BITRATE = 500               # 500 bps
+DISTANCE = 500              # 500 meters between stations
+SPEED_OF_LIGHT = 10000      # 10 kilometers per second speed of light
+IFS = 0.00001
+PREAMBLE = 0
+
+
+def test_wired_topology_network_with_line_topology():
+    """Validate that a packet from the first station of a wired line
+    topology to the last one is forwarded by all intermediate stations.
+    """
+    topology = Topology.from_adjacency([[1], [2], [3], []])
+    sr = simulate(
+        WiredTopologyNetwork,
+        stime_limit=SIM_TIME_LIMIT,
+        params=dict(
+            topology=topology, server=3, active_sources=[0],
+            payload_size=PAYLOAD_SIZE, source_interval=SOURCE_INTERVAL,
+            header_size=HEADER_SIZE, bitrate=BITRATE, distance=DISTANCE,
+            speed_of_light=SPEED_OF_LIGHT, preamble=PREAMBLE, ifs=IFS,
+        ),
+    )
+    client, server = sr.data.stations[0], sr.data.server
+    assert server is sr.data.stations[3]
+
+    expected_number_of_packets = floor(SIM_TIME_LIMIT / SOURCE_INTERVAL)
+    assert client.source.num_packets_sent == expected_number_of_packets
+    assert (expected_number_of_packets - 1 <=
+            server.sink.num_packets_received <= expected_number_of_packets)
+
+    hop_delay = DISTANCE / SPEED_OF_LIGHT + (
+            PAYLOAD_SIZE + HEADER_SIZE) / BITRATE
+    assert_allclose(
+        server.sink.source_delays[0].mean(), 3 * hop_delay, rtol=0.1)
+
+    assert client.get_interface_to(sr.data.stations[1]) is \
+        client.interfaces[0]
+    assert sr.data.stations[2].get_interface_to(server) is \
+        sr.data.stations[2].interfaces[1]
+
+
+@pytest.mark.parametrize('server', [0, 4, 8])
+def test_wired_topology_network_with_grid_topology(server):
+    topology = Topology.grid(3, 3)
+    active_sources = [i for i in range(9) if i != server]
+    sr = simulate(
+        WiredTopologyNetwork,
+        stime_limit=SIM_TIME_LIMIT,
+        params=dict(
+            topology=topology, server=server, active_sources=active_sources,
+            payload_size=PAYLOAD_SIZE, source_interval=10 * SOURCE_INTERVAL,
+            header_size=HEADER_SIZE, bitrate=BITRATE, distance=DISTANCE,
+            speed_of_light=SPEED_OF_LIGHT, preamble=PREAMBLE, ifs=IFS,
+        ),
+    )
+    network = sr.data
+    assert network.num_stations == 9
+    assert len(network.clients) == 8
+
+    num_sent = sum(sta.source.num_packets_sent for sta in network.clients)
+    num_received = network.server.sink.num_packets_received
+    assert num_sent - len(active_sources) <= num_received <= num_sent
+    for sid in active_sources:
+        assert sid in network.server.sink.source_delays
+
+
+def test_wireless_topology_network_forwards_packets_over_multiple_hops():
+    # Stations are placed in line, so that only the nearest neighbours are
+    # in connection radius:
+    positions = [(i * DISTANCE, 0) for i in range(4)]
+    topology = Topology.from_positions(positions, radius=1.5 * DISTANCE)
+    assert topology.num_edges == 3
+    sr = simulate(
+        WirelessTopologyNetwork,
+        stime_limit=SIM_TIME_LIMIT,
+        params=dict(
+            topology=topology, server=0, active_sources=[3],
+            payload_size=PAYLOAD_SIZE, source_interval=6 * SOURCE_INTERVAL,
+            mac_header_size=50, phy_header_size=25, ack_size=100,
+            preamble=1e-3, bitrate=1000, difs=200e-3, sifs=100e-3,
+            slot=50e-3, cwmin=2, cwmax=8, connection_radius=1.5 * DISTANCE,
+            speed_of_light=SPEED_OF_LIGHT, queue_capacity=None,
+        ),
+    )
+    client, server = sr.data.stations[3], sr.data.server
+    num_sent = client.source.num_packets_sent
+    assert num_sent > 0
+    assert num_sent - 1 <= server.sink.num_packets_received <= num_sent
+    # Intermediate stations transmitted the packets, but did not receive
+    # them at the application layer:
+    for sta in sr.data.stations[1:3]:
+        assert sta.interfaces[0].transmitter.num_sent >= num_sent - 1
+        assert sta.sink.num_packets_received == 0
+
+
+def test_wireless_topology_network_requires_links_within_radius():
+    topology = Topology.grid(2, 2, distance=DISTANCE)
+    with pytest.raises(ValueError):
+        simulate(
+            WirelessTopologyNetwork, stime_limit=1,
+            params=dict(topology=topology, active_sources=[],
+                        connection_radius=DISTANCE / 2),
+        )
+
+
+def _save_checkpoint(sim, path):
+    sim.checkpoint(path)
+
+
+def test_wireless_topology_network_resumed_from_checkpoint(tmp_path):
+    """Validate that a network with pyqumo distributions can be saved in
+    the middle of the run and continued with the same results.
+    """
+    path = str(tmp_path / 'network.ckpt')
+    positions = [(i * DISTANCE, 0) for i in range(4)]
+    params = dict(
+        topology=Topology.from_positions(positions, radius=1.5 * DISTANCE),
+        server=0, active_sources=[2, 3],
+        payload_size=Exponential(1 / PAYLOAD_SIZE),
+        source_interval=Exponential(1 / (6 * SOURCE_INTERVAL)),
+        mac_header_size=50, phy_header_size=25, ack_size=100,
+        preamble=1e-3, bitrate=1000, difs=200e-3, sifs=100e-3,
+        slot=50e-3, cwmin=2, cwmax=8, connection_radius=1.5 * DISTANCE,
+        speed_of_light=SPEED_OF_LIGHT, queue_capacity=None,
+    )
+
+    def get_results(sim):
+        sink = sim.data.server.sink
+        return (sim.num_events,
+                [sim.data.stations[i].source.num_packets_sent for i in (2, 3)],
+                sink.num_packets_received, sink.source_delays[3].as_tuple())
+
+    expected = simulate(WirelessTopologyNetwork, stime_limit=300,
+                        params=params, seed=3)
+    simulate(WirelessTopologyNetwork, stime_limit=300, params=params, seed=3,
+             init=lambda sim: sim.schedule(150, _save_checkpoint,
+                                           args=(path,)))
+    resumed = simulate(resume_from=path, stime_limit=300)
+
+    assert resumed.stime == expected.stime
+    assert get_results(resumed) == get_results(expected)
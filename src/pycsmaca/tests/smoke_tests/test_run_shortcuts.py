@@ -1,11 +1,14 @@
 import pytest
 from numpy.random.mtrand import randint
 from numpy.testing import assert_allclose
-from pydesim import Logger
-from pyqumo.distributions import Exponential
+from pydesim import Logger, Model, simulate
+from pyqumo.random import Exponential
+
+# Registers the default pyqumo engine seeder:
+import pycsmaca.simulations  # noqa: F401
 
 SIM_TIME_LIMIT = 1000
-PAYLOAD_SIZE = Exponential(100.0)      # 100 bits data payload in average
+PAYLOAD_SIZE = Exponential(1 / 100.0)  # 100 bits data payload in average
 INTERVAL_MEAN = 5.0         # 5 second between packets in average
 MAC_HEADER = 50             # bits
 PHY_HEADER = 25             # bits
@@ -34,7 +37,7 @@ def test_collision_domain_network():
     sr = collision_domain_network(
         num_clients=num_clients,
         payload_size=PAYLOAD_SIZE,
-        source_interval=Exponential(INTERVAL_MEAN),
+        source_interval=Exponential(1 / INTERVAL_MEAN),
         ack_size=ACK_SIZE,
         mac_header_size=MAC_HEADER,
         phy_header_size=PHY_HEADER,
@@ -145,7 +148,7 @@ def test_wireless_half_duplex_line_network():
     sr = wireless_half_duplex_line_network(
         num_clients=num_clients,
         payload_size=PAYLOAD_SIZE,
-        source_interval=Exponential(INTERVAL_MEAN),
+        source_interval=Exponential(1 / INTERVAL_MEAN),
         active_sources=active_sources,
         ack_size=ACK_SIZE,
         mac_header_size=MAC_HEADER,
@@ -208,7 +211,7 @@ def test_wired_line_network():
     sr = wired_line_network(
         num_clients=num_clients,
         payload_size=PAYLOAD_SIZE,
-        source_interval=Exponential(INTERVAL_MEAN),
+        source_interval=Exponential(1 / INTERVAL_MEAN),
         header_size=(MAC_HEADER + PHY_HEADER),
         bitrate=BITRATE,
         preamble=PREAMBLE,
@@ -247,3 +250,75 @@ def test_wired_line_network():
         sr.clients[-1].num_packets_sent,
         rtol=0.25
     )
+
+
+def test_collision_domain_network_replications_in_workers():
+    from pycsmaca.simulations.shortcuts import collision_domain_network
+
+    def run(workers):
+        return collision_domain_network(
+            num_clients=2,
+            payload_size=PAYLOAD_SIZE,
+            source_interval=Exponential(1 / INTERVAL_MEAN),
+            ack_size=ACK_SIZE,
+            mac_header_size=MAC_HEADER,
+            phy_header_size=PHY_HEADER,
+            preamble=PREAMBLE,
+            bitrate=BITRATE,
+            difs=DIFS,
+            sifs=SIFS,
+            slot=SLOT,
+            cwmin=CWMIN,
+            cwmax=CWMAX,
+            connection_radius=CONNECTION_RADIUS,
+            speed_of_light=SPEED_OF_LIGHT,
+            sim_time_limit=100,
+            log_level=Logger.Level.WARNING,
+            replications=3,
+            workers=workers,
+            seed=1,
+        )
+
+    sequential, parallel = run(workers=None), run(workers=3)
+
+    assert len(parallel) == 3
+    for seq_ret, par_ret in zip(sequential, parallel):
+        assert seq_ret.network is not None
+        assert par_ret.network is None  # only results are sent by workers
+        assert par_ret.server.num_rx_success > 0
+        assert all(cli.num_packets_sent > 0 for cli in par_ret.clients)
+
+    # Seeded replications differ, but repeat regardless of workers:
+    intervals = [ret.server.arrival_intervals.mean() for ret in parallel]
+    assert len(set(intervals)) == 3
+    assert intervals == [
+        ret.server.arrival_intervals.mean() for ret in sequential]
+
+
+DEFAULT_ENGINE_INTERVAL = Exponential(1.0)  # sampled with default engine
+
+
+class _DefaultEngineSampler(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.samples = []
+        sim.schedule(0, self.draw)
+
+    def draw(self):
+        interval = DEFAULT_ENGINE_INTERVAL()
+        self.samples.append(interval)
+        self.sim.schedule(interval, self.draw)
+
+
+def _get_samples(sim):
+    return sim.data.samples
+
+
+def test_replications_in_workers_reseed_default_pyqumo_engine():
+    def run():
+        return simulate(_DefaultEngineSampler, stime_limit=20, replications=2,
+                        workers=2, seed=1, extract=_get_samples)
+
+    first, second = run(), run()
+    assert first[0] != first[1]
+    assert first == second
@@ -1,7 +1,8 @@
 import pytest
 from numpy import argmin, cumsum, inf, asarray
 from pydesim import Model, simulate, Statistic, Intervals
-from unittest.mock import Mock, patch, ANY
+from unittest.mock import Mock, patch, ANY, PropertyMock
+from pyqumo.random import Distribution, Exponential
 from pycsmaca.simulations.modules.app_layer import RandomSource, AppData, \
     Sink, ControlledSource
 
@@ -27,13 +28,17 @@ def test_random_source_generates_packets():
     """
     # First, we create the `RandomSource` module, validate it is
     # inherited from `pydesim.Module` and check that upon construction source
-    # scheduled the next packet arrival as specified by `interval` parameter:
+    # scheduled the first interval drawing at time 0 (when the module is
+    # already in the model tree), and then the next packet arrival as
+    # specified by `interval` parameter:
     sim = Mock()
     sim.stime = 0
     source = RandomSource(sim, data_size=Mock(return_value=42),
                           interval=Mock(side_effect=(74, 21)), source_id=34,
                           dest_addr=13)
     assert isinstance(source, Model)
+    sim.schedule.assert_called_once_with(0, source._schedule_next_arrival)
+    source._schedule_next_arrival()
     sim.schedule.assert_called_with(74, source._generate)
 
     # Define a mock for NetworkLayer module and establish a connection:
@@ -73,6 +78,7 @@ def test_random_source_can_use_constant_distributions():
     sim.stime = 0
     source = RandomSource(
         sim, data_size=123, interval=34, source_id=0, dest_addr=1)
+    source._schedule_next_arrival()
 
     network_service_mock = Mock()
     source.connections['network'] = network_service_mock
@@ -97,6 +103,7 @@ def test_random_source_can_use_finite_intervals_distributions():
     sim.stime = 0
     source = RandomSource(
         sim, data_size=123, interval=(34, 42,), source_id=0, dest_addr=1)
+    source._schedule_next_arrival()
 
     network_service_mock = Mock()
     source.connections['network'] = network_service_mock
@@ -180,6 +187,92 @@ def test_random_source_provides_statistics():
     assert ret.data.source.num_packets_sent == 4
 
 
+# noinspection PyProtectedMember
+def test_random_source_draws_distributions_in_blocks():
+    """Validate that pyqumo distributions are sampled in blocks of the given
+    size with the same random variable, so its state is kept between blocks.
+    """
+    def create_distribution(values):
+        values = iter(values)
+        dist = Mock(spec=Distribution)
+        dist.with_factory.return_value = dist
+        dist.rnd.eval_many.side_effect = \
+            lambda size: asarray([next(values) for _ in range(size)])
+        return dist
+
+    sim = Mock()
+    sim.stime = 0
+    interval = create_distribution(range(10, 100))
+    data_size = create_distribution(range(500, 600))
+    source = RandomSource(sim, data_size=data_size, interval=interval,
+                          source_id=0, dest_addr=1, block_size=3)
+    source.connections['network'] = Mock()
+    assert source.block_size == 3
+
+    with patch.object(RandomSource, 'rng', new_callable=PropertyMock) as rng:
+        rng.return_value.integers.return_value = 1
+        source._schedule_next_arrival()
+        sim.schedule.assert_called_with(10, source._generate)
+        interval.rnd.eval_many.assert_called_once_with(3)
+        interval.with_factory.assert_called_once_with(ANY)
+
+        sizes = []
+        with patch('pycsmaca.simulations.modules.app_layer.AppData') \
+                as AppDataMock:
+            for i in range(7):
+                source._generate()
+                sizes.append(AppDataMock.call_args[1]['size'])
+                sim.schedule.assert_called_with(11 + i, source._generate)
+
+    assert sizes == list(range(500, 507))
+    assert interval.rnd.eval_many.call_count == 3
+    assert data_size.rnd.eval_many.call_count == 3
+    interval.assert_not_called()
+    data_size.assert_not_called()
+
+
+def test_random_source_samples_distributions_with_module_streams():
+    """Validate that pyqumo distributions are sampled with engines seeded
+    from the module streams: the same seed gives the same samples, while
+    sources in different places of the model tree get different samples.
+    """
+    class TestModel(Model):
+        def __init__(self, sim):
+            super().__init__(sim)
+            self.network = DummyModel(sim, 'Network')
+            self.sources = [
+                RandomSource(sim, source_id=i, dest_addr=13,
+                             data_size=Exponential(0.01),
+                             interval=Exponential(1.0), block_size=16)
+                for i in range(2)
+            ]
+            for source in self.sources:
+                source.connections['network'] = self.network
+            self.children['network'] = self.network
+            self.children['sources'] = self.sources
+
+    def run(seed):
+        sources = simulate(TestModel, stime_limit=100, seed=seed).data.sources
+        return [(source.arrival_intervals.as_tuple(),
+                 source.data_size_stat.as_tuple()) for source in sources]
+
+    first, second, other = run(seed=1), run(seed=1), run(seed=2)
+    assert all(len(sizes) > 50 for _, sizes in first)
+    assert first == second
+    assert first != other
+    assert first[0][0] != first[1][0] and first[0][1] != first[1][1]
+
+
+def test_source_block_size_defaults_to_params():
+    """Validate that block size is taken from `source_block_size` parameter.
+    """
+    sim = Mock()
+    sim.params.get.return_value = 16
+    source = ControlledSource(sim, data_size=10, source_id=0, dest_addr=1)
+    assert source.block_size == 16
+    sim.params.get.assert_called_with('source_block_size', 1024)
+
+
 #############################################################################
 # TEST AppData PACKETS
 #############################################################################
@@ -6,7 +6,9 @@ from numpy.testing import assert_almost_equal, assert_allclose
 
 from pycsmaca.analytic.bianchi import get_bianchi_model_parameters, \
     get_bianchi_chain_state_index, get_bianchi_slot_times, \
-    get_bianchi_time_matrix
+    get_bianchi_time_matrix, solve_bianchi_model_parameters, \
+    get_bianchi_grid, get_bianchi_collision_probability, \
+    get_bianchi_throughput
 
 
 @pytest.mark.parametrize('num_clients, cwmin, cwmax, n, m, w, p, tau', [
@@ -23,6 +25,60 @@ def test_bianchi_model_parameters(num_clients, cwmin, cwmax, n, m, w, p, tau):
     assert_almost_equal(ret.tau, tau, decimal=2)
 
 
+def test_solve_bianchi_model_parameters_for_arrays():
+    num_clients = asarray([5, 5, 3, 1, 50])
+    cwmin = asarray([4, 2, 8, 4, 16])
+    cwmax = asarray([4, 8, 16, 64, 1024])
+
+    ret = solve_bianchi_model_parameters(num_clients, cwmin, cwmax)
+    assert ret.shape == (5,)
+    for i in range(5):
+        expected = get_bianchi_model_parameters(
+            num_clients[i], cwmin[i], cwmax[i])
+        assert ret[i]['n'] == expected.n
+        assert ret[i]['W'] == expected.W
+        assert ret[i]['m'] == expected.m
+        assert_almost_equal(ret[i]['p'], expected.p, decimal=8)
+        assert_almost_equal(ret[i]['tau'], expected.tau, decimal=8)
+
+
+def test_solve_bianchi_model_parameters_validates_windows():
+    with pytest.raises(ValueError):
+        solve_bianchi_model_parameters(5, 4, 12)
+    with pytest.raises(ValueError):
+        solve_bianchi_model_parameters(5, 8, 4)
+
+
+def test_bianchi_grid():
+    kwargs = dict(payload=1000, ack=250, machdr=100, phyhdr=50,
+                  preamble=0.05, bitrate=500, difs=0.5, sifs=0.25, slot=0.1,
+                  distance=10, c=200)
+    num_clients = asarray([2, 10, 30])[:, None]
+    cwmin = asarray([4, 16])
+
+    grid = get_bianchi_grid(num_clients, cwmin, cwmin * 8, **kwargs)
+    assert grid.shape == (3, 2)
+
+    # Slot times are the same as means of `get_bianchi_slot_times()`:
+    prop = 10 / 200
+    ddsa = 0.5 + 0.05 + (50 + 100) / 500 + 0.25 + 0.05 + (50 + 250) / 500
+    t_data = ddsa + 2 * prop + 1000 / 500
+    t_collided = ddsa + 6 * prop + 1000 / 500
+    assert_allclose(grid['t_empty'], 0.1)
+    assert_allclose(grid['t_data'], t_data)
+    assert_allclose(grid['t_collided'], t_collided)
+
+    for i, n in enumerate(num_clients[:, 0]):
+        for j, w in enumerate(cwmin):
+            params = get_bianchi_model_parameters(n, w, w * 8)
+            assert_almost_equal(grid[i, j]['p'], params.p, decimal=8)
+            assert_almost_equal(
+                grid[i, j]['p_collision'],
+                get_bianchi_collision_probability(params), decimal=8)
+            assert_allclose(grid[i, j]['throughput'], get_bianchi_throughput(
+                params, 1000, 0.1, t_data, t_collided), rtol=1e-7)
+
+
 @pytest.mark.parametrize('stage, backoff, cwmin, expected', [
     (0, 0, 2, 0),
     (0, 3, 4, 3),
@@ -35,6 +91,7 @@ def test_bianchi_chain_state_index(stage, backoff, cwmin, expected):
 
 
 def test_bianchi_slot_times():
+    pytest.importorskip('pyqumo.distributions')
     payload = 1000
     ack = 250
     machdr = 100
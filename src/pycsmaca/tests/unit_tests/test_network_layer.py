@@ -1,10 +1,11 @@
 from unittest.mock import Mock, patch, MagicMock
 
+import numpy as np
 import pytest
 from pydesim import Model
 
 from pycsmaca.simulations.modules.network_layer import NetworkService, \
-    NetworkPacket, SwitchTable, NetworkSwitch
+    NetworkPacket, SwitchTable, NetworkSwitch, RoutingTables
 
 NET_PACKET_CLASS = 'pycsmaca.simulations.modules.network_layer.NetworkPacket'
 
@@ -193,6 +194,13 @@ def test_network_packet_size():
     assert pkt1.size == 100
     assert pkt2.size == 0
 
+    # Size is updated when the payload is replaced:
+    data.size = 20
+    pkt2.data = data
+    assert pkt2.size == 20
+    pkt1.data = None
+    assert pkt1.size == 0
+
 
 #############################################################################
 # TEST SwitchTable
@@ -265,6 +273,40 @@ def test_switch_table_implements_str():
                           'SwitchTable{22: (eth1, 3), 10: (eth0, 4)}'}
 
 
+def test_switch_table_reads_shared_routing_tables():
+    # Two switches, routes to destinations with addresses 7, 8 (column 0)
+    # and 9 (column 1); switch 1 has no route to the column 1:
+    routes = RoutingTables(
+        {7: 0, 8: 0, 9: 1},
+        ports=np.array([[0, 2], [1, -1]]),
+        next_hops=np.array([[3, 4], [5, -1]]))
+    table_0, table_1 = SwitchTable(routes, 0), SwitchTable(routes, 1)
+
+    assert table_0[8].as_tuple() == ('if0', 3)
+    assert table_0.get(9).as_tuple() == ('if2', 4)
+    assert table_1[7].as_tuple() == ('if1', 5)
+    assert 9 not in table_1 and 10 not in table_0
+    assert table_1.get(9) is None
+    with pytest.raises(KeyError):
+        _ = table_1[9]
+    assert table_0.as_dict() == {7: ('if0', 3), 8: ('if0', 3), 9: ('if2', 4)}
+    assert table_0.find_connection(4) == 'if2'
+    assert table_1.find_connection(4) is None
+
+    # Records added to the table take precedence over shared routes:
+    table_1.add(9, connection='eth', next_hop=12)
+    table_1.add(8, connection='eth', next_hop=12)
+    assert table_1.as_dict() == {7: ('if1', 5), 8: ('eth', 12), 9: ('eth', 12)}
+    assert table_1[8].as_tuple() == ('eth', 12)
+    assert table_0[8].as_tuple() == ('if0', 3)
+
+
+def test_switch_table_requires_index_with_shared_routes():
+    routes = RoutingTables({1: 0}, ports=[[0]], next_hops=[[2]])
+    with pytest.raises(ValueError):
+        SwitchTable(routes)
+
+
 #############################################################################
 # TEST NetworkSwitch
 #############################################################################
@@ -0,0 +1,163 @@
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from numpy.linalg import norm
+
+from pycsmaca.simulations.modules.radio import Radio, ConnectionManager
+
+
+def create_sim(speed_of_light=10.0):
+    sim = Mock()
+    sim.params.speed_of_light = speed_of_light
+    return sim
+
+
+#############################################################################
+# TEST ConnectionManager
+#############################################################################
+@pytest.mark.parametrize('cell_size', [None, 0.3, 2.5, 0.01])
+def test_connection_manager_finds_peers_within_connection_radius(cell_size):
+    """Validate that peers found with the grid index are the same as
+    the peers found by comparing all pairs of radios. With tiny cells
+    the radius covers more cells than there are occupied ones, so only
+    occupied cells are checked.
+    """
+    sim = create_sim()
+    rng = np.random.default_rng(1)
+    radios = [
+        Radio(sim, None, preamble=0, bitrate=1, position=position,
+              connection_radius=radius)
+        for position, radius in zip(rng.uniform(-5, 5, size=(200, 2)),
+                                    rng.choice([0.5, 1.0, 2.0], size=200))
+    ]
+    manager = ConnectionManager(sim, cell_size=cell_size)
+    manager.add_radios(radios)
+
+    for i, radio in enumerate(radios):
+        expected = [
+            peer for peer in radios
+            if peer is not radio and
+            norm(peer.position - radio.position) <= min(
+                peer.connection_radius, radio.connection_radius)
+        ]
+        # Order of peers is the order of registration:
+        assert manager.get_peers(radio) == expected
+        assert manager.get_peer_delays(radio) == [
+            (peer, norm(radio.position - peer.position) / 10.0)
+            for peer in expected
+        ]
+
+
+def test_connection_manager_ignores_repeated_registration():
+    sim = create_sim()
+    r1 = Radio(sim, None, preamble=0, bitrate=1, position=(0, 0),
+               connection_radius=1)
+    r2 = Radio(sim, None, preamble=0, bitrate=1, position=(0.5, 0),
+               connection_radius=1)
+    manager = ConnectionManager(sim)
+    manager.add_radios([r1, r2])
+    manager.add_radio(r1)
+    manager.add_radio(r2)
+    assert manager.get_peers(r1) == [r2]
+    assert manager.get_peers(r2) == [r1]
+
+    # If the radio moved, its peers and delays are updated:
+    r3 = Radio(sim, None, preamble=0, bitrate=1, position=(0, 0.8),
+               connection_radius=1)
+    manager.add_radio(r3)
+    r2.position = (0, 0.4)
+    manager.add_radio(r2)
+    assert manager.get_peers(r2) == [r1, r3]
+    assert manager.get_peer_delays(r1) == [
+        (r2, pytest.approx(0.04)), (r3, pytest.approx(0.08))]
+    assert manager.get_peers(r3) == [r1, r2]
+
+
+def test_connection_manager_validates_cell_size():
+    with pytest.raises(ValueError):
+        ConnectionManager(create_sim(), cell_size=0)
+
+    # Cell size is taken from the first radio, so its radius must be > 0:
+    sim = create_sim()
+    manager = ConnectionManager(sim)
+    with pytest.raises(ValueError):
+        manager.add_radio(Radio(sim, None, preamble=0, bitrate=1,
+                                position=(0, 0), connection_radius=0))
+
+
+#############################################################################
+# TEST Radio
+#############################################################################
+def test_radio_transmit_broadcasts_frame_in_delays_order():
+    """Validate that the frame is delivered to peers in order of delays,
+    peers with equal delays get the frame in the same event, and each peer
+    receives the frame end after the frame duration.
+    """
+    sim = create_sim()
+    sim.stime = 1.0
+    peers = [Mock() for _ in range(3)]
+    manager = Mock()
+    manager.get_deliveries.return_value = (
+        (peers[1], 0.1), (peers[2], 0.1), (peers[0], 0.3))
+    radio = Radio(sim, manager, preamble=0.5, bitrate=10, position=(0, 0),
+                  connection_radius=1)
+    radio.connections['receiver'] = Mock()
+    pdu = Mock(size=20)
+
+    radio.transmit(pdu)
+
+    sim.schedule.assert_any_call(2.5, radio.handle_frame_transmitted)
+    frame, deliveries, started_at, index = \
+        sim.schedule.call_args_list[-2][1]['args']
+    assert frame.pdu is pdu and started_at == 1.0 and index == 0
+    sim.schedule.assert_any_call(
+        0.1, radio.handle_broadcast_start, args=(frame, deliveries, 1.0, 0))
+
+    # When the first symbol reaches the nearest peers, they start receiving
+    # it, the end of the frame is scheduled and the delivery to the next
+    # peer is scheduled:
+    sim.schedule.reset_mock()
+    sim.stime = 1.1
+    radio.handle_broadcast_start(frame, deliveries, 1.0, 0)
+    peers[1].receiver.start_receive.assert_called_once_with(pdu)
+    peers[2].receiver.start_receive.assert_called_once_with(pdu)
+    peers[0].receiver.start_receive.assert_not_called()
+    sim.schedule.assert_any_call(
+        2.5, radio.handle_broadcast_end, args=(frame, deliveries, 1.0, 0))
+    sim.schedule.assert_called_with(
+        pytest.approx(0.2), radio.handle_broadcast_start,
+        args=(frame, deliveries, 1.0, 2))
+
+    sim.schedule.reset_mock()
+    sim.stime = 1.3
+    radio.handle_broadcast_start(frame, deliveries, 1.0, 2)
+    peers[0].receiver.start_receive.assert_called_once_with(pdu)
+    sim.schedule.assert_not_called()
+
+    # Frame end is delivered in the same order:
+    sim.stime = 3.6
+    radio.handle_broadcast_end(frame, deliveries, 1.0, 0)
+    peers[1].handle_frame_received.assert_called_once_with(frame)
+    peers[2].handle_frame_received.assert_called_once_with(frame)
+    peers[0].handle_frame_received.assert_not_called()
+    sim.schedule.assert_called_with(
+        pytest.approx(0.2), radio.handle_broadcast_end,
+        args=(frame, deliveries, 1.0, 2))
+
+
+def test_connection_manager_provides_sorted_deliveries():
+    sim = create_sim(speed_of_light=1.0)
+    radios = [Radio(sim, None, preamble=0, bitrate=1, position=position,
+                    connection_radius=1)
+              for position in [(0, 0), (0.5, 0), (0, -0.2), (0, 0.5)]]
+    manager = ConnectionManager(sim)
+    manager.add_radios(radios[:3])
+    deliveries = manager.get_deliveries(radios[0])
+    assert deliveries == ((radios[2], 0.2), (radios[1], 0.5))
+
+    # Deliveries are replaced, not changed, when new peers are added:
+    manager.add_radio(radios[3])
+    assert deliveries == ((radios[2], 0.2), (radios[1], 0.5))
+    assert manager.get_deliveries(radios[0]) == (
+        (radios[2], 0.2), (radios[1], 0.5), (radios[3], 0.5))
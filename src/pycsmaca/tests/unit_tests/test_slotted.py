@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from pyqumo.random import Exponential
+from scipy.optimize import fsolve
+
+from pycsmaca.simulations.shortcuts import \
+    slotted_collision_domain_saturated_network, SimRet, SaturatedClient, \
+    WirelessServer, SlottedNetwork
+from pycsmaca.simulations.slotted import SlottedCollisionDomain
+
+
+PARAMS = dict(
+    payload_size=100, ack_size=100, mac_header_size=50, phy_header_size=25,
+    preamble=1e-3, bitrate=1000, difs=0.2, sifs=0.1, slot=0.05,
+    connection_radius=100, speed_of_light=1e5,
+)
+
+
+def test_single_client_without_backoff():
+    """Validate that a single client with zero backoff sends packets
+    one by one with service time DIFS + DATA + SIFS + ACK + 2 * propagation.
+    """
+    ret = slotted_collision_domain_saturated_network(
+        num_clients=1, cwmin=1, cwmax=1, sim_time_limit=100, **PARAMS)
+    assert isinstance(ret, SimRet)
+    assert isinstance(ret.server, WirelessServer)
+    assert isinstance(ret.network, SlottedNetwork)
+    assert len(ret.clients) == 1
+    client = ret.clients[0]
+    assert isinstance(client, SaturatedClient)
+
+    t_data = 1e-3 + (100 + 50 + 25) / 1000
+    t_ack = 1e-3 + (25 + 100) / 1000
+    service_time = 0.2 + t_data + 0.1 + t_ack + 2 * 1e-3
+    num_packets = int(100 // service_time)
+
+    assert client.num_packets_sent == num_packets
+    assert_allclose(client.service_time.asarray(), service_time)
+    assert client.num_retries.as_tuple() == (1,) * num_packets
+    assert len(client.source_intervals) == num_packets + 1
+    assert ret.server.num_packets_received == num_packets
+    assert ret.server.num_rx_collided == 0
+    assert ret.server.collision_ratio == 0
+    assert_allclose(ret.server.arrival_intervals.mean(), service_time,
+                    rtol=0.01)
+    assert ret.network.num_empty_slots == 0
+    assert ret.network.collision_probability == 0
+    assert_allclose(ret.network.throughput, num_packets * 100 / 100)
+
+
+def test_clients_always_collide_with_same_backoff():
+    ret = slotted_collision_domain_saturated_network(
+        num_clients=2, cwmin=1, cwmax=1, sim_time_limit=100, **PARAMS)
+    assert all(client.num_packets_sent == 0 for client in ret.clients)
+    assert ret.server.num_rx_success == 0
+    assert ret.server.num_rx_collided > 0
+    assert ret.server.collision_ratio == 1
+    assert ret.network.collision_probability == 1
+
+
+def test_replications_are_simulated_together():
+    kwargs = dict(num_clients=5, cwmin=4, cwmax=32, sim_time_limit=200,
+                  **PARAMS)
+    results = slotted_collision_domain_saturated_network(
+        replications=4, seed=1, **kwargs)
+    assert len(results) == 4
+    sent = [[cli.num_packets_sent for cli in ret.clients] for ret in results]
+    assert len(set(map(tuple, sent))) > 1
+
+    # Results are reproducible with the same seed:
+    again = slotted_collision_domain_saturated_network(
+        replications=4, seed=1, **kwargs)
+    assert sent == [[cli.num_packets_sent for cli in ret.clients]
+                    for ret in again]
+    assert results[2].clients[3].service_time.as_tuple() == \
+        again[2].clients[3].service_time.as_tuple()
+
+
+def test_random_payloads_are_reproducible_with_seed():
+    kwargs = dict(PARAMS, payload_size=Exponential(0.01))
+    domains = [
+        SlottedCollisionDomain(num_clients=3, cwmin=4, cwmax=16,
+                               replications=2, seed=seed, **kwargs)
+        for seed in (1, 1, 2)
+    ]
+    for domain in domains:
+        domain.run(100)
+    payloads = [[domain.get_delivered_payload(i) for i in range(2)]
+                for domain in domains]
+    assert payloads[0] == payloads[1]
+    assert payloads[0] != payloads[2]
+
+
+def test_collision_probability_agrees_with_bianchi_model():
+    num_clients, cwmin, num_stages = 10, 8, 3
+
+    def equations(variables):
+        p, t = variables
+        return [
+            p - (1 - (1 - t) ** (num_clients - 1)),
+            t - 2 / (1 + cwmin + p * cwmin * sum(
+                (2 * p) ** i for i in range(num_stages)))
+        ]
+
+    bianchi_p = fsolve(equations, np.asarray((0.5, 0.5)))[0]
+    results = slotted_collision_domain_saturated_network(
+        num_clients=num_clients, cwmin=cwmin, cwmax=cwmin * 2 ** num_stages,
+        sim_time_limit=5000, replications=10, seed=1, **PARAMS)
+    p = np.mean([ret.network.collision_probability for ret in results])
+    assert_allclose(p, bianchi_p, atol=0.02)
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(num_clients=0), dict(replications=0), dict(cwmin=0),
+    dict(cwmin=8, cwmax=4),
+])
+def test_slotted_collision_domain_validates_arguments(kwargs):
+    kwargs = {**dict(num_clients=2, cwmin=2, cwmax=8), **PARAMS, **kwargs}
+    with pytest.raises(ValueError):
+        SlottedCollisionDomain(**kwargs)
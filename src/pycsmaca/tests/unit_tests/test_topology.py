@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+from numpy.linalg import norm
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+
+from pycsmaca.simulations.modules import SwitchTable
+from pycsmaca.simulations.topology import Topology
+
+
+def get_hop_counts(topology):
+    graph = csr_matrix(
+        (np.ones(len(topology.indices)), topology.indices, topology.indptr),
+        shape=(topology.num_nodes, topology.num_nodes))
+    return shortest_path(graph, unweighted=True)
+
+
+#############################################################################
+# TEST Topology builders
+#############################################################################
+def test_grid_topology_connects_nearest_nodes_in_rows_and_columns():
+    topology = Topology.grid(3, 4, distance=10)
+    assert topology.num_nodes == 12
+    assert topology.num_edges == 3 * 3 + 2 * 4
+    assert list(topology.get_neighbours(0)) == [1, 4]
+    assert list(topology.get_neighbours(5)) == [1, 4, 6, 9]
+    assert list(topology.get_neighbours(11)) == [7, 10]
+    np.testing.assert_allclose(topology.positions[6], [20, 10])
+    assert topology.is_connected()
+
+
+def test_topology_links_rows_and_reversed_links():
+    topology = Topology(4, [(0, 2), (1, 2), (3, 2)])
+    assert list(topology.indptr) == [0, 1, 2, 5, 6]
+    assert list(topology.indices) == [2, 2, 0, 1, 3, 2]
+    assert list(topology.link_sources) == [0, 1, 2, 2, 2, 3]
+    assert list(topology.degrees) == [1, 1, 3, 1]
+    assert list(topology.reversed_links) == [2, 3, 0, 1, 5, 4]
+
+
+def test_topology_from_adjacency_lists():
+    expected = {(0, 1), (0, 2), (1, 3)}
+    topologies = [
+        Topology.from_adjacency([[1, 2], [0, 3], [0], [1]]),
+        Topology.from_adjacency([[1, 2], [3], [], []]),
+        Topology.from_adjacency({0: [1, 2], 3: [1]}),
+    ]
+    for topology in topologies:
+        assert topology.num_nodes == 4
+        assert {tuple(edge) for edge in topology.edges.tolist()} == expected
+    assert Topology.from_adjacency({0: [1]}, num_nodes=5).num_nodes == 5
+
+
+def test_topology_from_csv(tmp_path):
+    path = tmp_path / 'edges.csv'
+    path.write_text('source,target,cost\n# comment\n0,1,2.5\n\n2, 1, 1\n')
+    topology = Topology.from_csv(str(path))
+    assert topology.num_nodes == 3
+    assert topology.edges.tolist() == [[0, 1], [1, 2]]
+    assert list(topology.weights) == [2.5, 1]
+
+    path.write_text('0;1\n1;2\n')
+    topology = Topology.from_csv(str(path), num_nodes=4, delimiter=';')
+    assert topology.num_nodes == 4 and topology.weights is None
+
+    path.write_text('0,1\n1,x\n')
+    with pytest.raises(ValueError):
+        Topology.from_csv(str(path))
+
+
+@pytest.mark.parametrize('num_nodes, edges', [
+    (0, []), (3, [(0, 3)]), (3, [(-1, 0)]), (3, [(1, 1)]),
+    (3, [(0, 1), (1, 0)]),
+])
+def test_topology_validates_edges(num_nodes, edges):
+    with pytest.raises(ValueError):
+        Topology(num_nodes, edges)
+
+
+def test_random_geometric_topology_connects_nodes_within_radius():
+    topology = Topology.random_geometric(200, 0.1, width=1, seed=3)
+    positions = topology.positions
+    assert positions.shape == (200, 2)
+    assert np.all((positions >= 0) & (positions <= 1))
+    expected = {
+        (i, j) for i in range(200) for j in range(i + 1, 200)
+        if norm(positions[i] - positions[j]) <= 0.1
+    }
+    assert {tuple(edge) for edge in topology.edges.tolist()} == expected
+
+    other = Topology.random_geometric(200, 0.1, width=1, seed=3)
+    np.testing.assert_array_equal(other.positions, positions)
+
+
+#############################################################################
+# TEST Topology routing
+#############################################################################
+@pytest.mark.parametrize('topology', [
+    Topology.grid(6, 7),
+    Topology.random_geometric(150, 0.15, seed=1),
+], ids=['grid', 'random'])
+def test_next_hops_follow_shortest_paths(topology):
+    hop_counts = get_hop_counts(topology)
+    destinations = [0, 17, 40]
+    next_hops = topology.get_next_hops(destinations)
+    assert next_hops.shape == (topology.num_nodes, 3)
+    for column, dst in enumerate(destinations):
+        for node in range(topology.num_nodes):
+            next_node = next_hops[node, column]
+            if node == dst or np.isinf(hop_counts[node, dst]):
+                assert next_node == -1
+            else:
+                assert next_node in topology.get_neighbours(node)
+                assert hop_counts[next_node, dst] == hop_counts[node, dst] - 1
+
+
+def test_next_hops_use_link_weights():
+    # Direct link 0-2 is more expensive than the path 0-1-2:
+    topology = Topology(3, [(0, 1), (1, 2), (0, 2)], weights=[1, 1, 5])
+    assert topology.get_next_hops([2])[:, 0].tolist() == [1, 2, -1]
+    topology = Topology(3, [(0, 1), (1, 2), (0, 2)])
+    assert topology.get_next_hops([2])[:, 0].tolist() == [2, 2, -1]
+
+
+def test_routing_tables_of_wired_topology():
+    topology = Topology.grid(4, 5)
+    routes = topology.get_routing_tables([0, 13])
+    assert routes.num_switches == 20 and routes.num_destinations == 2
+
+    # Each station has an interface per link, so following routes we move
+    # from the interface of the link to the station owning the next hop:
+    iface_owners = topology.link_sources
+    hop_counts = get_hop_counts(topology)
+    for dst in (0, 13):
+        dst_addresses = range(topology.indptr[dst] + 1,
+                              topology.indptr[dst + 1] + 1)
+        for address in dst_addresses:
+            assert routes.address_columns[address] == (0 if dst == 0 else 1)
+        for node in range(topology.num_nodes):
+            table = SwitchTable(routes, node)
+            link = table.get(dst_addresses[0])
+            if node == dst:
+                assert link is None
+                continue
+            port = int(link.connection[2:])
+            assert 0 <= port < topology.degrees[node]
+            next_node = iface_owners[link.next_hop - 1]
+            assert next_node == topology.get_neighbours(node)[port]
+            assert hop_counts[next_node, dst] == hop_counts[node, dst] - 1
+
+
+def test_routing_tables_of_wireless_topology():
+    topology = Topology.from_adjacency([[1], [2], [3], []])
+    routes = topology.get_routing_tables(
+        [3], interface_per_edge=False, first_address=10)
+    assert dict(routes.address_columns.items()) == {13: 0}
+    assert [SwitchTable(routes, i).as_dict() for i in range(4)] == [
+        {13: ('if0', 11)}, {13: ('if0', 12)}, {13: ('if0', 13)}, {},
+    ]
+
+
+def test_routing_tables_skip_unreachable_destinations():
+    topology = Topology(4, [(0, 1), (2, 3)])
+    assert not topology.is_connected()
+    routes = topology.get_routing_tables(interface_per_edge=False)
+    assert routes.get(0, 2) == ('if0', 2)
+    assert routes.get(0, 3) is None
+    assert routes.get(0, 4) is None
+    assert routes.get(3, 1) is None
+    assert routes.get(3, 3) == ('if0', 3)
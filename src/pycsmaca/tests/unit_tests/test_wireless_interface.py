@@ -0,0 +1,154 @@
+from unittest.mock import Mock, patch, PropertyMock
+
+import pytest
+
+from pycsmaca.simulations.modules.app_layer import AppData
+from pycsmaca.simulations.modules.network_layer import NetworkPacket
+from pycsmaca.simulations.modules.wireless_interface import Transmitter
+
+DIFS = 0.2
+SLOT = 0.05
+BACKOFF = 5
+START = 1.0
+
+
+#############################################################################
+# TEST Transmitter BACKOFF
+#############################################################################
+# Expected values are given by the per-slot countdown semantics: after
+# the channel is idle for DIFS the transmitter checks the counter, sends
+# the frame if it is zero, otherwise decrements it and checks again after
+# each slot. Thus the counter is decremented at `START + DIFS + k * SLOT`
+# for `k = 0, 1, ..., BACKOFF - 1`, and the frame is sent at
+# `START + DIFS + BACKOFF * SLOT`.
+
+def create_transmitter(backoff=BACKOFF):
+    """Create a transmitter with mock simulator, channel and queue, and pass
+    it a packet at `START`, so it starts the backoff countdown.
+    """
+    sim = Mock()
+    sim.stime = 0
+    sim.params.difs = DIFS
+    sim.params.slot = SLOT
+    sim.params.cwmin = 16
+    transmitter = Transmitter(
+        sim, address=1, phy_header_size=10, mac_header_size=20, ack_size=30,
+        bitrate=1000, preamble=0.01,
+    )
+    channel, radio, queue = Mock(), Mock(), Mock()
+    channel.is_busy = False
+    transmitter.connections.set('channel', channel, reverse=False)
+    transmitter.connections.set('radio', radio, reverse=False)
+    queue_conn = transmitter.connections.set('queue', queue, reverse=False)
+
+    sim.stime = START
+    with patch.object(Transmitter, 'rng', new_callable=PropertyMock) as rng:
+        rng.return_value.integers.return_value = backoff
+        transmitter.handle_message(
+            NetworkPacket(data=AppData(size=100), receiver_address=2),
+            connection=queue_conn
+        )
+    assert transmitter.state == Transmitter.State.BACKOFF
+    assert transmitter.backoff == backoff
+    return sim, transmitter
+
+
+def test_transmitter_schedules_whole_backoff_countdown():
+    sim, transmitter = create_transmitter()
+    sim.schedule.assert_called_with(
+        DIFS + BACKOFF * SLOT, transmitter.handle_backoff_timeout)
+
+    sim.stime = START + DIFS + BACKOFF * SLOT
+    transmitter.handle_backoff_timeout()
+    assert transmitter.state == Transmitter.State.TX
+    assert transmitter.backoff == 0
+    transmitter.radio.transmit.assert_called_once_with(transmitter.pdu)
+
+
+@pytest.mark.parametrize('delay', [0, DIFS / 2, DIFS - 1e-6])
+def test_transmitter_keeps_backoff_when_channel_busy_during_difs(delay):
+    sim, transmitter = create_transmitter()
+    timeout = transmitter.timeout
+
+    sim.stime = START + delay
+    transmitter.channel_busy()
+    sim.cancel.assert_called_once_with(timeout)
+    assert transmitter.state == Transmitter.State.BUSY
+    assert transmitter.backoff == BACKOFF
+
+
+@pytest.mark.parametrize('num_slots, expected_backoff', [
+    (0, 4), (1, 3), (2, 2), (4, 0),
+])
+def test_transmitter_decrements_backoff_when_busy_at_slot_boundary(
+        num_slots, expected_backoff):
+    # At the slot boundary the counter is already decremented, since
+    # the decrement at `START + DIFS + num_slots * SLOT` happens first:
+    sim, transmitter = create_transmitter()
+    sim.stime = START + DIFS + num_slots * SLOT
+    transmitter.channel_busy()
+    assert transmitter.state == Transmitter.State.BUSY
+    assert transmitter.backoff == expected_backoff
+
+
+@pytest.mark.parametrize('num_slots, expected_backoff', [
+    (0, 4), (1, 3), (3, 1), (4, 0),
+])
+def test_transmitter_decrements_backoff_when_busy_in_the_middle_of_slot(
+        num_slots, expected_backoff):
+    sim, transmitter = create_transmitter()
+    sim.stime = START + DIFS + (num_slots + 0.5) * SLOT
+    transmitter.channel_busy()
+    assert transmitter.state == Transmitter.State.BUSY
+    assert transmitter.backoff == expected_backoff
+
+
+def test_transmitter_resumes_backoff_after_channel_ready():
+    sim, transmitter = create_transmitter()
+
+    # Channel becomes busy after two decrements (in the middle of the second
+    # slot), so the counter is 3:
+    sim.stime = START + DIFS + 1.5 * SLOT
+    transmitter.channel_busy()
+    assert transmitter.backoff == 3
+
+    # When the channel is ready, the countdown is resumed after DIFS:
+    sim.stime = 2.0
+    sim.schedule.reset_mock()
+    transmitter.channel_ready()
+    assert transmitter.state == Transmitter.State.BACKOFF
+    sim.schedule.assert_called_once_with(
+        DIFS + 3 * SLOT, transmitter.handle_backoff_timeout)
+
+    # Channel becomes busy again during DIFS and then in the middle of
+    # the first slot, so only one more decrement (at the end of DIFS) happens:
+    sim.stime = 2.0 + DIFS / 2
+    transmitter.channel_busy()
+    assert transmitter.backoff == 3
+    sim.stime = 2.5
+    transmitter.channel_ready()
+    sim.stime = 2.5 + DIFS + 0.5 * SLOT
+    transmitter.channel_busy()
+    assert transmitter.backoff == 2
+
+    # Finally, the channel is idle long enough for the frame to be sent:
+    sim.stime = 3.0
+    sim.schedule.reset_mock()
+    transmitter.channel_ready()
+    sim.schedule.assert_called_once_with(
+        DIFS + 2 * SLOT, transmitter.handle_backoff_timeout)
+
+
+def test_transmitter_sends_after_difs_when_busy_after_last_decrement():
+    # If the counter reached zero before the channel became busy, the frame
+    # is sent right after DIFS when the channel is ready:
+    sim, transmitter = create_transmitter(backoff=1)
+    sim.stime = START + DIFS + 0.5 * SLOT
+    transmitter.channel_busy()
+    assert transmitter.backoff == 0
+
+    sim.stime = 2.0
+    sim.schedule.reset_mock()
+    transmitter.channel_ready()
+    sim.schedule.assert_called_once_with(
+        DIFS, transmitter.handle_backoff_timeout)
@@ -1,2 +1,9 @@
 from .statistics import Trace, Statistic, Intervals
-from .simulator import simulate, Logger, Simulator, Kernel, Model
+from .simulator import simulate, Logger, Simulator, Kernel, Model, \
+    register_global_seeder
+from .event_queues import EventQueue, HeapEventQueue, CalendarEventQueue
+from .stopping import (ConfidenceTarget, ConfidenceTracker, Estimate,
+                       batch_means, mser5)
+from .profiling import Profile, HandlerStats, ProfileSample
+from .checkpoints import save_checkpoint, load_checkpoint
+from .streams import RandomBuffer
@@ -0,0 +1,142 @@
+import os
+import pickle
+import random
+import types
+
+import numpy as np
+
+
+CHECKPOINT_VERSION = 2
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """Pickler replacing references to the simulator and its logger with
+    persistent IDs, so models are restored with the new simulator.
+    """
+    def __init__(self, file, sim):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__ids = {id(sim): 'simulator', id(sim.logger): 'logger'}
+
+    def persistent_id(self, obj):
+        return self.__ids.get(id(obj))
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, sim):
+        super().__init__(file)
+        self.__objects = {'simulator': sim, 'logger': sim.logger}
+
+    def persistent_load(self, pid):
+        try:
+            return self.__objects[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(f'unknown persistent ID {pid!r}')
+
+
+def _encode_handler(fn):
+    """Get reference to the event handler: `(owner, method name)` for bound
+    methods, or `(None, function)` for module-level functions.
+
+    Owners are pickled together with the model tree, so the restored
+    handler is bound to the restored module.
+    """
+    if fn is None:
+        return None
+    owner = getattr(fn, '__self__', None)
+    if owner is not None and not isinstance(owner, types.ModuleType):
+        name = fn.__name__
+        if name.startswith('__') and not name.endswith('__'):
+            # Private method, get its mangled attribute name:
+            class_name = fn.__qualname__.split('.')[-2].lstrip('_')
+            name = f'_{class_name}{name}'
+        return owner, name
+    qualname = getattr(fn, '__qualname__', '')
+    if '<' in qualname:
+        raise ValueError(
+            f'can not checkpoint event handler {qualname}: only model '
+            f'methods and module-level functions are supported')
+    return None, fn
+
+
+def _decode_handler(ref):
+    if ref is None:
+        return None
+    owner, fn = ref
+    return fn if owner is None else getattr(owner, fn)
+
+
+def save_checkpoint(sim, kernel, path):
+    """Write the simulation state to the file.
+
+    Checkpoint contains kernel clock and counters, pending events, model
+    data (the whole `Model` tree, including modules random streams),
+    parameters, the simulator seed sequence and `sim.rng` state, and states
+    of `numpy.random` and `random` global generators. File is written
+    atomically, so an interrupted write does not spoil the previous
+    checkpoint.
+
+    Model data is pickled, so it must not contain lambdas, open files or
+    other unpicklable objects. References to the simulator and its logger
+    are replaced with the new ones when loading. Note that generators
+    referenced by the model (e.g. `functools.partial(np.random.exponential)`
+    parameters) are pickled as copies, so only the global generators share
+    their state with the model after loading.
+    """
+    stime, next_evid, num_events, events = kernel._get_state()
+    seed_sequence, rng = sim._get_random_state()
+    header = {
+        'version': CHECKPOINT_VERSION,
+        'params': sim.params.as_dict(),
+        'stime': stime,
+    }
+    state = {
+        'next_evid': next_evid,
+        'num_events': num_events,
+        'events': [(event_stime, evid, _encode_handler(fn), args, kwargs)
+                   for event_stime, evid, fn, args, kwargs in events],
+        'data': sim.data,
+        'seed_sequence': seed_sequence,
+        'rng': rng,
+        'numpy_random': np.random.get_state(),
+        'random': random.getstate(),
+    }
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _CheckpointPickler(f, sim).dump(state)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, kernel, handlers=None, params=None, loglevel=None):
+    """Restore the simulation from the checkpoint into an empty kernel.
+
+    If `params` are given, they replace the checkpoint parameters (e.g. to
+    fork a warmed-up model into several variants). Modules see new values
+    if they read `sim.params` during the run, but values cached when
+    the model was created are not changed.
+
+    Returns
+    -------
+    sim : Simulator
+    """
+    from .simulator import Simulator
+
+    with open(path, 'rb') as f:
+        header = pickle.load(f)
+        if header.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(
+                f'unsupported checkpoint version {header.get("version")}')
+        if params is None:
+            params = header['params']
+        sim = Simulator(kernel, None, handlers, params, loglevel)
+        state = _CheckpointUnpickler(f, sim).load()
+
+    events = [(stime, evid, _decode_handler(ref), args, kwargs)
+              for stime, evid, ref, args, kwargs in state['events']]
+    kernel._set_state(
+        header['stime'], state['next_evid'], state['num_events'], events)
+    sim._set_data(state['data'])
+    sim._set_random_state(state['seed_sequence'], state['rng'])
+    np.random.set_state(state['numpy_random'])
+    random.setstate(state['random'])
+    return sim
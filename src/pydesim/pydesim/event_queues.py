@@ -0,0 +1,224 @@
+import bisect
+import heapq
+
+
+class EventQueue:
+    """Interface of the pending events set used by the `Kernel`.
+
+    Queue stores events keyed with `(stime, evid)` tuples and pops them in
+    increasing keys order, so events with equal times are popped in the order
+    of their IDs (that is, in the order they were scheduled).
+    """
+    def push(self, stime, evid, event):
+        raise NotImplementedError
+
+    def pop(self):
+        """Remove and return `(stime, evid, event)` with the smallest key.
+
+        Raises `KeyError` if the queue is empty.
+        """
+        raise NotImplementedError
+
+    def peek(self):
+        """Return `(stime, evid, event)` with the smallest key without
+        removing it. Raises `KeyError` if the queue is empty.
+        """
+        raise NotImplementedError
+
+    def rebuild(self, items):
+        """Replace the queue content with `(stime, evid, event)` items.
+
+        Used by the kernel to drop cancelled events. Default implementation
+        pushes items into the emptied queue one by one.
+        """
+        while len(self):
+            self.pop()
+        for item in items:
+            self.push(*item)
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class HeapEventQueue(EventQueue):
+    """Binary heap of `(stime, evid, event)` tuples.
+
+    Since event IDs are unique, tuples are compared by time and ID only
+    with C-level tuple comparison, without calling `_Event` methods.
+    """
+    def __init__(self):
+        self.__heap = []
+
+    def push(self, stime, evid, event):
+        heapq.heappush(self.__heap, (stime, evid, event))
+
+    def pop(self):
+        try:
+            return heapq.heappop(self.__heap)
+        except IndexError:
+            raise KeyError('pop from empty queue')
+
+    def peek(self):
+        try:
+            return self.__heap[0]
+        except IndexError:
+            raise KeyError('peek from empty queue')
+
+    def rebuild(self, items):
+        self.__heap = list(items)
+        heapq.heapify(self.__heap)
+
+    def __len__(self):
+        return len(self.__heap)
+
+
+class CalendarEventQueue(EventQueue):
+    """Calendar queue (R. Brown, 1988) with O(1) amortized push and pop.
+
+    Time axis is split into "days" of `width` length, and day `k` events are
+    stored in bucket `k % num_buckets`. Each bucket is a list sorted by
+    `(stime, evid)`. Pop scans buckets starting from the current day and
+    takes the first bucket head which belongs to the scanned day. If the
+    whole "year" was scanned without success, the queue jumps directly to
+    the day of the smallest bucket head.
+
+    Number of buckets is doubled (halved) when the queue size becomes twice
+    larger (smaller) than the number of buckets, and the day width is then
+    re-estimated from the average separation of the nearest events.
+
+    Since the day number `int(stime / width)` is monotone in time, events are
+    popped in exactly the same order as from `HeapEventQueue`.
+    """
+    MIN_BUCKETS = 2
+    NUM_SAMPLES = 25
+
+    def __init__(self, num_buckets=MIN_BUCKETS, width=1.0):
+        if num_buckets < 1:
+            raise ValueError('number of buckets must be positive')
+        if width <= 0:
+            raise ValueError('bucket width must be positive')
+        self.__size = 0
+        self.__day = 0
+        self.__width = width
+        self.__buckets = [[] for _ in range(num_buckets)]
+        self.__num_buckets = num_buckets
+
+    @property
+    def width(self):
+        return self.__width
+
+    @property
+    def num_buckets(self):
+        return self.__num_buckets
+
+    def push(self, stime, evid, event):
+        day = int(stime / self.__width)
+        bisect.insort(self.__buckets[day % self.__num_buckets],
+                      (stime, evid, event))
+        if day < self.__day:
+            self.__day = day
+        self.__size += 1
+        if self.__size > 2 * self.__num_buckets:
+            self.__resize(2 * self.__num_buckets)
+
+    def pop(self):
+        if self.__size == 0:
+            raise KeyError('pop from empty queue')
+        bucket = self.__find_first()
+        item = bucket.pop(0)
+        self.__size -= 1
+        num_buckets = self.__num_buckets
+        if num_buckets > self.MIN_BUCKETS and 2 * self.__size < num_buckets:
+            self.__resize(num_buckets // 2)
+        return item
+
+    def peek(self):
+        if self.__size == 0:
+            raise KeyError('peek from empty queue')
+        return self.__find_first()[0]
+
+    def __find_first(self):
+        """Find the bucket with the smallest item and move to its day.
+        """
+        buckets = self.__buckets
+        num_buckets = self.__num_buckets
+        width = self.__width
+        day = self.__day
+        for _ in range(num_buckets):
+            bucket = buckets[day % num_buckets]
+            if bucket and int(bucket[0][0] / width) <= day:
+                break
+            day += 1
+        else:
+            # Nothing found during the whole year - jump to the nearest event:
+            day = int(min(bucket[0] for bucket in buckets if bucket)[0] / width)
+            bucket = buckets[day % num_buckets]
+        self.__day = day
+        return bucket
+
+    def rebuild(self, items):
+        items = sorted(items)
+        self.__size = len(items)
+        num_buckets = self.MIN_BUCKETS
+        while num_buckets < self.__size:
+            num_buckets *= 2
+        self.__place(items, num_buckets)
+
+    def __resize(self, num_buckets):
+        items = [item for bucket in self.__buckets for item in bucket]
+        items.sort()
+        self.__place(items, num_buckets)
+
+    def __place(self, items, num_buckets):
+        self.__width = self.__estimate_width(items)
+        self.__buckets = [[] for _ in range(num_buckets)]
+        self.__num_buckets = num_buckets
+        # Since items are sorted, appending keeps the buckets sorted:
+        for item in items:
+            day = int(item[0] / self.__width)
+            self.__buckets[day % num_buckets].append(item)
+        if items:
+            self.__day = int(items[0][0] / self.__width)
+
+    def __estimate_width(self, items):
+        times = [item[0] for item in items[:self.NUM_SAMPLES]]
+        gaps = [t1 - t0 for t0, t1 in zip(times[:-1], times[1:])]
+        if not gaps:
+            return self.__width
+        average = sum(gaps) / len(gaps)
+        gaps = [gap for gap in gaps if gap <= 2 * average]
+        width = 3 * sum(gaps) / len(gaps) if gaps else 0
+        return width if width > 0 else self.__width
+
+    def __len__(self):
+        return self.__size
+
+
+EVENT_QUEUES = {
+    'heap': HeapEventQueue,
+    'calendar': CalendarEventQueue,
+}
+
+
+def create_event_queue(event_queue):
+    """Create event queue from its name or a factory.
+
+    Parameters
+    ----------
+    event_queue : str or callable
+        queue name (one of `EVENT_QUEUES` keys), or a callable without
+        arguments returning a new `EventQueue` (e.g., `CalendarEventQueue`
+        class or `lambda: CalendarEventQueue(width=0.1)`). A factory is
+        used instead of an instance, since each kernel needs its own queue.
+    """
+    if callable(event_queue):
+        queue = event_queue()
+        if not isinstance(queue, EventQueue):
+            raise ValueError(f'event queue factory returned {queue!r}, '
+                             f'expected an EventQueue instance')
+        return queue
+    try:
+        return EVENT_QUEUES[event_queue]()
+    except (KeyError, TypeError):
+        raise ValueError(f'unknown event queue {event_queue!r}, expected '
+                         f'one of: {", ".join(EVENT_QUEUES)}')
@@ -0,0 +1,183 @@
+import time
+from collections import namedtuple
+
+
+HandlerStats = namedtuple('HandlerStats', [
+    'path', 'handler', 'num_calls', 'total_time', 'num_scheduled',
+])
+HandlerStats.__doc__ = """Statistics of a single handler.
+
+`path` is the module path in the `Model` tree (e.g.,
+`'stations[1].interfaces[0].transmitter'`, empty for the root model and
+plain functions), `handler` is the function qualified name, `total_time`
+is the cumulative wall time of the calls in seconds, and `num_scheduled`
+is the number of events scheduled by the handler calls (fan-out).
+"""
+
+ProfileSample = namedtuple('ProfileSample', [
+    'wall_time', 'stime', 'num_events', 'num_live_events', 'num_dead_events',
+    'events_rate',
+])
+ProfileSample.__doc__ = """Kernel state sampled during the run.
+
+`wall_time` is measured from the run start, `events_rate` is the number
+of events per wall-clock second since the previous sample.
+"""
+
+
+def module_path(module):
+    """Get path of the module in the `Model` tree from its root, like
+    `'stations[1].interfaces[0].transmitter'`.
+    """
+    names = []
+    while module.parent is not None:
+        parent = module.parent
+        for name in parent.children.names():
+            child = parent.children[name]
+            if child is module:
+                names.append(name)
+                break
+            if isinstance(child, tuple) and any(m is module for m in child):
+                index = next(i for i, m in enumerate(child) if m is module)
+                names.append(f'{name}[{index}]')
+                break
+        else:
+            names.append('?')
+        module = parent
+    return '.'.join(reversed(names))
+
+
+class Profile:
+    """Profile of the simulation run: per-handler statistics and samples of
+    the kernel state over wall time.
+
+    Profile is collected if the run is started with
+    `simulate(..., profile=True)`, and is available in `sim.profile`.
+    Handlers of the same module are distinguished by the module path, so
+    e.g. transmitters of different stations have separate records.
+    """
+    SAMPLE_INTERVAL = 0.1
+
+    def __init__(self, sample_interval=SAMPLE_INTERVAL):
+        if sample_interval <= 0:
+            raise ValueError(f'positive sample interval expected, '
+                             f'{sample_interval} found')
+        self.__sample_interval = sample_interval
+        # Records [calls, time, scheduled] by (owner ID, function name):
+        self.__records = {}
+        self.__owners = {}
+        self.__paths = {}
+        self.__samples = []
+        self.__started_at = None
+        self.__next_sample_at = None
+        self.__last_sample = None
+        self.__wall_time = 0.0
+
+    @property
+    def sample_interval(self):
+        return self.__sample_interval
+
+    @property
+    def wall_time(self):
+        """Wall time of the run in seconds."""
+        return self.__wall_time
+
+    def start(self, kernel):
+        self.__started_at = time.perf_counter()
+        self.__next_sample_at = self.__started_at
+        self.__last_sample = (0.0, 0)
+        self.sample(kernel, self.__started_at)
+
+    def finish(self, kernel):
+        now = time.perf_counter()
+        self.sample(kernel, now, force=True)
+        self.__wall_time = now - self.__started_at
+
+    def record(self, fn, elapsed, num_scheduled):
+        owner = getattr(fn, '__self__', None)
+        key = (id(owner), getattr(fn, '__qualname__', repr(fn)))
+        try:
+            record = self.__records[key]
+        except KeyError:
+            record = self.__records[key] = [0, 0.0, 0]
+            self.__owners[id(owner)] = owner
+        record[0] += 1
+        record[1] += elapsed
+        record[2] += num_scheduled
+
+    def sample(self, kernel, now, force=False):
+        """Record kernel state sample if the sample interval passed.
+        """
+        if now < self.__next_sample_at and not force:
+            return
+        self.__next_sample_at = now + self.__sample_interval
+        wall_time = now - self.__started_at
+        last_wall_time, last_num_events = self.__last_sample
+        rate = ((kernel.num_events - last_num_events) /
+                (wall_time - last_wall_time)
+                if wall_time > last_wall_time else 0.0)
+        self.__samples.append(ProfileSample(
+            wall_time, kernel.stime, kernel.num_events,
+            kernel.num_live_events, kernel.num_dead_events, rate))
+        self.__last_sample = (wall_time, kernel.num_events)
+
+    @property
+    def handlers(self):
+        """List of `HandlerStats`, sorted by total time descending."""
+        stats = [
+            HandlerStats(self.__path(self.__owners[owner_id]), name, *record)
+            for (owner_id, name), record in self.__records.items()
+        ]
+        stats.sort(key=lambda item: item.total_time, reverse=True)
+        return stats
+
+    @property
+    def samples(self):
+        """List of `ProfileSample` records."""
+        return list(self.__samples)
+
+    def __path(self, owner):
+        if owner is None or not hasattr(owner, 'parent'):
+            return ''
+        key = id(owner)
+        if key not in self.__paths:
+            self.__paths[key] = module_path(owner)
+        return self.__paths[key]
+
+    def as_dataframe(self):
+        """Get handlers statistics as `pandas.DataFrame` (requires pandas).
+        """
+        import pandas as pd
+        return pd.DataFrame(self.handlers, columns=HandlerStats._fields)
+
+    def samples_dataframe(self):
+        """Get kernel state samples as `pandas.DataFrame` (requires pandas).
+        """
+        import pandas as pd
+        return pd.DataFrame(self.__samples, columns=ProfileSample._fields)
+
+    def report(self, limit=20):
+        """Get text table of the top `limit` handlers by total time.
+        """
+        handlers = self.handlers
+        total = sum(item.total_time for item in handlers)
+        lines = [
+            f'wall time: {self.__wall_time:.3f} s, handlers time: '
+            f'{total:.3f} s, events: '
+            f'{sum(item.num_calls for item in handlers)}',
+            f'{"calls":>10s} {"time, s":>10s} {"%":>6s} {"us/call":>9s} '
+            f'{"fan-out":>8s}  handler',
+        ]
+        for item in handlers[:limit]:
+            share = 100 * item.total_time / total if total > 0 else 0
+            per_call = 1e6 * item.total_time / item.num_calls
+            fan_out = item.num_scheduled / item.num_calls
+            name = f'{item.path}: {item.handler}' if item.path \
+                else item.handler
+            lines.append(
+                f'{item.num_calls:10d} {item.total_time:10.3f} {share:6.1f} '
+                f'{per_call:9.2f} {fan_out:8.2f}  {name}')
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
@@ -1,9 +1,17 @@
-import heapq
-import itertools
+import multiprocessing
+import random
 import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from functools import total_ordering
 import colorama
+import numpy as np
+
+from .event_queues import create_event_queue
+from .profiling import Profile, module_path
+from .streams import module_seed_sequence, RandomBuffer
+from .checkpoints import save_checkpoint, load_checkpoint
 
 
 def camel_to_snake_case(name):
@@ -41,62 +49,66 @@ class _ParamsDict:
     def __getattr__(self, item):
         return self.__kwargs[item]
 
+    def get(self, item, default=None):
+        return self.__kwargs.get(item, default)
+
     def as_dict(self):
         d = {}
         d.update(self.__kwargs)
         return d
 
 
-@total_ordering
 class _Event:
-    def __init__(self, id, stime, fn, args, kwargs):
-        self.__id, self.__stime, self.__fn, self.__args, self.__kwargs = \
+    """Scheduled event record.
+
+    Events are compared by the queue using `(stime, id)` keys, so the record
+    is a plain slotted object with public attributes. Cancelled events are
+    marked as `removed` and stay in the queue as tombstones. Events of the
+    immediate lane are marked with `immediate` flag.
+    """
+    __slots__ = ('id', 'stime', 'fn', 'args', 'kwargs', 'removed',
+                 'immediate')
+
+    def __init__(self, id, stime, fn, args, kwargs, immediate=False):
+        self.id, self.stime, self.fn, self.args, self.kwargs = \
             id, stime, fn, args, kwargs
-        self.__removed = False
-
-    @property
-    def id(self):
-        return self.__id
-
-    @property
-    def stime(self):
-        return self.__stime
-
-    @property
-    def fn(self):
-        return self.__fn
-
-    @property
-    def args(self):
-        return self.__args
-
-    @property
-    def kwargs(self):
-        return self.__kwargs
-
-    @property
-    def removed(self):
-        return self.__removed
-
-    def remove(self):
-        self.__removed = True
-
-    def __eq__(self, other):
-        return self.__stime == other.stime and self.__id == other.id
-
-    def __lt__(self, other):
-        return self.__stime < other.stime or (
-                self.__stime == other.stime and self.__id < other.id)
+        self.removed = False
+        self.immediate = immediate
 
 
 class Kernel:
-    def __init__(self):
-        self.__queue = []
+    """Simulation kernel: events queue, model time and stop conditions.
+
+    Cancelled events are not searched in the queue, they are marked as
+    removed (tombstones) and skipped when popped. When the number of
+    tombstones exceeds both `MIN_COMPACTION_SIZE` and `compaction_threshold`
+    fraction of the queue size, the queue is rebuilt from live events only,
+    so memory and push/pop costs are bounded even if most events are
+    cancelled (e.g. timeouts).
+
+    If `immediate_events` is `True`, zero-delay events (e.g. messages sent
+    via connections without delays) are not pushed to the queue, but are
+    appended to a FIFO lane. Since all lane events have the current time,
+    they are executed in exactly the same order as from the queue: the lane
+    head is taken unless the queue head has the same time and a smaller ID.
+    """
+    MIN_COMPACTION_SIZE = 64
+
+    def __init__(self, event_queue='heap', compaction_threshold=0.5,
+                 immediate_events=False):
+        if not 0 < compaction_threshold <= 1:
+            raise ValueError(f'compaction threshold must be in (0, 1], '
+                             f'{compaction_threshold} found')
+        self.__queue = create_event_queue(event_queue)
+        self.__immediate_events = immediate_events
+        self.__lane = deque()
+        self.__compaction_threshold = compaction_threshold
         self.__stime = 0
         self.__evids = {}
-        self.__next_evid = itertools.count()
+        self.__next_evid = 0
         self.__num_events = 0
-        self.__queue_size = 0
+        self.__num_dead_events = 0
+        self.__num_compactions = 0
         self.__stop_predicates = []
 
     @property
@@ -105,88 +117,246 @@ class Kernel:
 
     @property
     def empty(self):
-        return self.__queue_size == 0
+        return not self.__evids
 
     @property
     def num_events(self):
         return self.__num_events
 
+    @property
+    def immediate_events(self):
+        return self.__immediate_events
+
+    @property
+    def num_live_events(self):
+        """Number of pending (not cancelled) events."""
+        return len(self.__evids)
+
+    @property
+    def num_dead_events(self):
+        """Number of cancelled events still stored in the queue."""
+        return self.__num_dead_events
+
+    @property
+    def num_compactions(self):
+        return self.__num_compactions
+
     def add_event(self, delay, handler=None, args=(), kwargs=None):
         if delay < 0:
             raise ValueError('negative delay disallowed')
         kwargs = {} if kwargs is None else kwargs
-        event = _Event(
-            next(self.__next_evid), self.stime + delay, handler, args, kwargs)
-        self.__evids[event.id] = event
-        heapq.heappush(self.__queue, event)
-        self.__queue_size += 1
-        return event.id
+        evid = self.__next_evid
+        self.__next_evid = evid + 1
+        if delay == 0 and self.__immediate_events:
+            event = _Event(evid, self.__stime, handler, args, kwargs, True)
+            self.__evids[evid] = event
+            self.__lane.append(event)
+            return evid
+        stime = self.__stime + delay
+        event = _Event(evid, stime, handler, args, kwargs)
+        self.__evids[evid] = event
+        self.__queue.push(stime, evid, event)
+        return evid
 
     def remove_event(self, evid):
-        event = self.__evids.get(evid, None)
-        if event:
-            del self.__evids[evid]
-            if not event.removed:
-                event.remove()
-                self.__queue_size -= 1
-                return event
-        return None
+        event = self.__evids.pop(evid, None)
+        if event is None:
+            return None
+        event.removed = True
+        if event.immediate:
+            return event
+        self.__num_dead_events += 1
+        if (self.__num_dead_events > self.MIN_COMPACTION_SIZE and
+                self.__num_dead_events >
+                self.__compaction_threshold * len(self.__queue)):
+            self._compact()
+        return event
+
+    def _get_state(self):
+        """Get kernel clock, counters and pending events for checkpoints.
+
+        Returns
+        -------
+        state : tuple of `stime`, `next_evid`, `num_events` and a list of
+            `(stime, evid, fn, args, kwargs)` live events ordered by keys
+        """
+        events = sorted(
+            ((event.stime, event.id, event.fn, event.args, event.kwargs)
+             for event in self.__evids.values()), key=lambda item: item[:2])
+        return self.__stime, self.__next_evid, self.__num_events, events
+
+    def _set_state(self, stime, next_evid, num_events, events):
+        """Restore the state returned by `_get_state()` in an empty kernel.
+        """
+        if self.__evids or self.__num_events:
+            raise ValueError('state can be restored only in a new kernel')
+        self.__stime = stime
+        self.__next_evid = next_evid
+        self.__num_events = num_events
+        for event_stime, evid, fn, args, kwargs in events:
+            event = _Event(evid, event_stime, fn, args, kwargs)
+            self.__evids[evid] = event
+            self.__queue.push(event_stime, evid, event)
+
+    def _compact(self):
+        """Rebuild the queue from live events only.
+        """
+        self.__queue.rebuild(
+            (event.stime, evid, event) for evid, event in self.__evids.items()
+            if not event.immediate)
+        self.__num_dead_events = 0
+        self.__num_compactions += 1
 
     def _next_event(self):
-        while self.__queue:
-            event = heapq.heappop(self.__queue)
+        lane = self.__lane
+        while lane:
+            event = lane[0]
+            if event.removed:
+                lane.popleft()
+                continue
+            # Queue events with the current time and smaller IDs (scheduled
+            # before the lane event) go first:
+            queue_event = self.__peek_live()
+            if queue_event is None or queue_event.stime > event.stime or \
+                    queue_event.id > event.id:
+                lane.popleft()
+                del self.__evids[event.id]
+                return event
+            break
+
+        queue = self.__queue
+        while queue:
+            event = queue.pop()[2]
             if not event.removed:
                 # Update time:
                 assert event.stime >= self.__stime
                 self.__stime = event.stime
 
-                # Remove event from the EventID table and reduce queue size:
+                # Remove event from the EventID table:
                 del self.__evids[event.id]
-                self.__queue_size -= 1
-
                 return event
+            self.__num_dead_events -= 1
         raise KeyError('pop from empty queue')
 
+    def __peek_live(self):
+        """Get the first live event of the queue, dropping tombstones.
+        """
+        queue = self.__queue
+        while queue:
+            event = queue.peek()[2]
+            if not event.removed:
+                return event
+            queue.pop()
+            self.__num_dead_events -= 1
+        return None
+
     def _test_stop(self):
         return any(pred(self) for pred in self.__stop_predicates)
 
-    def setup(self, stime_limit=None):
+    def setup(self, stime_limit=None, stop_condition=None):
+        """Set up stop conditions. The run stops when any of them holds.
+
+        `stop_condition` is a callable getting the kernel and returning
+        `True` when the run should stop (e.g., `ConfidenceTracker`).
+        """
         if stime_limit is not None and stime_limit > 0:
             self.__stop_predicates.append(
                 lambda kern: stime_limit < kern.stime
             )
-
-    def run(self, sim, init, fin):
-        if hasattr(sim.data, 'initialize'):
-            sim.data.initialize(sim)
-        if init:
-            init(sim)
+        if stop_condition is not None:
+            self.__stop_predicates.append(stop_condition)
+
+    def run(self, sim, init, fin, profile=None, resumed=False):
+        """Run the simulation.
+
+        If `profile` (a `Profile` object) is given, handler calls are timed
+        and recorded into it. Otherwise, no profiling work is done per event.
+        If the simulation is `resumed` from a checkpoint, model is already
+        initialized, so neither `initialize()` method nor `init` are called.
+        """
+        if profile is not None:
+            profile.start(self)
+        if not resumed:
+            if hasattr(sim.data, 'initialize'):
+                sim.data.initialize(sim)
+            if init:
+                init(sim)
+
+        # Tracing is enabled or disabled for the whole run, so when the log
+        # level is above TRACE no tracing work is done per event:
+        if sim.logger.is_enabled_for(Logger.Level.TRACE):
+            call = self._call_traced
+        else:
+            call = self._call
+        if profile is not None:
+            call = self._get_profiled_call(call, profile)
 
         while not self.empty:
             event = self._next_event()
             if not self._test_stop():
                 if event.fn:
-                    if hasattr(event.fn, '__self__'):
-                        sim.logger.trace(
-                            f'** calling {event.fn.__name__}()',
-                            src=event.fn.__self__
-                        )
-                        event.fn(*event.args, **event.kwargs)
-                    else:
-                        sim.logger.trace(
-                            f'** {event.fn.__name__}()',
-                            src='kernel'
-                        )
-                        event.fn(sim, *event.args, **event.kwargs)
+                    call(sim, event)
                     self.__num_events += 1
             else:
+                # Keep the event pending, so the run may be continued from
+                # a checkpoint made after the run:
+                self.__evids[event.id] = event
+                self.__queue.push(event.stime, event.id, event)
                 break
 
         if fin:
             fin(sim)
+        if profile is not None:
+            profile.finish(self)
+
+    def _get_profiled_call(self, call, profile):
+        """Wrap the call to record its wall time and the number of events
+        scheduled by the handler into the profile.
+        """
+        perf_counter = time.perf_counter
+
+        def profiled_call(sim, event):
+            next_evid = self.__next_evid
+            started_at = perf_counter()
+            call(sim, event)
+            now = perf_counter()
+            profile.record(event.fn, now - started_at,
+                           self.__next_evid - next_evid)
+            profile.sample(self, now)
+
+        return profiled_call
+
+    @staticmethod
+    def _call(sim, event):
+        if hasattr(event.fn, '__self__'):
+            event.fn(*event.args, **event.kwargs)
+        else:
+            event.fn(sim, *event.args, **event.kwargs)
+
+    @staticmethod
+    def _call_traced(sim, event):
+        if hasattr(event.fn, '__self__'):
+            sim.logger.trace('** calling %s()', event.fn.__name__,
+                             src=event.fn.__self__)
+            event.fn(*event.args, **event.kwargs)
+        else:
+            sim.logger.trace('** %s()', event.fn.__name__, src='kernel')
+            event.fn(sim, *event.args, **event.kwargs)
 
 
 class Logger:
+    """Simulation logger.
+
+    Messages are formatted only if their level is enabled, so logging calls
+    at disabled levels are cheap. To avoid formatting costs, pass either
+    `%`-style arguments or a callable returning the message:
+
+    >>> sim.logger.debug('backoff=%d, CW=%d', backoff, cw, src=self)
+    >>> sim.logger.debug(lambda: f'transmitting {frame}', src=self)
+
+    Messages formatted with f-strings are still supported, but they are
+    built before the call even if the level is disabled.
+    """
     class Level(Enum):
         TRACE = 0
         DEBUG = 1
@@ -195,42 +365,65 @@ class Logger:
         ERROR = 4
 
     def __init__(self, kernel):
-        self.level = Logger.Level.INFO
         self.__kernel = kernel
+        self.__level = Logger.Level.INFO
+        self.__min_level_value = self.__level.value
 
     @property
     def kernel(self):
         return self.__kernel
 
-    def write(self, level, msg, src=''):
+    @property
+    def level(self):
+        return self.__level
+
+    @level.setter
+    def level(self, level):
+        self.__level = level
+        self.__min_level_value = level.value
+
+    def is_enabled_for(self, level):
+        return level.value >= self.__min_level_value
+
+    def write(self, level, msg, *args, src=''):
+        if level.value < self.__min_level_value:
+            return
+        if callable(msg):
+            msg = msg()
+        elif args:
+            msg = msg % args
+
         fs_bright = colorama.Style.BRIGHT
         fs_normal = colorama.Style.NORMAL
         fs_dim = colorama.Style.DIM
         fs_reset = colorama.Style.RESET_ALL + colorama.Fore.RESET
         time_color = colorama.Fore.LIGHTCYAN_EX
 
-        if level.value >= self.level.value:
-            lc = Logger.level2font(level)
-            src_str = (fs_bright + f'({src}) ' + fs_reset) if src else ''
-            level_str = fs_bright + lc + f'[{level.name:7s}]'
-            time_str = fs_dim + time_color + f'{self.kernel.stime:014.9f}'
-            msg_str = fs_normal + lc + msg
-            print(f'{level_str} {time_str} {src_str}{msg_str}' + fs_reset)
+        lc = Logger.level2font(level)
+        src_str = (fs_bright + f'({src}) ' + fs_reset) if src else ''
+        level_str = fs_bright + lc + f'[{level.name:7s}]'
+        time_str = fs_dim + time_color + f'{self.kernel.stime:014.9f}'
+        msg_str = fs_normal + lc + msg
+        print(f'{level_str} {time_str} {src_str}{msg_str}' + fs_reset)
 
-    def trace(self, msg, src=''):
-        self.write(Logger.Level.TRACE, msg, src)
+    def trace(self, msg, *args, src=''):
+        if self.__min_level_value <= 0:
+            self.write(Logger.Level.TRACE, msg, *args, src=src)
 
-    def debug(self, msg, src=''):
-        self.write(Logger.Level.DEBUG, msg, src)
+    def debug(self, msg, *args, src=''):
+        if self.__min_level_value <= 1:
+            self.write(Logger.Level.DEBUG, msg, *args, src=src)
 
-    def info(self, msg, src=''):
-        self.write(Logger.Level.INFO, msg, src)
+    def info(self, msg, *args, src=''):
+        if self.__min_level_value <= 2:
+            self.write(Logger.Level.INFO, msg, *args, src=src)
 
-    def warning(self, msg, src=''):
-        self.write(Logger.Level.WARNING, msg, src)
+    def warning(self, msg, *args, src=''):
+        if self.__min_level_value <= 3:
+            self.write(Logger.Level.WARNING, msg, *args, src=src)
 
-    def error(self, msg, src=''):
-        self.write(Logger.Level.ERROR, msg, src)
+    def error(self, msg, *args, src=''):
+        self.write(Logger.Level.ERROR, msg, *args, src=src)
 
     @staticmethod
     def level2font(level):
@@ -247,12 +440,25 @@ class Logger:
 
 
 class Simulator:
-    def __init__(self, kernel, protodata, handlers, params=None, loglevel=None):
+    """Simulation context passed to handlers and models.
+
+    Simulator owns a `numpy.random.SeedSequence` created from `seed`.
+    Each `Model` gets its own random stream `model.rng`, derived from this
+    sequence and the module path in the model tree, and `sim.rng` is the
+    stream for handlers which are not model methods. If `seed` is `None`,
+    fresh entropy is used (see `seed_sequence.entropy` to reproduce the run).
+    """
+    def __init__(self, kernel, protodata, handlers, params=None, loglevel=None,
+                 seed=None):
         params = {} if params is None else params
         self.__handlers = HandlersDict(handlers)
         self.__kernel = kernel
         self.__params = _ParamsDict(params)
         self.__logger = Logger(kernel)
+        self.__precision = None
+        self.__profile = None
+        self.__seed_sequence = np.random.SeedSequence(seed)
+        self.__rng = None
         if loglevel is not None:
             self.__logger.level = loglevel
         # Creating model data:
@@ -286,6 +492,14 @@ class Simulator:
     def schedule(self, delay, handler=None, args=(), kwargs=None):
         return self.__kernel.add_event(delay, handler, args, kwargs)
 
+    def checkpoint(self, path):
+        """Save the simulation state to the file (see `save_checkpoint()`).
+
+        May be called from event handlers during the run, or after it.
+        Continue the simulation with `simulate(resume_from=path)`.
+        """
+        save_checkpoint(self, self.__kernel, path)
+
     def cancel(self, evid):
         self.__kernel.remove_event(evid)
 
@@ -297,6 +511,42 @@ class Simulator:
     def data(self):
         return self.__data
 
+    def _set_data(self, data):
+        self.__data = data
+
+    @property
+    def seed_sequence(self):
+        return self.__seed_sequence
+
+    def _get_random_state(self):
+        return self.__seed_sequence, self.__rng
+
+    def _set_random_state(self, seed_sequence, rng):
+        self.__seed_sequence = seed_sequence
+        self.__rng = rng
+
+    @property
+    def rng(self):
+        """Random generator for handlers, which are not model methods."""
+        if self.__rng is None:
+            self.__rng = np.random.default_rng(
+                module_seed_sequence(self.__seed_sequence, ''))
+        return self.__rng
+
+    def reseed(self, seed):
+        """Replace the seed sequence and reset random streams of all models
+        in the data tree (e.g., when forking a model restored from a
+        checkpoint). Streams are created again when used next time.
+        """
+        self.__seed_sequence = np.random.SeedSequence(seed)
+        self.__rng = None
+        if isinstance(self.__data, Model):
+            modules = [self.__data]
+            while modules:
+                module = modules.pop()
+                module._reset_rng()
+                modules.extend(module.children.all())
+
     @property
     def handlers(self):
         return self.__handlers
@@ -305,35 +555,242 @@ class Simulator:
     def logger(self):
         return self.__logger
 
+    @property
+    def precision(self):
+        """Tracker of the confidence target (see `simulate()`), or `None`.
+        """
+        return self.__precision
 
-def simulate(data, init=None, fin=None, handlers=None, params=None,
-             stime_limit=None, loglevel=Logger.Level.INFO):
-    stime_limit = stime_limit if stime_limit is not None else 0
+    @precision.setter
+    def precision(self, tracker):
+        self.__precision = tracker
 
-    if isinstance(params, list):
-        results = []
-        for a_params in params:
-            kernel = Kernel()
-            sim = Simulator(kernel, data, handlers, a_params, loglevel)
-            kernel.setup(stime_limit=stime_limit)
-            kernel.run(sim, init=init, fin=fin)
-            results.append(sim)
-        return results
+    @property
+    def profile(self):
+        """Run `Profile` if profiling was enabled, or `None`.
+        """
+        return self.__profile
+
+    @profile.setter
+    def profile(self, profile):
+        self.__profile = profile
+
+
+def simulate(data=None, init=None, fin=None, handlers=None, params=None,
+             stime_limit=None, loglevel=Logger.Level.INFO,
+             event_queue='heap', workers=None, replications=None, seed=None,
+             extract=None, precision=None, immediate_events=False,
+             profile=False, resume_from=None, common_random_numbers=False):
+    """Run simulation of the model with given parameters.
+
+    If `params` is a list, the model is simulated with each parameters set
+    and a list of results is returned. If `replications` is given, each
+    parameters set is simulated `replications` times and a list of
+    replications results is returned instead of a single result.
+
+    Parameters
+    ----------
+    data : object or class
+        model data or its class (see `Simulator`). Not used when the run
+        is resumed from a checkpoint.
+    init, fin : callable, optional
+        functions called with `sim` argument before and after the run
+    handlers : dict, optional
+        named event handlers available via `sim.handlers`
+    params : dict or list of dicts, optional
+        model parameters, or a list of parameters sets (sweep)
+    stime_limit : float, optional
+        model time limit
+    precision : ConfidenceTarget, optional
+        sequential stopping rule: the run stops when confidence intervals
+        of the target metrics are narrow enough (or when `stime_limit` is
+        reached, if given). Estimates and the number of events needed are
+        available in `sim.precision` after the run.
+    loglevel : Logger.Level, optional
+    event_queue : str or callable, optional
+        pending events queue (see `create_event_queue()`), default: 'heap'
+    immediate_events : bool, optional
+        if `True`, zero-delay events (e.g. messages sent via connections
+        without delays) bypass the events queue via a FIFO lane in the
+        kernel. The order of events does not change (see `Kernel`).
+    profile : bool, optional
+        if `True`, per-handler call counts, wall time and fan-out, and
+        samples of the events queue size and events rate are collected
+        into `sim.profile` (see `Profile`). Disabled by default.
+    resume_from : str, optional
+        path to the checkpoint saved with `sim.checkpoint(path)`. The run
+        continues from the saved model time, pending events, model state and
+        random generators states, and `init` is not called. If `params` are
+        given, they replace the saved ones, so a warmed-up model may be
+        forked into several variants (a sweep or replications). If `seed`
+        is given, generators are seeded after the state is restored, so
+        forked replications use different random streams.
+    workers : int, optional
+        number of worker processes. If greater than one, runs are executed
+        in a process pool, and `extract` must be given. By default, runs
+        are executed sequentially in the current process.
+    replications : int, optional
+        number of runs with each parameters set
+    seed : int, optional
+        root seed. Each run gets its own seed spawned from it with
+        `numpy.random.SeedSequence`. It is used as the simulator seed
+        sequence (see `Model.rng`), and `numpy.random` and `random` global
+        generators (and generators of registered global seeders, see
+        `register_global_seeder()`) are seeded with it before the run. Thus
+        results are reproducible and don't depend on the number of workers.
+    common_random_numbers : bool, optional
+        if `True`, the i-th replications of all parameters sets get the same
+        seed, so modules random streams are the same across the sweep.
+    extract : callable, optional
+        function called with `sim` after each run, its return value is used
+        as the run result instead of the `Simulator` object. Only extracted
+        results are sent back from worker processes, not the whole model.
+
+    Returns
+    -------
+    result : Simulator, extracted value or (nested) list of them
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(
+            f'positive number of workers expected, {workers} found')
+    if replications is not None and replications < 1:
+        raise ValueError(
+            f'positive number of replications expected, {replications} found')
+    if workers is not None and workers > 1 and extract is None:
+        raise ValueError(
+            'extract is required when running in worker processes')
+    if resume_from is not None and data is not None:
+        raise ValueError('data must not be given when resuming from '
+                         'a checkpoint')
 
-    kernel = Kernel()
-    sim = Simulator(kernel, data, handlers, params, loglevel)
-    kernel.setup(stime_limit=stime_limit)
-    kernel.run(sim, init=init, fin=fin)
-    return sim
+    stime_limit = stime_limit if stime_limit is not None else 0
+    configs = params if isinstance(params, list) else [params]
+    num_replications = 1 if replications is None else replications
+    runs = [(config, None) for config in configs
+            for _ in range(num_replications)]
+    if seed is not None:
+        if common_random_numbers:
+            children = np.random.SeedSequence(seed).spawn(num_replications)
+            children = children * len(configs)
+        else:
+            children = np.random.SeedSequence(seed).spawn(len(runs))
+        runs = [(config, int(child.generate_state(1)[0]))
+                for (config, _), child in zip(runs, children)]
+
+    context = (data, init, fin, handlers, stime_limit, loglevel, event_queue,
+               immediate_events, extract, precision, profile, resume_from)
+    if workers is None or workers == 1 or len(runs) == 1:
+        results = [_run(context, config, run_seed)
+                   for config, run_seed in runs]
+    else:
+        # Worker processes get the context and runs in the initializer. With
+        # `fork` start method they are inherited instead of being pickled, so
+        # models and parameters need not be picklable (only the results do).
+        methods = multiprocessing.get_all_start_methods()
+        mp_context = multiprocessing.get_context(
+            'fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(
+                max_workers=min(workers, len(runs)), mp_context=mp_context,
+                initializer=_init_worker, initargs=(context, runs)) as pool:
+            results = list(pool.map(_run_in_worker, range(len(runs))))
+
+    if replications is not None:
+        results = [results[i:i + replications]
+                   for i in range(0, len(results), replications)]
+    return results if isinstance(params, list) else results[0]
+
+
+def _run(context, params, seed):
+    (data, init, fin, handlers, stime_limit, loglevel, event_queue,
+     immediate_events, extract, precision, profile, resume_from) = context
+    kernel = Kernel(event_queue, immediate_events=immediate_events)
+    if resume_from is not None:
+        sim = load_checkpoint(resume_from, kernel, handlers, params, loglevel)
+    if seed is not None:
+        _seed_global_generators(seed)
+    if resume_from is None:
+        sim = Simulator(kernel, data, handlers, params, loglevel, seed=seed)
+    elif seed is not None:
+        sim.reseed(seed)
+    tracker = precision.tracker(sim) if precision is not None else None
+    kernel.setup(stime_limit=stime_limit, stop_condition=tracker)
+    if profile:
+        sim.profile = Profile()
+    kernel.run(sim, init=init, fin=fin, profile=sim.profile,
+               resumed=(resume_from is not None))
+    if tracker is not None:
+        if not tracker.reached:
+            tracker.update()
+        sim.precision = tracker
+    return extract(sim) if extract is not None else sim
+
+
+# Functions seeding global generators of other libraries, see
+# `register_global_seeder()`:
+_global_seeders = []
+
+
+def register_global_seeder(fn):
+    """Register `fn(seed)` called before each seeded run (and in worker
+    processes, with fresh entropy) to seed a global random generator, e.g.
+    a default engine of some library. The seed is an integer in
+    `[0, 2**32)` derived from the run seed and the function name, so each
+    seeder gets its own value. Returns `fn`, so it can be used as
+    a decorator.
+    """
+    if fn not in _global_seeders:
+        _global_seeders.append(fn)
+    return fn
+
+
+def _seed_global_generators(seed):
+    """Seed `numpy.random` and `random` global generators with the run seed,
+    and call registered global seeders (see `register_global_seeder()`).
+    """
+    np.random.seed(seed)
+    random.seed(seed)
+    seed_sequence = np.random.SeedSequence(seed)
+    for fn in _global_seeders:
+        name = f'<{fn.__module__}.{fn.__qualname__}>'
+        fn(int(module_seed_sequence(seed_sequence, name).generate_state(1)[0]))
+
+
+# Context and runs of the worker process, set in `_init_worker()`:
+_worker_context = None
+_worker_runs = None
+
+
+def _init_worker(context, runs):
+    global _worker_context, _worker_runs
+    _worker_context, _worker_runs = context, runs
+    # Forked workers inherit the global generators states, so they are
+    # seeded from fresh entropy to make runs without seeds differ:
+    _seed_global_generators(
+        int(np.random.SeedSequence().generate_state(1)[0]))
+
+
+def _run_in_worker(index):
+    params, seed = _worker_runs[index]
+    return _run(_worker_context, params, seed)
 
 
 class _ModulesConnection:
+    """Connection from the manager owner to the module.
+
+    Delay kind (constant or callable, e.g. a random distribution) is
+    resolved when the delay is set, and handler keyword arguments are built
+    once, so `send()` only schedules the event. Zero-delay
+    messages bypass the events queue if the kernel uses immediate events
+    (see `simulate(..., immediate_events=True)`).
+    """
     def __init__(self, manager, module, name):
         self.__manager = manager
         self.__module = module
         self.__name = name
         self.__delay = 0
+        self.__delay_fn = None
         self.__reverse_connection = None
+        self.__kwargs = {'sender': self.origin, 'connection': None}
 
     @property
     def manager(self):
@@ -366,20 +823,18 @@ class _ModulesConnection:
     @delay.setter
     def delay(self, value):
         self.__delay = value
+        self.__delay_fn = value if callable(value) else None
 
     def send(self, message):
-        try:
-            # noinspection PyCallingNonCallable
-            delay = self.__delay()
-        except TypeError:
-            delay = self.__delay
+        delay_fn = self.__delay_fn
         self.sim.schedule(
-            delay, self.module.handle_message, args=(message,), kwargs={
-                'sender': self.origin, 'connection': self.reverse,
-            })
+            delay_fn() if delay_fn is not None else self.__delay,
+            self.__module.handle_message, args=(message,),
+            kwargs=self.__kwargs)
 
     def _set_reverse_connection(self, conn):
         self.__reverse_connection = conn
+        self.__kwargs = {'sender': self.origin, 'connection': conn}
 
 
 class _ConnectionsManager:
@@ -471,6 +926,9 @@ class _ChildrenManager:
         for name, module in d.items():
             self.__setitem__(name, module)
 
+    def names(self):
+        return self.__container.keys()
+
     def all(self):
         result = []
         for name, module in self.__container.items():
@@ -484,6 +942,7 @@ class _ChildrenManager:
 class Model:
     def __init__(self, sim, *args, **kwargs):
         self.__sim = sim
+        self.__rng = None
         self.__parent = None
         self.__children = {}
         self.__modules = {}
@@ -513,5 +972,36 @@ class Model:
     def _set_parent(self, parent):
         self.__parent = parent
 
+    @property
+    def rng(self):
+        """Random generator of the module (`numpy.random.Generator`).
+
+        The stream is derived from the simulator seed sequence and the module
+        path in the model tree, so it doesn't depend on other modules draws,
+        the order of modules creation or the worker process. The same seed
+        gives the same streams for all parameters sets (common random
+        numbers). The stream is created on the first use, so the module must
+        be added to the model tree by then (e.g. use it in handlers or in the
+        root model `initialize()` method, not in constructors).
+        """
+        if self.__rng is None:
+            if (self.__parent is None and
+                    self is not getattr(self.__sim, 'data', None)):
+                raise ValueError(
+                    f'{self.__class__.__name__} module is not in the model '
+                    f'tree, its random stream is not defined yet')
+            self.__rng = np.random.default_rng(module_seed_sequence(
+                self.__sim.seed_sequence, module_path(self)))
+        return self.__rng
+
+    def random_buffer(self, distribution, *args, size=RandomBuffer.SIZE):
+        """Get buffer of samples pre-generated from the module stream, e.g.
+        `self.random_buffer('exponential', 2.0)`.
+        """
+        return RandomBuffer(getattr(self.rng, distribution), *args, size=size)
+
+    def _reset_rng(self):
+        self.__rng = None
+
     def handle_message(self, message, connection=None, sender=None):
         pass
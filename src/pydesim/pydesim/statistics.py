@@ -1,33 +1,188 @@
+import copy
+from array import array
+
 import numpy as np
 
 
+def _copy_and_append(buffer, value):
+    """Get a copy of the array with appended value.
+
+    Used when the array memory is exposed to NumPy, so it can not be resized.
+    Exposed NumPy arrays keep referring the old memory.
+    """
+    buffer = array('d', buffer)
+    buffer.append(value)
+    return buffer
+
+
+def _extend(buffer, data):
+    """Extend the array with data and return it. If the array memory is
+    exposed to NumPy, the array is copied (see `_copy_and_append()`).
+    """
+    if isinstance(data, np.ndarray):
+        data = array('d', np.ascontiguousarray(data, dtype=float).tobytes())
+    try:
+        buffer.extend(data)
+    except BufferError:
+        buffer = array('d', buffer)
+        buffer.extend(data)
+    return buffer
+
+
 class Statistic:
-    def __init__(self, data=None):
+    """Statistic of numeric samples with streaming estimators.
+
+    Samples are appended to an `array('d')` buffer and folded into running
+    accumulators by NumPy in chunks, so per-sample overhead is small:
+
+    - count, mean and variance (Chan-Welford merge of chunks);
+    - raw moments up to `NUM_MOMENTS` (power sums);
+    - lag-k autocorrelation for `k <= max_lag` (cross sums of shifted data);
+    - quantile sketch of at most `SKETCH_SIZE` weighted centroids.
+
+    If `keep_samples = False`, samples are dropped after folding and memory
+    doesn't depend on the number of samples. In this case `as_list()`,
+    `asarray()`, `pmf()`, higher moments and lags are not available, and
+    `quantile()` is approximate. If `keep_samples = True` (default), all
+    samples are kept and `asarray()` returns them without copying.
+    """
+    CHUNK_SIZE = 4096
+    NUM_MOMENTS = 4
+    MAX_LAG = 10
+    SKETCH_SIZE = 256
+
+    def __init__(self, data=None, keep_samples=True, max_lag=MAX_LAG):
+        self._keep_samples = keep_samples
+        self._max_lag = max_lag
+        self._buffer = array('d')
+        self._num_folded = 0    # number of buffered samples already folded
+
+        # Accumulators of folded samples:
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._power_sums = np.zeros(self.NUM_MOMENTS + 1)
+        # Lags are estimated on data shifted by the first sample for better
+        # precision. Head and tail are the first and last `max_lag` samples:
+        self._shift = None
+        self._head = np.zeros(0)
+        self._tail = np.zeros(0)
+        self._cross_sums = np.zeros(max_lag + 1)
+        # Quantiles sketch:
+        self._centroids = np.zeros(0)
+        self._weights = np.zeros(0)
+        self._min = np.inf
+        self._max = -np.inf
+
         if data is not None:
-            self._data = list(data)
-        else:
-            self._data = []
+            self.extend(data)
+
+    @property
+    def keep_samples(self):
+        return self._keep_samples
 
     def append(self, value):
-        self._data.append(value)
+        try:
+            self._buffer.append(value)
+        except BufferError:
+            self._buffer = _copy_and_append(self._buffer, value)
+        if not self._keep_samples and len(self._buffer) >= self.CHUNK_SIZE:
+            self._fold()
 
     def extend(self, data):
-        self._data.extend(data)
+        self._buffer = _extend(self._buffer, data)
+        if not self._keep_samples and len(self._buffer) >= self.CHUNK_SIZE:
+            self._fold()
+
+    def _fold(self):
+        """Fold not yet processed samples into accumulators.
+        """
+        if len(self._buffer) == self._num_folded:
+            return
+        chunk = np.frombuffer(self._buffer, dtype=float)[self._num_folded:]
+        n = len(chunk)
+
+        # Mean and variance, merged with Chan et al. formula:
+        chunk_mean = chunk.mean()
+        chunk_m2 = np.sum((chunk - chunk_mean) ** 2)
+        total = self._count + n
+        delta = chunk_mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += chunk_m2 + delta ** 2 * self._count * n / total
+
+        # Raw moments:
+        power = np.ones(n)
+        for k in range(1, self.NUM_MOMENTS + 1):
+            power *= chunk
+            self._power_sums[k] += power.sum()
+
+        # Lags cross sums, computed over the tail of previous samples and
+        # the chunk. Pair (i, i + k) is counted when the chunk gets i + k:
+        if self._max_lag > 0:
+            if self._shift is None:
+                self._shift = chunk[0]
+            shifted = chunk - self._shift
+            ext = np.concatenate((self._tail, shifted))
+            offset = len(self._tail)
+            for k in range(1, self._max_lag + 1):
+                start = max(offset, k)
+                if start < len(ext):
+                    self._cross_sums[k] += np.dot(
+                        ext[start:], ext[start - k:len(ext) - k])
+            if len(self._head) < self._max_lag:
+                self._head = ext[:self._max_lag].copy()
+            self._tail = ext[-self._max_lag:].copy()
+
+        # Quantiles sketch (not needed when samples are kept):
+        if not self._keep_samples:
+            self._update_sketch(chunk)
+
+        self._count = total
+        if self._keep_samples:
+            self._num_folded = len(self._buffer)
+        else:
+            self._buffer = array('d')
+
+    def _update_sketch(self, chunk):
+        self._min = min(self._min, chunk.min())
+        self._max = max(self._max, chunk.max())
+        values = np.concatenate((self._centroids, chunk))
+        weights = np.concatenate((self._weights, np.ones(len(chunk))))
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+        if len(values) > self.SKETCH_SIZE:
+            # Merge neighbour centroids into SKETCH_SIZE groups of about
+            # equal weights:
+            cum_weights = np.cumsum(weights)
+            groups = np.minimum(
+                ((cum_weights - weights) * self.SKETCH_SIZE /
+                 cum_weights[-1]).astype(int),
+                self.SKETCH_SIZE - 1)
+            group_weights = np.bincount(groups, weights=weights)
+            group_sums = np.bincount(groups, weights=values * weights)
+            nonempty = group_weights > 0
+            values = group_sums[nonempty] / group_weights[nonempty]
+            weights = group_weights[nonempty]
+        self._centroids, self._weights = values, weights
+
+    def _require_samples(self):
+        if not self._keep_samples:
+            raise ValueError('samples are not kept, use keep_samples=True')
 
     def mean(self):
         if self.empty:
             raise ValueError('no data')
-        return self.asarray().mean()
+        self._fold()
+        return self._mean
 
     def std(self):
-        if self.empty:
-            raise ValueError('no data')
-        return self.asarray().std()
+        return self.var() ** 0.5
 
     def var(self):
         if self.empty:
             raise ValueError('no data')
-        return self.asarray().var()
+        self._fold()
+        return max(self._m2 / self._count, 0.0)
 
     def moment(self, k):
         n = len(self)
@@ -35,7 +190,15 @@ class Statistic:
             raise ValueError('no data')
         if np.abs(np.round(k) - k) > 0 or k <= 0:
             raise ValueError('positive integer expected')
-        return sum((x ** k for x in self._data)) / n
+        k = int(k)
+        if k <= self.NUM_MOMENTS:
+            self._fold()
+            return self._power_sums[k] / n
+        if not self._keep_samples:
+            raise ValueError(
+                f'moments of order above {self.NUM_MOMENTS} require '
+                f'keep_samples=True')
+        return np.mean(self.asarray() ** k)
 
     def lag(self, k):
         n = len(self)
@@ -45,39 +208,107 @@ class Statistic:
             raise ValueError('non-negative integer expected')
         if n <= k:
             raise ValueError('statistic has too few samples')
-        ar = self.asarray()
+        k = int(k)
         if k == 0:
             return 1
-        return np.corrcoef(ar[k:], ar[:-k])[0, 1]
+        if k > self._max_lag:
+            if not self._keep_samples:
+                raise ValueError(
+                    f'lags above {self._max_lag} require keep_samples=True')
+            ar = self.asarray()
+            return np.corrcoef(ar[k:], ar[:-k])[0, 1]
+
+        # Pearson correlation of x[k:] and x[:-k] from sums over shifted
+        # samples. Sums over x[k:] are full sums without the first k samples,
+        # sums over x[:-k] - without the last k samples:
+        self._fold()
+        m = n - k
+        s1 = n * (self._mean - self._shift)
+        s2 = self._m2 + n * (self._mean - self._shift) ** 2
+        head, tail = self._head[:k], self._tail[-k:]
+        mean_a = (s1 - head.sum()) / m
+        mean_b = (s1 - tail.sum()) / m
+        var_a = (s2 - np.dot(head, head)) / m - mean_a ** 2
+        var_b = (s2 - np.dot(tail, tail)) / m - mean_b ** 2
+        cov = self._cross_sums[k] / m - mean_a * mean_b
+        if var_a <= 0 or var_b <= 0:
+            return np.nan
+        return cov / np.sqrt(var_a * var_b)
+
+    def quantile(self, q):
+        """Get quantile(s) of the samples.
+
+        If samples are kept, quantiles are exact (as `numpy.quantile()` with
+        linear interpolation), otherwise they are estimated from the sketch.
+        """
+        if self.empty:
+            raise ValueError('no data')
+        if np.any(np.asarray(q) < 0) or np.any(np.asarray(q) > 1):
+            raise ValueError('quantile probability must be in [0, 1]')
+        if self._keep_samples:
+            return np.quantile(self.asarray(), q)
+        self._fold()
+        n = self._count
+        if n == 1:
+            return np.interp(q, [0, 1], [self._min, self._max])
+        # Centroid covers ranks from (cum - w) to (cum - 1), its position is
+        # the middle of this range. For unit weights this gives the same
+        # values as numpy.quantile():
+        cum_weights = np.cumsum(self._weights)
+        positions = (cum_weights - (self._weights + 1) / 2) / (n - 1)
+        positions = np.concatenate(([0.0], positions, [1.0]))
+        values = np.concatenate(([self._min], self._centroids, [self._max]))
+        return np.interp(q, positions, values)
 
     def __len__(self):
-        return len(self._data)
+        return self._count + len(self._buffer) - self._num_folded
 
     @property
     def empty(self):
-        return len(self._data) == 0
+        return len(self) == 0
 
     def as_list(self):
-        return list(self._data)
+        self._require_samples()
+        return self._buffer.tolist()
 
     def as_tuple(self):
-        return tuple(self._data)
+        return tuple(self.as_list())
 
     def asarray(self):
-        return np.asarray(self._data)
+        """Get samples as NumPy array sharing memory with the statistic.
+        """
+        self._require_samples()
+        return np.frombuffer(self._buffer, dtype=float)
 
     def pmf(self):
-        values = {}
-        for v in self._data:
-            if v not in values:
-                values[v] = 1
-            else:
-                values[v] += 1
-        return values
+        self._require_samples()
+        values, counts = np.unique(self.asarray(), return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
 
 
 class Trace:
-    def __init__(self, data=None, mode='auto'):
+    """Time-stamped values of some piecewise-constant function, e.g. system
+    size. Value `v[i]` is assumed to last from `t[i]` till `t[i + 1]`.
+
+    Time-weighted histogram of values (used by `pmf()` and `timeavg()`) is
+    updated in chunks. If `keep_samples = False`, samples are dropped after
+    that, so memory depends only on the number of distinct values.
+    Converters (`as_list()`, `as_tuple()`, `asarray()`) and `times`,
+    `values` arrays require `keep_samples = True` (default).
+    """
+    CHUNK_SIZE = 4096
+
+    def __init__(self, data=None, mode='auto', keep_samples=True):
+        self._keep_samples = keep_samples
+        self._times = array('d')
+        self._values = array('d')
+        self._num_folded = 0
+        self._count = 0
+        self._last_time = -np.inf
+        self._last_value = None     # value and time of the last folded
+        self._last_folded_time = None   # sample
+        self._durations = {}
+
         if data is not None:
             try:
                 valid_as_samples = all(len(item) == 2 for item in data)
@@ -89,59 +320,110 @@ class Trace:
                     raise ValueError('wrong data shape')
 
                 if (mode == 'auto' and valid_as_samples) or mode == 'samples':
-                    _data = [(t, v) for (t, v) in data]
+                    times = [t for (t, v) in data]
+                    values = [v for (t, v) in data]
                 elif mode in {'auto', 'split'}:
-                    _data = [(t, v) for t, v in zip(*data)]
+                    times, values = data
                 else:
                     raise ValueError('invalid mode')
 
-                ar = np.asarray(_data).transpose()[0]
+                ar = np.asarray(times, dtype=float)
                 if np.any((ar[1:] - ar[:-1]) < 0):
                     raise ValueError('data must be ordered by time')
 
-                self._data = _data
-        else:
-            self._data = []
+                for t, v in zip(times, values):
+                    self.record(t, v)
+
+    @property
+    def keep_samples(self):
+        return self._keep_samples
 
     def record(self, t, v):
-        if self._data and t < self._data[-1][0]:
+        if t < self._last_time:
             raise ValueError('adding data in past prohibited')
-        self._data.append((t, v),)
+        self._last_time = t
+        try:
+            self._times.append(t)
+        except BufferError:
+            self._times = _copy_and_append(self._times, t)
+        try:
+            self._values.append(v)
+        except BufferError:
+            self._values = _copy_and_append(self._values, v)
+        if not self._keep_samples and len(self._times) >= self.CHUNK_SIZE:
+            self._fold()
+
+    def _fold(self):
+        """Add durations of not yet processed samples to the histogram.
+        """
+        start = self._num_folded
+        if len(self._times) == start:
+            return
+        times = np.frombuffer(self._times, dtype=float)[start:]
+        values = np.frombuffer(self._values, dtype=float)[start:]
+        if self._last_value is not None:
+            # The last folded sample lasts till the first new one:
+            durations = self._durations
+            durations[self._last_value] = (
+                durations.get(self._last_value, 0.0) + times[0] -
+                self._last_folded_time)
+        if len(times) > 1:
+            keys, index = np.unique(values[:-1], return_inverse=True)
+            sums = np.bincount(index, weights=np.diff(times))
+            for key, duration in zip(keys.tolist(), sums.tolist()):
+                self._durations[key] = self._durations.get(key, 0.0) + duration
+        self._last_value = values[-1].item()
+        self._last_folded_time = times[-1].item()
+        self._count += len(times)
+        if self._keep_samples:
+            self._num_folded = len(self._times)
+        else:
+            self._times, self._values = array('d'), array('d')
 
     @property
     def empty(self):
-        return len(self._data) == 0
+        return len(self) == 0
 
     def __len__(self):
-        return len(self._data)
+        return self._count + len(self._times) - self._num_folded
 
     def pmf(self):
         if self.empty:
             raise ValueError('expected non-empty values')
-        values = {}
-        for i in range(0, len(self._data) - 1):
-            v, dt = self._data[i][1], self._data[i + 1][0] - self._data[i][0]
-            if self._data[i][1] not in values:
-                values[v] = dt
-            else:
-                values[v] += dt
-        total_time = sum(values.values())
-        values = {v: t / total_time for v, t in values.items()}
-        return values
+        self._fold()
+        total_time = sum(self._durations.values())
+        if total_time == 0:
+            return {}
+        return {v: t / total_time for v, t in self._durations.items()}
 
     def timeavg(self):
         return sum(v * p for v, p in self.pmf().items())
 
+    @property
+    def times(self):
+        """Timestamps as NumPy array sharing memory with the trace.
+        """
+        self._require_samples()
+        return np.frombuffer(self._times, dtype=float)
+
+    @property
+    def values(self):
+        """Values as NumPy array sharing memory with the trace.
+        """
+        self._require_samples()
+        return np.frombuffer(self._values, dtype=float)
+
+    def _require_samples(self):
+        if not self._keep_samples:
+            raise ValueError('samples are not kept, use keep_samples=True')
+
     def _convert(self, fn, mode):
+        self._require_samples()
         if mode == 'samples':
-            return fn(fn([t, v]) for (t, v) in self._data)
+            return fn(fn([t, v]) for (t, v) in zip(self._times, self._values))
         elif mode == 'split':
-            timestamps, values = [], []
-            for (t, v) in self._data:
-                timestamps.append(t)
-                values.append(v)
-            if timestamps:
-                return fn([fn(timestamps), fn(values)])
+            if self._times:
+                return fn([fn(self._times), fn(self._values)])
             return fn()
         else:
             raise ValueError('invalid mode')
@@ -153,11 +435,24 @@ class Trace:
         return self._convert(tuple, mode)
 
     def asarray(self, mode='samples'):
-        return np.asarray(self.as_list(mode))
+        if mode == 'samples':
+            return np.column_stack((self.times, self.values)) if self \
+                else np.zeros(0)
+        elif mode == 'split':
+            return np.vstack((self.times, self.values)) if self \
+                else np.zeros(0)
+        raise ValueError('invalid mode')
 
 
 class Intervals:
-    def __init__(self, timestamps=None):
+    """Intervals between time stamps, starting from zero.
+
+    Intervals are stored in a `Statistic`, so with `keep_samples = False`
+    memory doesn't depend on the number of recorded time stamps.
+    """
+    def __init__(self, timestamps=None, keep_samples=True):
+        self._last = 0
+        self._intervals = Statistic(keep_samples=keep_samples)
         if timestamps:
             _timestamps = [0] + list(timestamps)
             try:
@@ -166,20 +461,19 @@ class Intervals:
                     raise ValueError('timestamps must be ascending')
             except TypeError as e:
                 raise TypeError('only numeric values expected') from e
-            self._timestamps = [0] + list(timestamps)
-        else:
-            self._timestamps = [0]
+            for timestamp in timestamps:
+                self.record(timestamp)
 
     @property
     def last(self):
-        return self._timestamps[-1]
+        return self._last
 
     @property
     def empty(self):
-        return len(self._timestamps) == 1
+        return len(self._intervals) == 0
 
     def __len__(self):
-        return len(self._timestamps) - 1
+        return len(self._intervals)
 
     def record(self, timestamp):
         try:
@@ -187,14 +481,17 @@ class Intervals:
                 raise ValueError('prohibited timestamps from past')
         except TypeError as e:
             raise TypeError('only numeric values expected') from e
-        self._timestamps.append(timestamp)
+        self._intervals.append(timestamp - self._last)
+        self._last = timestamp
 
     def statistic(self):
-        return Statistic(self.as_tuple())
+        return copy.deepcopy(self._intervals)
 
     def as_tuple(self):
-        ar = np.asarray(self._timestamps)
-        return tuple(ar[1:] - ar[:-1])
+        return self._intervals.as_tuple()
 
     def as_list(self):
-        return list(self.as_tuple())
+        return self._intervals.as_list()
+
+    def asarray(self):
+        return self._intervals.asarray()
@@ -0,0 +1,260 @@
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+
+from .statistics import Trace
+
+
+def student_quantile(p, df):
+    """Get quantile of Student's t-distribution with `df` degrees of freedom.
+
+    Computed with Cornish-Fisher expansion around the normal quantile
+    (Abramowitz and Stegun, 26.7.5), which is accurate to 1e-3 for `df >= 5`.
+    """
+    if df < 1:
+        raise ValueError(f'positive degrees of freedom expected, {df} found')
+    z = NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 -
+          945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+
+def mser5(samples, batch_size=5):
+    """Get the number of initial samples to truncate with MSER-5 rule.
+
+    Samples are averaged in batches of `batch_size` (5), and the truncation
+    point `d` minimizes the squared standard error of the mean of the
+    remaining batch means, `sum((z[d:] - mean(z[d:])) ** 2) / (k - d) ** 2`.
+    As usual, `d` is searched in the first half of the batches only.
+    """
+    samples = np.asarray(samples, dtype=float)
+    k = len(samples) // batch_size
+    if k < 2:
+        return 0
+    z = samples[:k * batch_size].reshape(k, batch_size).mean(axis=1)
+    # Sums over z[d:] for all d:
+    sums = np.cumsum(z[::-1])[::-1]
+    squares = np.cumsum((z ** 2)[::-1])[::-1]
+    counts = np.arange(k, 0, -1)
+    mser = (squares - sums ** 2 / counts) / counts ** 2
+    return int(np.argmin(mser[:k // 2])) * batch_size
+
+
+class Estimate(namedtuple('Estimate', [
+        'mean', 'half_width', 'num_samples', 'num_truncated'])):
+    """Mean estimation with confidence interval half-width.
+
+    `num_samples` is the number of samples used after truncation of
+    `num_truncated` initial samples.
+    """
+    @property
+    def rel_half_width(self):
+        if self.half_width == 0:
+            return 0.0
+        if self.mean == 0:
+            return np.inf
+        return self.half_width / abs(self.mean)
+
+
+def batch_means(samples, num_batches=20, confidence=0.95, truncate=True):
+    """Estimate the mean and its confidence interval with batch means.
+
+    If `truncate` is `True`, the warm-up period is removed with `mser5()`
+    first. Then the remaining samples are split into `num_batches` batches
+    of equal size (the oldest samples, which do not fit, are dropped), and
+    the half-width is computed from batch means with Student's quantile.
+    """
+    if num_batches < 2:
+        raise ValueError(f'at least 2 batches expected, {num_batches} found')
+    if not 0 < confidence < 1:
+        raise ValueError(f'confidence must be in (0, 1), {confidence} found')
+    samples = np.asarray(samples, dtype=float)
+    num_truncated = mser5(samples) if truncate else 0
+    batch_size = (len(samples) - num_truncated) // num_batches
+    if batch_size < 1:
+        raise ValueError(f'too few samples for {num_batches} batches')
+    used = samples[len(samples) - batch_size * num_batches:]
+    means = used.reshape(num_batches, batch_size).mean(axis=1)
+    quantile = student_quantile((1 + confidence) / 2, num_batches - 1)
+    half_width = quantile * means.std(ddof=1) / np.sqrt(num_batches)
+    return Estimate(means.mean(), half_width, len(used),
+                    len(samples) - len(used))
+
+
+def trace_averages(trace, num_cells, end=None):
+    """Split the trace time range into `num_cells` equal cells and get
+    time-averages of the trace in each cell.
+
+    The last value lasts till `end` (if given, e.g. current model time)
+    or till the last timestamp.
+    """
+    times, values = trace.times, trace.values
+    if len(times) == 0:
+        return np.zeros(0)
+    end = times[-1] if end is None else max(end, times[-1])
+    if end <= times[0]:
+        return np.zeros(0)
+    # Area under the trace at timestamps and at cells borders:
+    areas = np.concatenate(([0.0], np.cumsum(values[:-1] * np.diff(times))))
+    borders = np.linspace(times[0], end, num_cells + 1)
+    index = np.searchsorted(times, borders, side='right') - 1
+    border_areas = areas[index] + values[index] * (borders - times[index])
+    return np.diff(border_areas) / (borders[1] - borders[0])
+
+
+class ConfidenceTarget:
+    """Sequential stopping rule: stop the run when confidence intervals of
+    all watched metrics are narrow enough.
+
+    Pass the target to `simulate(..., precision=target)`. Every
+    `check_interval` events the metrics are estimated with `batch_means()`
+    (warm-up is truncated with MSER-5), and the run stops when each metric
+    has at least `min_samples` samples and the relative half-width of its
+    confidence interval is at most `rel_width`.
+
+    Metrics are given with a dict of callables (or a list of them, then
+    their indices are used as names), which get `sim` and return a
+    `Statistic`, `Intervals` or `Trace` object. Traces are averaged over
+    `TRACE_CELLS` equal time cells, and cells averages are used as samples.
+    Metrics must keep samples (`keep_samples=True`).
+
+    The target itself is not changed during the run, so it can be used in
+    many runs. Results of the run are available in `sim.precision`
+    (see `ConfidenceTracker`).
+    """
+    TRACE_CELLS = 1000
+
+    def __init__(self, metrics, rel_width=0.05, confidence=0.95,
+                 num_batches=20, min_samples=1000, check_interval=10000):
+        if not isinstance(metrics, dict):
+            metrics = dict(enumerate(metrics))
+        if not metrics:
+            raise ValueError('at least one metric expected')
+        if rel_width <= 0:
+            raise ValueError(f'positive width expected, {rel_width} found')
+        if not 0 < confidence < 1:
+            raise ValueError(
+                f'confidence must be in (0, 1), {confidence} found')
+        if num_batches < 2:
+            raise ValueError(
+                f'at least 2 batches expected, {num_batches} found')
+        if check_interval < 1:
+            raise ValueError(
+                f'positive check interval expected, {check_interval} found')
+        self.__metrics = metrics
+        self.__rel_width = rel_width
+        self.__confidence = confidence
+        self.__num_batches = num_batches
+        self.__min_samples = max(min_samples, 2 * num_batches)
+        self.__check_interval = check_interval
+
+    @property
+    def metrics(self):
+        return self.__metrics
+
+    @property
+    def rel_width(self):
+        return self.__rel_width
+
+    @property
+    def confidence(self):
+        return self.__confidence
+
+    @property
+    def num_batches(self):
+        return self.__num_batches
+
+    @property
+    def min_samples(self):
+        return self.__min_samples
+
+    @property
+    def check_interval(self):
+        return self.__check_interval
+
+    def estimate(self, sim, metric):
+        """Estimate the metric mean, or return `None` if there are too few
+        samples yet.
+        """
+        if isinstance(metric, Trace):
+            if len(metric) < 2:
+                return None
+            samples = trace_averages(
+                metric, min(len(metric), self.TRACE_CELLS), end=sim.stime)
+        else:
+            samples = metric.asarray()
+        if len(samples) < self.__min_samples:
+            return None
+        return batch_means(samples, self.__num_batches, self.__confidence)
+
+    def tracker(self, sim):
+        return ConfidenceTracker(self, sim)
+
+
+class ConfidenceTracker:
+    """State of the `ConfidenceTarget` in a single run.
+
+    Tracker is used by the kernel as a stop predicate. After the run it
+    contains the latest estimates of all metrics, whether the target was
+    reached and the number of events and model time needed for that.
+    """
+    def __init__(self, target, sim):
+        self.__target = target
+        self.__sim = sim
+        self.__next_check = target.check_interval
+        self.__reached = False
+        self.__estimates = {}
+        self.__num_events = None
+        self.__stime = None
+
+    @property
+    def target(self):
+        return self.__target
+
+    @property
+    def reached(self):
+        return self.__reached
+
+    @property
+    def estimates(self):
+        """Dict of `Estimate` objects (or `None`) by metric names."""
+        return self.__estimates
+
+    @property
+    def num_events(self):
+        """Number of events when the metrics were estimated last time."""
+        return self.__num_events
+
+    @property
+    def stime(self):
+        return self.__stime
+
+    def __call__(self, kernel):
+        if kernel.num_events < self.__next_check:
+            return False
+        self.__next_check = kernel.num_events + self.__target.check_interval
+        return self.update()
+
+    def update(self):
+        """Estimate all metrics and check whether the target is reached.
+        """
+        sim, target = self.__sim, self.__target
+        self.__estimates = {
+            name: target.estimate(sim, getter(sim))
+            for name, getter in target.metrics.items()
+        }
+        self.__reached = all(
+            estimate is not None and estimate.rel_half_width <= target.rel_width
+            for estimate in self.__estimates.values())
+        self.__num_events = sim.num_events
+        self.__stime = sim.stime
+        return self.__reached
+
+    def __repr__(self):
+        return (f'ConfidenceTracker(reached={self.__reached}, '
+                f'num_events={self.__num_events}, stime={self.__stime}, '
+                f'estimates={self.__estimates})')
@@ -0,0 +1,57 @@
+import hashlib
+
+import numpy as np
+
+
+def path_spawn_key(path):
+    """Get a stable spawn key for the module path in the model tree.
+
+    Unlike `hash()`, the key does not depend on the process, so modules get
+    the same streams in worker processes and in different runs.
+    """
+    digest = hashlib.sha256(path.encode('utf-8')).digest()
+    return tuple(int.from_bytes(digest[i:i + 4], 'little')
+                 for i in range(0, 16, 4))
+
+
+def module_seed_sequence(root, path):
+    """Get seed sequence of the module random stream derived from the root
+    seed sequence and the module path.
+    """
+    return np.random.SeedSequence(
+        entropy=root.entropy,
+        spawn_key=tuple(root.spawn_key) + path_spawn_key(path),
+        pool_size=root.pool_size)
+
+
+class RandomBuffer:
+    """Buffer of pre-generated random samples.
+
+    Samples are drawn in batches of `size` with a single call of
+    `generate(*args, size=size)` (e.g. `rng.exponential`), and returned
+    one by one with `buffer()` calls. This avoids per-sample overhead of
+    NumPy generators. Since the whole batch is drawn from the stream at once,
+    the samples sequence differs from the one of per-sample calls.
+    """
+    SIZE = 1024
+
+    def __init__(self, generate, *args, size=SIZE):
+        if size < 1:
+            raise ValueError(f'positive buffer size expected, {size} found')
+        self.__generate = generate
+        self.__args = args
+        self.__size = size
+        self.__samples = []
+
+    @property
+    def size(self):
+        return self.__size
+
+    def __call__(self):
+        try:
+            return self.__samples.pop()
+        except IndexError:
+            samples = self.__generate(*self.__args, size=self.__size).tolist()
+            samples.reverse()
+            self.__samples = samples
+            return samples.pop()
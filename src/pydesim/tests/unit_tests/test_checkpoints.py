@@ -0,0 +1,186 @@
+import random
+
+import numpy as np
+import pytest
+
+from pydesim import simulate, Model
+
+
+class _Server(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.served = []
+
+    def handle_message(self, message, connection=None, sender=None):
+        self.served.append((self.sim.stime, message))
+
+
+class _Source(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.num_generated = 0
+        self.timeout = None
+        sim.schedule(0, self.generate)
+
+    def generate(self):
+        self.num_generated += 1
+        self.connections['server'].send(
+            (self.num_generated, random.random()))
+        if self.timeout is not None:
+            self.sim.cancel(self.timeout)
+        self.timeout = self.sim.schedule(100, self.generate)
+        self.sim.schedule(np.random.exponential(self.sim.params.interval),
+                          self.generate)
+
+
+class _Network(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.children['server'] = _Server(sim)
+        self.children['sources'] = [_Source(sim), _Source(sim)]
+        for source in self.children['sources']:
+            source.connections['server'] = self.children['server']
+            source.connections['server'].delay = 0.5
+
+
+def _save_checkpoint(sim, path):
+    sim.checkpoint(path)
+
+
+def _init(sim, path=None, stime=None):
+    sim.schedule(stime, _save_checkpoint, args=(path,))
+
+
+def _served(sim):
+    return sim.data.children['server'].served
+
+
+def test_resumed_simulation_gives_same_results(tmp_path):
+    path = str(tmp_path / 'model.ckpt')
+    expected = simulate(_Network, params={'interval': 1.0}, stime_limit=50,
+                        seed=1)
+    ret1 = simulate(
+        _Network, params={'interval': 1.0}, stime_limit=50, seed=1,
+        init=lambda sim: sim.schedule(20, _save_checkpoint, args=(path,)))
+    ret2 = simulate(resume_from=path, stime_limit=50)
+
+    assert _served(ret1) == _served(expected)
+    assert _served(ret2) == _served(expected)
+    assert ret2.num_events == expected.num_events
+    assert ret2.stime == expected.stime
+    assert ret2.params.interval == 1.0
+
+    # References to the simulator and between modules are restored:
+    network = ret2.data
+    assert all(source.sim is ret2 for source in network.children['sources'])
+    assert network.children['sources'][0].connections['server'].module is \
+        network.children['server']
+
+
+def test_checkpoint_after_the_run_continues_it(tmp_path):
+    path = str(tmp_path / 'model.ckpt')
+    expected = simulate(_Network, params={'interval': 1.0}, stime_limit=40,
+                        seed=2)
+    ret1 = simulate(_Network, params={'interval': 1.0}, stime_limit=15,
+                    seed=2)
+    ret1.checkpoint(path)
+    ret2 = simulate(resume_from=path, stime_limit=40)
+
+    assert _served(ret2) == _served(expected)
+
+
+def test_warmed_up_model_can_be_forked(tmp_path):
+    path = str(tmp_path / 'model.ckpt')
+    warm = simulate(_Network, params={'interval': 1.0}, stime_limit=20,
+                    seed=3)
+    warm.checkpoint(path)
+    num_served = len(_served(warm))
+
+    ret = simulate(resume_from=path, stime_limit=100,
+                   params=[{'interval': 1.0}, {'interval': 0.1}],
+                   replications=2, seed=4, extract=_served)
+
+    assert len(ret) == 2 and all(len(runs) == 2 for runs in ret)
+    for runs in ret:
+        # Forks share the warm-up period, but then diverge:
+        assert all(run[:num_served] == _served(warm) for run in runs)
+        assert runs[0] != runs[1]
+    assert len(ret[1][0]) > 2 * len(ret[0][0])
+
+
+def test_checkpoint_with_lambda_handler_raises_error(tmp_path):
+    ret = simulate([], init=lambda sim: sim.schedule(10, lambda s: None),
+                   stime_limit=1)
+    with pytest.raises(ValueError):
+        ret.checkpoint(str(tmp_path / 'model.ckpt'))
+
+
+def test_resume_with_data_raises_error(tmp_path):
+    with pytest.raises(ValueError):
+        simulate(_Network, resume_from=str(tmp_path / 'model.ckpt'))
+
+
+class _Timer(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.ticks = []
+        sim.schedule(1, self.__tick)
+
+    def __tick(self):
+        self.ticks.append(self.sim.stime)
+        self.sim.schedule(1, self.__tick)
+
+
+def test_checkpoint_restores_private_method_handlers(tmp_path):
+    path = str(tmp_path / 'model.ckpt')
+    simulate(_Timer, stime_limit=3).checkpoint(path)
+    ret = simulate(resume_from=path, stime_limit=6)
+    assert ret.data.ticks == [1, 2, 3, 4, 5, 6]
+
+
+class _RngSource(Model):
+    def __init__(self, sim, start):
+        super().__init__(sim)
+        self.samples = []
+        sim.schedule(start, self.generate)
+
+    def generate(self):
+        self.samples.append(self.rng.random())
+        self.sim.schedule(self.rng.exponential(1.0), self.generate)
+
+
+class _RngNetwork(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.handler_samples = []
+        # The second source uses its stream for the first time after
+        # the checkpoint, so the stream is derived from the restored seed:
+        self.children['sources'] = [_RngSource(sim, 0), _RngSource(sim, 30)]
+
+
+def _draw(sim):
+    sim.data.handler_samples.append(sim.rng.random())
+    sim.schedule(5, _draw)
+
+
+def _rng_samples(sim):
+    sources = sim.data.children['sources']
+    return [source.samples for source in sources], sim.data.handler_samples
+
+
+def test_resumed_simulation_continues_random_streams(tmp_path):
+    path = str(tmp_path / 'model.ckpt')
+
+    def init(sim, checkpoint=False):
+        sim.schedule(10, _draw)
+        if checkpoint:
+            sim.schedule(20, _save_checkpoint, args=(path,))
+
+    expected = simulate(_RngNetwork, stime_limit=50, seed=5, init=init)
+    simulate(_RngNetwork, stime_limit=50, seed=5,
+             init=lambda sim: init(sim, checkpoint=True))
+    ret = simulate(resume_from=path, stime_limit=50)
+
+    assert all(len(samples) > 5 for samples in _rng_samples(ret)[0])
+    assert _rng_samples(ret) == _rng_samples(expected)
+    assert ret.seed_sequence.entropy == expected.seed_sequence.entropy
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from pydesim import simulate, HeapEventQueue, CalendarEventQueue
+
+
+@pytest.mark.parametrize('queue_class', [HeapEventQueue, CalendarEventQueue])
+def test_event_queue_pops_items_ordered_by_time_and_id(queue_class):
+    queue = queue_class()
+    queue.push(5.0, 0, 'A')
+    queue.push(1.0, 1, 'B')
+    queue.push(5.0, 2, 'C')
+    queue.push(1.0, 3, 'D')
+    queue.push(0.0, 4, 'E')
+
+    assert len(queue) == 5
+    assert [queue.pop()[2] for _ in range(5)] == ['E', 'B', 'D', 'A', 'C']
+    assert len(queue) == 0
+
+    with pytest.raises(KeyError):
+        queue.pop()
+
+
+@pytest.mark.parametrize('scale', [1e-6, 1.0, 1e4])
+def test_calendar_queue_pops_items_in_the_same_order_as_heap(scale):
+    rng = random.Random(1)
+    heap, calendar = HeapEventQueue(), CalendarEventQueue()
+    heap_items, calendar_items = [], []
+    stime, evid = 0.0, 0
+
+    # Hold model: each step pops the nearest event and pushes a few events
+    # after it. Delays are rounded to get many events with equal times.
+    for step in range(20000):
+        num_pushed = rng.choice([0, 1, 1, 2, 3]) if step < 15000 else 0
+        for _ in range(num_pushed if heap or step > 0 else 1):
+            delay = round(rng.expovariate(1.0), 2) * scale
+            heap.push(stime + delay, evid, evid)
+            calendar.push(stime + delay, evid, evid)
+            evid += 1
+        if not heap:
+            break
+        heap_items.append(heap.pop())
+        calendar_items.append(calendar.pop())
+        stime = heap_items[-1][0]
+        assert len(heap) == len(calendar)
+
+    assert calendar_items == heap_items
+
+
+def test_calendar_queue_jumps_over_empty_years():
+    queue = CalendarEventQueue(num_buckets=4, width=1.0)
+    queue.push(1000.5, 0, 'A')
+    queue.push(2.5, 1, 'B')
+    queue.push(10000.0, 2, 'C')
+
+    assert [queue.pop()[2] for _ in range(3)] == ['B', 'A', 'C']
+
+
+def test_calendar_queue_validates_arguments():
+    with pytest.raises(ValueError):
+        CalendarEventQueue(num_buckets=0)
+    with pytest.raises(ValueError):
+        CalendarEventQueue(width=0)
+
+
+def _hold_model_trace(event_queue):
+    def handler(sim, index):
+        sim.data.append((sim.stime, index))
+        if sim.stime < 50:
+            sim.schedule(0.5 * (index % 4), handler, args=(index + 1,))
+
+    def init(sim):
+        for index in range(10):
+            sim.schedule(index % 3, handler, args=(index,))
+
+    return simulate([], init=init, event_queue=event_queue, stime_limit=60)
+
+
+@pytest.mark.parametrize('event_queue', [
+    'heap', 'calendar', CalendarEventQueue,
+    lambda: CalendarEventQueue(num_buckets=16, width=0.1),
+])
+def test_simulate_accepts_event_queue(event_queue):
+    expected = _hold_model_trace('heap')
+    ret = _hold_model_trace(event_queue)
+
+    assert ret.data == expected.data
+    assert ret.num_events == expected.num_events
+    assert ret.stime == expected.stime
+
+
+def test_simulate_with_unknown_event_queue_raises_error():
+    with pytest.raises(ValueError) as excinfo:
+        simulate([], event_queue='wrong')
+    assert 'unknown event queue' in str(excinfo.value)
+
+
+@pytest.mark.parametrize('queue_class', [HeapEventQueue, CalendarEventQueue])
+def test_event_queue_rebuild_replaces_content(queue_class):
+    queue = queue_class()
+    for evid in range(100):
+        queue.push(float(evid % 7), evid, evid)
+
+    items = [(float(evid % 5), evid, evid) for evid in range(0, 100, 3)]
+    queue.rebuild(reversed(items))
+
+    assert len(queue) == len(items)
+    assert [queue.pop() for _ in range(len(items))] == sorted(items)
@@ -98,3 +98,16 @@ def test_statistic(data):
     ints = Intervals(data)
     stats = ints.statistic()
     assert_almost_equal(stats.as_tuple(), ints.as_tuple())
+
+
+def test_streaming_intervals_statistic():
+    ints = Intervals(keep_samples=False)
+    for timestamp in range(1, 10001):
+        ints.record(timestamp * 0.5)
+
+    stats = ints.statistic()
+    assert len(ints) == 10000
+    assert_almost_equal(stats.mean(), 0.5)
+    assert_almost_equal(stats.var(), 0)
+    with pytest.raises(ValueError):
+        ints.as_tuple()
@@ -0,0 +1,75 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from pydesim import simulate, Logger
+
+
+class _Message:
+    def __init__(self):
+        self.num_formatted = 0
+
+    def __str__(self):
+        self.num_formatted += 1
+        return 'message'
+
+
+@pytest.fixture
+def logger():
+    return Logger(Mock(stime=1.0))
+
+
+def test_logger_does_not_format_messages_of_disabled_levels(logger, capsys):
+    logger.level = Logger.Level.WARNING
+    message = _Message()
+    factory = Mock(return_value='text')
+
+    logger.trace('trace %s', message)
+    logger.debug('debug %s', message)
+    logger.info(factory)
+
+    assert message.num_formatted == 0
+    factory.assert_not_called()
+    assert capsys.readouterr().out == ''
+
+
+def test_logger_formats_messages_of_enabled_levels(logger, capsys):
+    logger.level = Logger.Level.DEBUG
+    message = _Message()
+
+    logger.debug('debug %s, value=%d', message, 42, src='module')
+    logger.info(lambda: 'lazy info')
+    logger.warning('100% plain')
+
+    assert message.num_formatted == 1
+    out = capsys.readouterr().out
+    assert 'debug message, value=42' in out
+    assert 'lazy info' in out
+    assert '100% plain' in out
+    assert '(module)' in out
+
+
+def test_logger_is_enabled_for(logger):
+    logger.level = Logger.Level.INFO
+    assert not logger.is_enabled_for(Logger.Level.TRACE)
+    assert not logger.is_enabled_for(Logger.Level.DEBUG)
+    assert logger.is_enabled_for(Logger.Level.INFO)
+    assert logger.is_enabled_for(Logger.Level.ERROR)
+
+
+@pytest.mark.parametrize('level, num_traces', [
+    (Logger.Level.TRACE, 2), (Logger.Level.INFO, 0),
+])
+def test_kernel_traces_events_only_at_trace_level(level, num_traces):
+    def handler(sim):
+        sim.data.append(sim.stime)
+
+    def init(sim):
+        sim.schedule(1, handler)
+        sim.schedule(2, handler)
+
+    with patch.object(Logger, 'trace') as trace:
+        ret = simulate([], init=init, loglevel=level)
+
+    assert ret.data == [1, 2]
+    assert trace.call_count == num_traces
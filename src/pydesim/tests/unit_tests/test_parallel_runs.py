@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pytest
+
+from pydesim import simulate, Simulator, register_global_seeder
+from pydesim import simulator as simulator_module
+
+
+class _Samples:
+    def __init__(self, mean):
+        self.samples = []
+
+
+def _generate(sim):
+    sim.data.samples.append(np.random.exponential(sim.params.mean))
+    sim.schedule(sim.data.samples[-1], _generate)
+
+
+def _init(sim):
+    sim.schedule(0, _generate)
+
+
+# Last seed passed to `_global_seeder()`, extracted from each run:
+_global_seed = None
+
+
+def _global_seeder(seed):
+    global _global_seed
+    _global_seed = seed
+
+
+def _extract(sim):
+    return {'samples': sim.data.samples, 'pid': os.getpid(),
+            'global_seed': _global_seed}
+
+
+def _run(**kwargs):
+    return simulate(_Samples, init=_init, stime_limit=10, extract=_extract,
+                    **kwargs)
+
+
+def test_simulate_with_replications_returns_nested_lists():
+    ret = _run(params=[{'mean': 1}, {'mean': 2}], replications=3, seed=1)
+
+    assert len(ret) == 2
+    assert all(len(replications) == 3 for replications in ret)
+
+    # All runs get independent streams:
+    first_samples = [run['samples'][0] for runs in ret for run in runs]
+    assert len(set(first_samples)) == 6
+
+
+def test_simulate_with_seed_is_reproducible():
+    ret1 = _run(params={'mean': 1}, replications=2, seed=7)
+    ret2 = _run(params={'mean': 1}, replications=2, seed=7)
+    ret3 = _run(params={'mean': 1}, replications=2, seed=8)
+
+    assert [run['samples'] for run in ret1] == \
+           [run['samples'] for run in ret2]
+    assert ret1[0]['samples'] != ret3[0]['samples']
+
+
+def test_simulate_in_workers_gives_same_results_as_sequential_runs():
+    params = [{'mean': 0.5}, {'mean': 1}, {'mean': 2}]
+    sequential = _run(params=params, replications=2, seed=3)
+    parallel = _run(params=params, replications=2, seed=3, workers=3)
+
+    assert [[run['samples'] for run in runs] for runs in parallel] == \
+           [[run['samples'] for run in runs] for runs in sequential]
+    pids = {run['pid'] for runs in parallel for run in runs}
+    assert os.getpid() not in pids
+
+
+def test_simulate_without_extract_returns_simulators():
+    ret = simulate(_Samples, init=_init, stime_limit=10, params={'mean': 1},
+                   replications=2, seed=1)
+
+    assert all(isinstance(sim, Simulator) for sim in ret)
+
+
+@pytest.fixture
+def global_seeder():
+    register_global_seeder(_global_seeder)
+    yield _global_seeder
+    simulator_module._global_seeders.remove(_global_seeder)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_simulate_calls_registered_global_seeders(global_seeder, workers):
+    ret1 = _run(params={'mean': 1}, replications=2, seed=5, workers=workers)
+    ret2 = _run(params={'mean': 1}, replications=2, seed=5, workers=workers)
+    seeds = [run['global_seed'] for run in ret1]
+
+    assert all(isinstance(seed, int) and 0 <= seed < 2**32 for seed in seeds)
+    assert seeds[0] != seeds[1]
+    assert seeds == [run['global_seed'] for run in ret2]
+
+
+def test_register_global_seeder_ignores_duplicates(global_seeder):
+    assert register_global_seeder(global_seeder) is global_seeder
+    assert simulator_module._global_seeders.count(global_seeder) == 1
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'workers': 0}, {'replications': 0}, {'workers': 2, 'extract': None},
+])
+def test_simulate_with_invalid_executor_arguments_raises_error(kwargs):
+    with pytest.raises(ValueError):
+        simulate(_Samples, init=_init, stime_limit=1,
+                 params=[{'mean': 1}, {'mean': 2}], **kwargs)
@@ -0,0 +1,103 @@
+import pytest
+
+from pydesim import simulate, Model, Profile, HandlerStats
+from pydesim.profiling import module_path
+
+
+class _Leaf(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.num_ticks = 0
+
+    def tick(self):
+        self.num_ticks += 1
+        if self.num_ticks < 10:
+            self.sim.schedule(1, self.tick)
+            self.sim.schedule(0.5, self.noop)
+
+    def noop(self):
+        pass
+
+
+class _Node(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.children['leaf'] = _Leaf(sim)
+
+
+class _Root(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        self.children['nodes'] = [_Node(sim), _Node(sim)]
+        self.children['leaf'] = _Leaf(sim)
+        for leaf in self.leaves:
+            sim.schedule(0, leaf.tick)
+
+    @property
+    def leaves(self):
+        return [self.children['leaf']] + [
+            node.children['leaf'] for node in self.children['nodes']]
+
+
+def test_module_path():
+    ret = simulate(_Root)
+    node = ret.data.children['nodes'][1]
+
+    assert module_path(ret.data) == ''
+    assert module_path(ret.data.children['leaf']) == 'leaf'
+    assert module_path(node) == 'nodes[1]'
+    assert module_path(node.children['leaf']) == 'nodes[1].leaf'
+
+
+def test_simulate_collects_profile_per_handler_and_module():
+    ret = simulate(_Root, profile=True)
+    profile = ret.profile
+    handlers = {(item.path, item.handler): item for item in profile.handlers}
+
+    assert set(handlers) == {
+        (path, f'_Leaf.{name}')
+        for path in ('leaf', 'nodes[0].leaf', 'nodes[1].leaf')
+        for name in ('tick', 'noop')
+    }
+    tick = handlers[('nodes[0].leaf', '_Leaf.tick')]
+    assert isinstance(tick, HandlerStats)
+    assert tick.num_calls == 10
+    assert tick.num_scheduled == 18
+    assert tick.total_time > 0
+    assert handlers[('leaf', '_Leaf.noop')].num_scheduled == 0
+    assert sum(item.num_calls for item in profile.handlers) == ret.num_events
+
+    # Handlers are sorted by total time:
+    times = [item.total_time for item in profile.handlers]
+    assert times == sorted(times, reverse=True)
+
+    # At least the first and the last samples are recorded:
+    samples = profile.samples
+    assert samples[0].num_events == 0
+    assert samples[-1].num_events == ret.num_events
+    assert samples[-1].num_live_events == 0
+    assert profile.wall_time >= samples[-1].wall_time
+
+    report = profile.report()
+    assert 'nodes[1].leaf: _Leaf.tick' in report
+
+
+def test_simulate_without_profile():
+    ret = simulate(_Root)
+    assert ret.profile is None
+
+
+def test_profile_records_plain_functions():
+    def handler(sim):
+        pass
+
+    ret = simulate([], init=lambda sim: sim.schedule(1, handler), profile=True)
+    [stats] = ret.profile.handlers
+    assert stats.path == ''
+    assert stats.handler.endswith('handler')
+    assert stats.num_calls == 1
+
+
+def test_profile_validates_sample_interval():
+    with pytest.raises(ValueError):
+        Profile(sample_interval=0)
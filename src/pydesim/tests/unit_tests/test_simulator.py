@@ -2,7 +2,7 @@ from unittest.mock import patch, ANY, Mock
 
 import pytest
 
-from pydesim import simulate, Model
+from pydesim import simulate, Model, Kernel
 
 
 def test_simulate_signature():
@@ -244,7 +244,7 @@ def test_simulate_accepts_params():
     params = {'x': 10, 'y': 'hello'}
     with patch('pydesim.simulator.Simulator') as SimulatorMock:
         simulate([], params=params)
-        SimulatorMock.assert_called_with(ANY, [], ANY, params, ANY)
+        SimulatorMock.assert_called_with(ANY, [], ANY, params, ANY, seed=ANY)
 
 
 def test_params_accessible_via_getattr_and_getitem():
@@ -276,3 +276,87 @@ def test_simulate_calls_constructor_without_parameters_but_with_sim():
                 assert sim.params.y == 'hello'
         
         result = simulate(SomeModel, params={'x': 10, 'y': 'hello'})
+
+
+@pytest.mark.parametrize('event_queue', ['heap', 'calendar'])
+def test_kernel_compacts_queue_when_many_events_are_cancelled(event_queue):
+    kernel = Kernel(event_queue, compaction_threshold=0.5)
+    evids = [kernel.add_event(i * 0.1) for i in range(1000)]
+    cancelled = set(evids[::2]) | set(evids[:400])
+    for evid in evids:
+        if evid in cancelled:
+            kernel.remove_event(evid)
+        # Tombstones never exceed the threshold of the queue size:
+        assert kernel.num_dead_events <= max(
+            Kernel.MIN_COMPACTION_SIZE,
+            0.5 * (kernel.num_live_events + kernel.num_dead_events))
+
+    assert kernel.num_compactions > 0
+    assert kernel.num_live_events == 1000 - len(cancelled)
+
+    popped = []
+    while not kernel.empty:
+        popped.append(kernel._next_event().id)
+    assert popped == [evid for evid in evids if evid not in cancelled]
+    assert kernel.num_dead_events == 0
+
+
+def test_kernel_removes_event_only_once():
+    kernel = Kernel()
+    evid = kernel.add_event(1)
+    assert kernel.remove_event(evid).id == evid
+    assert kernel.remove_event(evid) is None
+    assert kernel.num_live_events == 0
+    assert kernel.num_dead_events == 1
+    assert kernel.empty
+
+
+@pytest.mark.parametrize('threshold', [0, 1.5])
+def test_kernel_validates_compaction_threshold(threshold):
+    with pytest.raises(ValueError):
+        Kernel(compaction_threshold=threshold)
+
+
+class _Relay(Model):
+    def __init__(self, sim, name, peer=None):
+        super().__init__(sim)
+        self.name = name
+        if peer is not None:
+            self.connections['peer'] = peer
+
+    def handle_message(self, message, connection=None, sender=None):
+        self.sim.data.append((self.sim.stime, self.name, message))
+        if message < 3 and 'peer' in self.connections:
+            self.connections['peer'].send(message + 1)
+
+
+def _relay_trace(immediate_events):
+    def record(sim, name):
+        sim.data.append((sim.stime, name, None))
+
+    def cancelled(sim):
+        raise RuntimeError('cancelled event called')
+
+    def init(sim):
+        tail = _Relay(sim, 'tail')
+        head = _Relay(sim, 'head', tail)
+        head.connections['peer'].delay = lambda: 0
+        for stime in (0, 1, 1, 2):
+            sim.schedule(stime, head.handle_message, args=(0,))
+            sim.schedule(stime, record, args=(f'timer-{stime}',))
+            # Zero-delay events scheduled from handlers and cancelled:
+            sim.schedule(stime, lambda s: s.cancel(
+                s.schedule(0, cancelled)))
+            sim.schedule(stime, lambda s, t=stime: s.schedule(
+                0, record, args=(f'zero-{t}',)))
+
+    return simulate([], init=init, immediate_events=immediate_events)
+
+
+def test_immediate_events_keep_events_order():
+    expected = _relay_trace(immediate_events=False)
+    ret = _relay_trace(immediate_events=True)
+
+    assert ret.data == expected.data
+    assert ret.num_events == expected.num_events
+    assert ret.stime == expected.stime
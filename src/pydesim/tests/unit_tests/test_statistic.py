@@ -171,3 +171,66 @@ def test_lag_k_estimation_for_positive_k():
     np.testing.assert_almost_equal(st.lag(1), 0)
     np.testing.assert_almost_equal(st.lag(2), -1)
     np.testing.assert_almost_equal(st.lag(3), 0)
+
+
+#
+# Streaming estimators
+#
+@pytest.mark.parametrize('size', [1, 7, 10000])
+def test_streaming_statistic_matches_statistic_with_samples(size):
+    data = np.random.RandomState(1).exponential(2, size=size) + 100
+    kept = Statistic(data)
+    streaming = Statistic(keep_samples=False)
+    for value in data:
+        streaming.append(value)
+
+    assert len(streaming) == size
+    assert len(streaming._buffer) < Statistic.CHUNK_SIZE
+    np.testing.assert_allclose(streaming.mean(), data.mean(), rtol=1e-12)
+    np.testing.assert_allclose(streaming.var(), data.var(), rtol=1e-9)
+    for k in range(1, Statistic.NUM_MOMENTS + 1):
+        np.testing.assert_allclose(
+            streaming.moment(k), np.mean(data ** k), rtol=1e-12)
+        assert kept.moment(k) == streaming.moment(k)
+    for k in range(1, min(size - 1, Statistic.MAX_LAG + 1)):
+        np.testing.assert_allclose(
+            streaming.lag(k), np.corrcoef(data[k:], data[:-k])[0, 1],
+            atol=1e-9)
+
+
+def test_streaming_statistic_quantiles():
+    data = np.random.RandomState(2).exponential(1, size=50000)
+    streaming = Statistic(keep_samples=False)
+    streaming.extend(data)
+
+    probs = [0, 0.1, 0.5, 0.9, 0.99, 1]
+    np.testing.assert_allclose(
+        streaming.quantile(probs), np.quantile(data, probs), rtol=0.02)
+    np.testing.assert_allclose(
+        Statistic(data).quantile(probs), np.quantile(data, probs))
+
+    # While the sketch is not compressed, quantiles are exact:
+    small = Statistic([3, 1, 2, 10], keep_samples=False)
+    np.testing.assert_allclose(
+        small.quantile(probs), np.quantile([3, 1, 2, 10], probs))
+    assert Statistic([5], keep_samples=False).quantile(0.3) == 5
+
+
+def test_streaming_statistic_does_not_provide_samples():
+    st = Statistic([1, 2, 3], keep_samples=False)
+    for method in (st.as_list, st.as_tuple, st.asarray, st.pmf,
+                   lambda: st.moment(Statistic.NUM_MOMENTS + 1),
+                   lambda: st.lag(Statistic.MAX_LAG + 1)):
+        with pytest.raises(ValueError):
+            method()
+
+
+def test_statistic_asarray_shares_memory_with_samples():
+    st = Statistic([1, 2, 3])
+    ar = st.asarray()
+    assert np.shares_memory(ar, st.asarray())
+
+    # Appending after the memory was exposed doesn't change the array:
+    st.append(4)
+    np.testing.assert_equal(ar, [1, 2, 3])
+    np.testing.assert_equal(st.asarray(), [1, 2, 3, 4])
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from pydesim import (simulate, Statistic, Trace, Intervals, ConfidenceTarget,
+                     batch_means, mser5)
+from pydesim.stopping import student_quantile, trace_averages
+
+
+@pytest.mark.parametrize('df, expected', [
+    (5, 2.5706), (9, 2.2622), (19, 2.0930), (99, 1.9842),
+])
+def test_student_quantile(df, expected):
+    assert student_quantile(0.975, df) == pytest.approx(expected, abs=2e-3)
+
+
+def test_mser5_truncates_warm_up_period():
+    rng = np.random.RandomState(1)
+    warm_up = np.linspace(50, 10, 200)
+    steady = 10 + rng.normal(size=2000)
+    truncated = mser5(np.concatenate((warm_up, steady)))
+
+    assert truncated % 5 == 0
+    assert 150 <= truncated <= 300
+    assert mser5(steady) < 500
+    assert mser5([1, 2, 3]) == 0
+
+
+def test_batch_means_interval_covers_the_mean():
+    rng = np.random.RandomState(2)
+    samples = rng.exponential(2.0, size=20000)
+    estimate = batch_means(samples, num_batches=20, confidence=0.99)
+
+    assert estimate.mean == pytest.approx(2.0, rel=0.05)
+    assert abs(estimate.mean - 2.0) < estimate.half_width < 0.1
+    assert estimate.rel_half_width == estimate.half_width / estimate.mean
+    assert estimate.num_samples + estimate.num_truncated == 20000
+    assert estimate.num_samples % 20 == 0
+
+
+def test_batch_means_validates_arguments():
+    with pytest.raises(ValueError):
+        batch_means([1, 2, 3], num_batches=1)
+    with pytest.raises(ValueError):
+        batch_means([1, 2, 3], confidence=1)
+    with pytest.raises(ValueError):
+        batch_means([1, 2, 3], num_batches=10)
+
+
+def test_trace_averages():
+    trace = Trace([(0, 1), (1, 3), (3, 0)])
+    assert list(trace_averages(trace, 4, end=4)) == [1, 3, 3, 0]
+    assert list(trace_averages(trace, 3)) == [1, 3, 3]
+    assert len(trace_averages(Trace(), 4)) == 0
+
+
+def test_target_estimates_statistic_trace_and_intervals():
+    target = ConfidenceTarget([lambda sim: None], min_samples=100)
+    sim = type('Sim', (), {'stime': 200.0})()
+    values = np.random.RandomState(3).uniform(size=200)
+
+    statistic = Statistic(values)
+    assert target.estimate(sim, statistic).num_samples >= 100
+    assert target.estimate(sim, Statistic(values[:50])) is None
+
+    intervals = Intervals(np.cumsum(values).tolist())
+    assert target.estimate(sim, intervals).mean == pytest.approx(
+        values.mean(), rel=0.1)
+
+    trace = Trace([(t, v) for t, v in enumerate(values)])
+    assert target.estimate(sim, trace).mean == pytest.approx(
+        values.mean(), rel=0.1)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'metrics': []}, {'rel_width': 0}, {'confidence': 1.5},
+    {'num_batches': 1}, {'check_interval': 0},
+])
+def test_target_validates_arguments(kwargs):
+    kwargs = {'metrics': [lambda sim: None], **kwargs}
+    with pytest.raises(ValueError):
+        ConfidenceTarget(**kwargs)
+
+
+class _Samples:
+    def __init__(self):
+        self.statistic = Statistic()
+
+
+def _generate(sim):
+    sim.data.statistic.append(np.random.exponential(1.0))
+    sim.schedule(1, _generate)
+
+
+def _init(sim):
+    sim.schedule(0, _generate)
+
+
+def _run(rel_width, stime_limit=None):
+    target = ConfidenceTarget(
+        {'x': lambda sim: sim.data.statistic}, rel_width=rel_width,
+        check_interval=500)
+    return simulate(_Samples, init=_init, precision=target,
+                    stime_limit=stime_limit, seed=1)
+
+
+def test_simulate_stops_when_confidence_target_is_reached():
+    ret_coarse = _run(rel_width=0.1)
+    ret_fine = _run(rel_width=0.02)
+
+    for ret in (ret_coarse, ret_fine):
+        assert ret.precision.reached
+        assert ret.precision.num_events == ret.num_events
+        assert ret.precision.num_events % 500 == 0
+        assert ret.precision.estimates['x'].rel_half_width <= \
+            ret.precision.target.rel_width
+        assert ret.precision.estimates['x'].mean == pytest.approx(1, rel=0.1)
+    assert ret_coarse.num_events < ret_fine.num_events
+
+
+def test_simulate_stops_on_time_limit_if_target_is_not_reached():
+    ret = _run(rel_width=1e-4, stime_limit=3000)
+
+    assert not ret.precision.reached
+    assert ret.stime == pytest.approx(3000, abs=1)
+    assert ret.precision.estimates['x'].rel_half_width > 1e-4
+
+
+def test_simulate_without_target_has_no_precision():
+    ret = simulate(_Samples, init=_init, stime_limit=10)
+    assert ret.precision is None
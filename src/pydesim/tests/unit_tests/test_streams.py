@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from pydesim import simulate, Model, RandomBuffer
+from pydesim.streams import module_seed_sequence
+
+
+class _Leaf(Model):
+    def __init__(self, sim, num_draws=1):
+        super().__init__(sim)
+        self.num_draws = num_draws
+        self.samples = []
+
+    def draw(self):
+        self.samples.extend(
+            self.rng.random() for _ in range(self.num_draws))
+        self.sim.schedule(1, self.draw)
+
+
+class _Tree(Model):
+    def __init__(self, sim):
+        super().__init__(sim)
+        # Modules are created in the order given by parameters:
+        leaves = {name: _Leaf(sim, num_draws=sim.params.get(name, 1))
+                  for name in sim.params.get('order', ('a', 'b'))}
+        self.children.update(leaves)
+
+    def initialize(self, sim):
+        for name in ('a', 'b'):
+            sim.schedule(0, self.children[name].draw)
+
+
+def _samples(sim):
+    return {name: sim.data.children[name].samples for name in ('a', 'b')}
+
+
+def test_module_streams_do_not_depend_on_other_modules():
+    ret1 = simulate(_Tree, stime_limit=10, seed=1)
+    ret2 = simulate(_Tree, stime_limit=10, seed=1, params={
+        'order': ('b', 'a'), 'b': 3})
+    ret3 = simulate(_Tree, stime_limit=10, seed=2)
+
+    assert _samples(ret1)['a'] == _samples(ret2)['a']
+    assert _samples(ret1)['b'] == _samples(ret2)['b'][:11]
+    assert _samples(ret1)['a'] != _samples(ret1)['b']
+    assert _samples(ret1)['a'] != _samples(ret3)['a']
+
+
+def test_common_random_numbers_across_parameters_sets():
+    params = [{'b': 1}, {'b': 2}]
+    ret = simulate(_Tree, stime_limit=5, params=params, replications=2,
+                   seed=1, common_random_numbers=True, extract=_samples)
+    independent = simulate(_Tree, stime_limit=5, params=params,
+                           replications=2, seed=1, extract=_samples)
+
+    for replication in range(2):
+        assert ret[0][replication]['a'] == ret[1][replication]['a']
+        assert ret[0][replication]['b'] == \
+            ret[1][replication]['b'][:len(ret[0][replication]['b'])]
+    assert ret[0][0]['a'] != ret[0][1]['a']
+    assert independent[0][0]['a'] != independent[1][0]['a']
+
+
+def test_module_stream_requires_module_in_tree():
+    def init(sim):
+        with pytest.raises(ValueError):
+            _ = _Leaf(sim).rng
+
+    simulate(_Tree, init=init, stime_limit=1, seed=1)
+
+
+def test_simulator_stream_is_reproducible():
+    def draw(sim):
+        sim.data.append(sim.rng.integers(0, 1000000))
+
+    def init(sim):
+        sim.schedule(1, draw)
+
+    ret1 = simulate([], init=init, seed=5)
+    ret2 = simulate([], init=init, seed=5)
+    assert ret1.data == ret2.data
+    assert ret1.seed_sequence.entropy == ret2.seed_sequence.entropy
+
+
+def test_random_buffer_draws_samples_in_batches():
+    rng = np.random.default_rng(1)
+    buffer = RandomBuffer(rng.exponential, 2.0, size=4)
+    samples = [buffer() for _ in range(10)]
+
+    expected = np.random.default_rng(1).exponential(2.0, size=12)
+    assert samples == expected[:10].tolist()
+    assert buffer.size == 4
+
+    with pytest.raises(ValueError):
+        RandomBuffer(rng.exponential, size=0)
+
+
+def test_model_random_buffer_uses_module_stream():
+    def init(sim):
+        leaf = sim.data.children['a']
+        buffer = leaf.random_buffer('uniform', 0, 1, size=8)
+        sim.data.buffered = [buffer() for _ in range(3)]
+
+    ret = simulate(_Tree, init=init, stime_limit=0.5, seed=3)
+    expected = np.random.default_rng(module_seed_sequence(
+        np.random.SeedSequence(ret.seed_sequence.entropy), 'a'))
+    assert ret.data.buffered == \
+        expected.uniform(0, 1, size=8)[:3].tolist()
+
+
+def test_module_streams_are_restored_from_checkpoint(tmp_path):
+    path = str(tmp_path / 'model.ckpt')
+    full = simulate(_Tree, stime_limit=6, seed=1)
+    simulate(_Tree, stime_limit=3, seed=1).checkpoint(path)
+    resumed = simulate(resume_from=path, stime_limit=6)
+    forked = simulate(resume_from=path, stime_limit=6, seed=2)
+
+    assert _samples(resumed) == _samples(full)
+    assert _samples(forked)['a'][:4] == _samples(full)['a'][:4]
+    assert _samples(forked)['a'][4:] != _samples(full)['a'][4:]
@@ -221,3 +221,41 @@ def test_asarray_with_illegal_mode_raises_error():
     with pytest.raises(ValueError) as excinfo:
         trace.asarray('wrong mode')
     assert 'invalid mode' in str(excinfo.value).lower()
+
+
+#
+# Streaming mode
+#
+def test_streaming_trace_pmf_matches_trace_with_samples():
+    rng = np.random.RandomState(1)
+    times = np.cumsum(rng.exponential(1, size=10000))
+    values = rng.randint(0, 5, size=10000)
+    kept = Trace((times, values), mode='split')
+    streaming = Trace(keep_samples=False)
+    for t, v in zip(times, values):
+        streaming.record(t, v)
+
+    assert len(streaming) == 10000
+    assert len(streaming._times) < Trace.CHUNK_SIZE
+    pmf, expected = streaming.pmf(), kept.pmf()
+    assert set(pmf.keys()) == set(expected.keys())
+    for v in expected:
+        np.testing.assert_almost_equal(pmf[v], expected[v])
+    np.testing.assert_almost_equal(streaming.timeavg(), kept.timeavg())
+
+    with pytest.raises(ValueError):
+        streaming.as_list()
+    with pytest.raises(ValueError):
+        streaming.record(times[-1] - 1, 0)
+
+
+def test_trace_times_and_values_share_memory_with_samples():
+    trace = Trace([(0, 1), (2, 3)])
+    times, values = trace.times, trace.values
+    assert np.shares_memory(times, trace.times)
+    np.testing.assert_equal(times, [0, 2])
+    np.testing.assert_equal(values, [1, 3])
+
+    trace.record(5, 0)
+    np.testing.assert_equal(trace.times, [0, 2, 5])
+    np.testing.assert_almost_equal(trace.timeavg(), 2.2)
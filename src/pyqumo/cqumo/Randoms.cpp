@@ -4,6 +4,8 @@
 #include "Randoms.h"
 #include <chrono>
 #include <algorithm>
+#include <sstream>
+#include <stdexcept>
 
 namespace cqumo {
 
@@ -12,6 +14,24 @@ namespace cqumo {
 bool isNegative(double x) { return x <= 0; }
 bool isNonPositive(double x) { return x < 0; }
 
+std::vector<RandomVariable*> cloneVars(
+        const std::vector<RandomVariable*>& vars,
+        void *engine) {
+    std::vector<RandomVariable*> clones;
+    clones.reserve(vars.size());
+    for (auto& var: vars) {
+        clones.push_back(var->clone(engine));
+    }
+    return clones;
+}
+
+void deleteVars(std::vector<RandomVariable*>& vars) {
+    for (auto& var: vars) {
+        delete var;
+    }
+    vars.clear();
+}
+
 
 // Functions
 // ---------------------------------------------------------------------------
@@ -43,6 +63,24 @@ Randoms::~Randoms() {
     destroyEngine(static_cast<void*>(engine_));
 }
 
+void Randoms::seed(unsigned seed) {
+    engine_->seed(seed);
+}
+
+std::string Randoms::getState() const {
+    std::ostringstream stream;
+    stream << *engine_;
+    return stream.str();
+}
+
+void Randoms::setState(const std::string& state) {
+    std::istringstream stream(state);
+    stream >> *engine_;
+    if (stream.fail()) {
+        throw std::invalid_argument("bad random engine state");
+    }
+}
+
 RandomVariable *Randoms::createExponential(double rate) {
     return new ExponentialVariable(engine_, rate);
 }
@@ -112,6 +150,12 @@ RandomVariable *Randoms::createSemiMarkovArrival(
 RandomVariable::RandomVariable(void *engine)
 : engine_(static_cast<std::default_random_engine*>(engine)){}
 
+void RandomVariable::fill(double *buffer, size_t size) {
+    for (size_t i = 0; i < size; ++i) {
+        buffer[i] = eval();
+    }
+}
+
 
 // ConstVariable
 // ---------------------------------------------------------------------------
@@ -123,6 +167,10 @@ double ConstVariable::eval() {
     return value_;
 }
 
+RandomVariable *ConstVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 // ExponentialVariable
 // ---------------------------------------------------------------------------
 ExponentialVariable::ExponentialVariable(void *engine, double rate)
@@ -134,6 +182,10 @@ double ExponentialVariable::eval() {
     return distribution(*engine());
 }
 
+RandomVariable *ExponentialVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 // UniformVarialbe
 // ---------------------------------------------------------------------------
 UniformVariable::UniformVariable(void *engine, double a, double b)
@@ -145,6 +197,10 @@ double UniformVariable::eval() {
     return distribution(*engine());
 }
 
+RandomVariable *UniformVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 
 // NormalVariable
 // ---------------------------------------------------------------------------
@@ -157,6 +213,10 @@ double NormalVariable::eval() {
     return distribution(*engine());
 }
 
+RandomVariable *NormalVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 
 // HyperExpVariable
 // --------------------------------------------------------------------------
@@ -188,6 +248,10 @@ double HyperExpVariable::eval() {
     return exponents_[state](*engine());
 }
 
+RandomVariable *HyperExpVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 
 // ErlangVariable
 // ---------------------------------------------------------------------------
@@ -207,6 +271,10 @@ double ErlangVariable::eval() {
     return value;
 }
 
+RandomVariable *ErlangVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 // MixtureVariable
 // ---------------------------------------------------------------------------
 MixtureVariable::MixtureVariable(
@@ -217,11 +285,25 @@ MixtureVariable::MixtureVariable(
     choices_ = std::discrete_distribution<int>(weights.begin(), weights.end());
 }
 
+MixtureVariable::~MixtureVariable() {
+    if (ownsVars_) {
+        deleteVars(vars_);
+    }
+}
+
 double MixtureVariable::eval() {
     auto state = static_cast<unsigned>(choices_(*engine()));
     return vars_[state]->eval();
 }
 
+RandomVariable *MixtureVariable::clone(void *engine) const {
+    auto copy = new MixtureVariable(*this);
+    copy->setEngine(engine);
+    copy->vars_ = cloneVars(vars_, engine);
+    copy->ownsVars_ = true;
+    return copy;
+}
+
 // AbsorbSemiMarkovVariable
 // ---------------------------------------------------------------------------
 AbsorbSemiMarkovVariable::AbsorbSemiMarkovVariable(
@@ -241,6 +323,12 @@ AbsorbSemiMarkovVariable::AbsorbSemiMarkovVariable(
     }
 }
 
+AbsorbSemiMarkovVariable::~AbsorbSemiMarkovVariable() {
+    if (ownsVars_) {
+        deleteVars(vars_);
+    }
+}
+
 double AbsorbSemiMarkovVariable::eval() {
     auto enginePtr = engine();
     int state = initChoices_(*enginePtr);
@@ -252,6 +340,14 @@ double AbsorbSemiMarkovVariable::eval() {
     return value;
 }
 
+RandomVariable *AbsorbSemiMarkovVariable::clone(void *engine) const {
+    auto copy = new AbsorbSemiMarkovVariable(*this);
+    copy->setEngine(engine);
+    copy->vars_ = cloneVars(vars_, engine);
+    copy->ownsVars_ = true;
+    return copy;
+}
+
 // ChoiceVariable
 // ---------------------------------------------------------------------------
 ChoiceVariable::ChoiceVariable(
@@ -266,6 +362,10 @@ double ChoiceVariable::eval() {
     return values_[choices_(*engine())];
 }
 
+RandomVariable *ChoiceVariable::clone(void *engine) const {
+    return cloneAs(*this, engine);
+}
+
 // SemiMarkovArrivalVariable
 // ---------------------------------------------------------------------------
 SemiMarkovArrivalVariable::SemiMarkovArrivalVariable(
@@ -286,6 +386,12 @@ SemiMarkovArrivalVariable::SemiMarkovArrivalVariable(
     order_ = static_cast<int>(initProbs.size());
 }
 
+SemiMarkovArrivalVariable::~SemiMarkovArrivalVariable() {
+    if (ownsVars_) {
+        deleteVars(vars_);
+    }
+}
+
 double SemiMarkovArrivalVariable::eval() {
     const int MAX_ITERS = 10000000;
     auto enginePtr = engine();
@@ -305,4 +411,13 @@ double SemiMarkovArrivalVariable::eval() {
     return value;
 }
 
+RandomVariable *SemiMarkovArrivalVariable::clone(void *engine) const {
+    auto copy = new SemiMarkovArrivalVariable(*this);
+    copy->setEngine(engine);
+    copy->vars_ = cloneVars(vars_, engine);
+    copy->ownsVars_ = true;
+    copy->state_ = copy->initChoices_(*(copy->engine()));
+    return copy;
+}
+
 }
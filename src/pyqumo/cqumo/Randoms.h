@@ -6,6 +6,7 @@
 
 #include "Functions.h"
 #include <random>
+#include <string>
 #include <vector>
 
 namespace cqumo {
@@ -23,6 +24,22 @@ class Randoms {
     Randoms(unsigned seed);
     ~Randoms();
 
+    /**
+     * Re-seed the engine. Variables created by this object share the engine,
+     * so they continue with the new random sequence.
+     */
+    void seed(unsigned seed);
+
+    /**
+     * Get the engine state as a string, see `setState()`.
+     */
+    std::string getState() const;
+
+    /**
+     * Restore the engine state written with `getState()`.
+     */
+    void setState(const std::string& state);
+
     RandomVariable *createConstant(double value);
     RandomVariable *createExponential(double rate);
     RandomVariable *createUniform(double a, double b);
@@ -65,6 +82,37 @@ class RandomVariable {
     inline std::default_random_engine *engine() const { return engine_; }
 
     virtual double eval() = 0;
+
+    /**
+     * Fill the buffer with consequent samples of the variable.
+     * This doesn't touch Python objects, so it can be called without GIL.
+     *
+     * @param buffer contiguous array of at least size elements
+     * @param size number of samples to write
+     */
+    void fill(double *buffer, size_t size);
+
+    /**
+     * Create an independent copy of the variable bound to another engine.
+     * Nested variables (if any) are cloned as well and owned by the copy.
+     * This is used to run replications in parallel, each with its own engine.
+     *
+     * @param engine random engine to be used by the copy
+     * @return new variable, caller is responsible for deleting it
+     */
+    virtual RandomVariable *clone(void *engine) const = 0;
+  protected:
+    inline void setEngine(void *engine) {
+        engine_ = static_cast<std::default_random_engine*>(engine);
+    }
+
+    /** Copy a variable without nested variables and bind it to the engine. */
+    template<typename T>
+    static RandomVariable *cloneAs(const T& var, void *engine) {
+        auto copy = new T(var);
+        copy->setEngine(engine);
+        return copy;
+    }
   private:
     std::default_random_engine *engine_ = nullptr;
 };
@@ -76,6 +124,7 @@ class ConstVariable : public RandomVariable {
     ~ConstVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     double value_ = 0.0;
 };
@@ -87,6 +136,7 @@ class ExponentialVariable : public RandomVariable {
     ~ExponentialVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::exponential_distribution<double> distribution;
 };
@@ -98,6 +148,7 @@ class UniformVariable : public RandomVariable {
     ~UniformVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::uniform_real_distribution<double> distribution;
 };
@@ -109,6 +160,7 @@ class NormalVariable : public RandomVariable  {
     ~NormalVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::normal_distribution<double> distribution;
 };
@@ -120,6 +172,7 @@ class ErlangVariable : public RandomVariable {
     ~ErlangVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     int shape_;
     std::exponential_distribution<double> exponent;
@@ -136,6 +189,7 @@ class HyperExpVariable : public RandomVariable {
     ~HyperExpVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::discrete_distribution<int> choices_;
     std::vector<std::exponential_distribution<double>> exponents_;
@@ -149,11 +203,13 @@ class MixtureVariable : public RandomVariable {
       const std::vector<RandomVariable*>& vars,
       const std::vector<double> weights);
     
-    ~MixtureVariable() override = default;
+    ~MixtureVariable() override;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::vector<RandomVariable*> vars_;
+    bool ownsVars_ = false;
     std::vector<double> weights_;
     std::discrete_distribution<int> choices_;
 };
@@ -168,11 +224,13 @@ class AbsorbSemiMarkovVariable : public RandomVariable {
       const std::vector<std::vector<double>>& transitions,
       int absorbState
     );
-    ~AbsorbSemiMarkovVariable() override = default;
+    ~AbsorbSemiMarkovVariable() override;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::vector<RandomVariable*> vars_;
+    bool ownsVars_ = false;
     int absorbState_;
     std::discrete_distribution<int> initChoices_;
     std::vector<std::discrete_distribution<int>> transitions_;
@@ -187,6 +245,7 @@ class ChoiceVariable : public RandomVariable {
     ~ChoiceVariable() override = default;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::vector<double> values_;
     std::discrete_distribution<int> choices_;
@@ -210,11 +269,13 @@ class SemiMarkovArrivalVariable : public RandomVariable {
       std::vector<double>& initProbs,
       const std::vector<std::vector<double>>& allTransProbs
     );
-    ~SemiMarkovArrivalVariable() override = default;
+    ~SemiMarkovArrivalVariable() override;
 
     double eval() override;
+    RandomVariable *clone(void *engine) const override;
   private:
     std::vector<RandomVariable*> vars_;
+    bool ownsVars_ = false;
     std::discrete_distribution<int> initChoices_;
     std::vector<std::discrete_distribution<int>> allTransChoices_;
     int state_;
@@ -3,9 +3,13 @@
  */
 #include "Simulation.h"
 #include "Marshal.h"
+#include <algorithm>
+#include <atomic>
 #include <chrono>
+#include <exception>
 #include <random>
 #include <iostream>
+#include <thread>
 
 
 namespace cqumo {
@@ -66,6 +70,16 @@ SimData simMM1(
         int queueCapacity,
         int maxPackets) {
     unsigned seed = std::chrono::system_clock::now().time_since_epoch().count();
+    return simMM1(arrivalRate, serviceRate, queueCapacity, maxPackets, seed);
+}
+
+
+SimData simMM1(
+        double arrivalRate,
+        double serviceRate,
+        int queueCapacity,
+        int maxPackets,
+        unsigned seed) {
     auto gen = std::default_random_engine(seed);
     struct Context {
         std::default_random_engine *gen = nullptr;
@@ -150,4 +164,101 @@ SimData simTandem(
     return simData;
 }
 
+
+
+// Batch simulation
+// --------------------------------------------------------------------------
+
+namespace {
+
+unsigned deriveSeed(unsigned baseSeed, unsigned configIndex, unsigned repIndex) {
+    std::seed_seq seq{baseSeed, configIndex, repIndex};
+    std::vector<unsigned> seeds(1);
+    seq.generate(seeds.begin(), seeds.end());
+    return seeds[0];
+}
+
+SimData simTandemReplication(const TandemConfig &config, unsigned seed) {
+    std::default_random_engine engine(seed);
+    void *enginePtr = static_cast<void*>(&engine);
+
+    std::vector<RandomVariable*> vars;
+    vars.push_back(config.arrival->clone(enginePtr));
+    for (auto &service: config.services) {
+        vars.push_back(service->clone(enginePtr));
+    }
+    auto makeFn = [](RandomVariable *var) -> DblFn {
+        return [var]() { return var->eval(); };
+    };
+    std::vector<DblFn> services;
+    for (unsigned i = 1; i < vars.size(); ++i) {
+        services.push_back(makeFn(vars[i]));
+    }
+
+    SimData simData;
+    try {
+        simData = simTandem(
+                makeFn(vars[0]), services, config.queueCapacity,
+                config.maxPackets);
+    } catch (...) {
+        for (auto &var: vars) delete var;
+        throw;
+    }
+    for (auto &var: vars) delete var;
+    return simData;
+}
+
+}
+
+
+std::vector<SimData> simTandemBatch(
+        const std::vector<TandemConfig>& configs,
+        int numReplications,
+        int numThreads,
+        unsigned baseSeed) {
+    int numTasks = static_cast<int>(configs.size()) * numReplications;
+    std::vector<SimData> results(numTasks > 0 ? numTasks : 0);
+    if (numTasks <= 0) {
+        return results;
+    }
+    if (numThreads <= 0) {
+        numThreads = static_cast<int>(std::thread::hardware_concurrency());
+    }
+    numThreads = std::max(1, std::min(numThreads, numTasks));
+
+    std::atomic<int> nextTask(0);
+    std::vector<std::exception_ptr> errors(numThreads);
+
+    auto worker = [&](int threadIndex) {
+        try {
+            int task;
+            while ((task = nextTask++) < numTasks) {
+                int configIndex = task / numReplications;
+                int repIndex = task % numReplications;
+                unsigned seed = deriveSeed(baseSeed, configIndex, repIndex);
+                results[task] = simTandemReplication(
+                        configs[configIndex], seed);
+            }
+        } catch (...) {
+            errors[threadIndex] = std::current_exception();
+            nextTask = numTasks;  // stop other threads
+        }
+    };
+
+    std::vector<std::thread> threads;
+    for (int i = 1; i < numThreads; ++i) {
+        threads.emplace_back(worker, i);
+    }
+    worker(0);
+    for (auto &thread: threads) {
+        thread.join();
+    }
+    for (auto &error: errors) {
+        if (error) {
+            std::rethrow_exception(error);
+        }
+    }
+    return results;
+}
+
 }
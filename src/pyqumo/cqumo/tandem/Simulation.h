@@ -21,6 +21,9 @@
  *
  * - simMM1(): simulate a basic queueing system M/M/1/N or M/M/1
  * - simGG1(): simulate a general queueing system G/G/1/N or G/G/1
+ * - simTandem(): simulate a tandem network without cross-traffic
+ * - simTandemBatch(): run independent replications of tandem networks
+ *      in parallel threads, each replication with its own random engine
  *
  * @author Andrey Larionov
  */
@@ -32,6 +35,7 @@
 #include "Statistics.h"
 #include "Components.h"
 #include "System.h"
+#include "Randoms.h"
 
 
 #define MAX_PACKETS 10000
@@ -145,6 +149,25 @@ SimData simMM1(
         int queueCapacity = -1,
         int maxPackets = MAX_PACKETS);
 
+/**
+ * Simulate M/M/1 or M/M/1/N queueing system using the given seed.
+ *
+ * @param arrivalRate inverse of mean arrival interval ('lambda')
+ * @param serviceRate inverse of mean service duration ('mu')
+ * @param queueCapacity if non-negative, queue capacity, otherwise queue
+ *          is supposed to be infinite
+ * @param maxPackets simulation will finish when this number of packets
+ *          will be generated
+ * @param seed random engine seed
+ * @return SimData
+ */
+SimData simMM1(
+        double arrivalRate,
+        double serviceRate,
+        int queueCapacity,
+        int maxPackets,
+        unsigned seed);
+
 /**
  * Simulate G/G/1 or G/G/1/N queueing system.
  *
@@ -168,6 +191,49 @@ SimData simTandem(
     int queueCapacity = -1,
     int maxPackets = MAX_PACKETS);
 
+
+/**
+ * Parameters of a tandem network simulated with simTandemBatch().
+ *
+ * Random variables are not owned by the config. They are never evaluated
+ * directly, instead each replication clones them and binds the clones to
+ * its own random engine.
+ */
+struct TandemConfig {
+    RandomVariable *arrival = nullptr;      ///< Arrival intervals at node 0
+    std::vector<RandomVariable*> services;  ///< Service durations at nodes
+    int queueCapacity = -1;                 ///< Queue capacity, -1 if infinite
+    int maxPackets = MAX_PACKETS;           ///< Number of packets to generate
+};
+
+
+/**
+ * Run independent replications of tandem networks on a pool of threads.
+ *
+ * Each replication gets its own random engine with a seed derived from
+ * base seed, config index and replication index, so the results don't
+ * depend on the number of threads and the order of execution.
+ *
+ * Results are ordered by configs, and by replications inside each config,
+ * i.e. results of replication `r` of config `c` are stored at index
+ * `c * numReplications + r`.
+ *
+ * This function doesn't call any Python code, so it can be called
+ * without holding GIL.
+ *
+ * @param configs tandem networks parameters
+ * @param numReplications number of replications of each config
+ * @param numThreads number of threads, if non-positive, then the number
+ *          of hardware threads is used
+ * @param baseSeed seed used to derive replications seeds
+ * @return vector of SimData of size `configs.size() * numReplications`
+ */
+std::vector<SimData> simTandemBatch(
+    const std::vector<TandemConfig>& configs,
+    int numReplications,
+    int numThreads = 0,
+    unsigned baseSeed = 0);
+
 }
 
 #endif //CQUMO_TANDEM_SIMULATION_H
@@ -1,9 +1,13 @@
 from functools import cached_property
+from inspect import signature
 from typing import Union, Sequence, Iterable, Optional, Tuple, Iterator
 
 import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu, spilu, gmres, bicgstab, lsqr, \
+    LinearOperator
 
-from pyqumo.errors import MatrixShapeError
+from pyqumo.errors import MatrixShapeError, CellValueError, RowSumError
 from pyqumo.matrix import is_infinitesimal, order_of, is_pmf, is_stochastic, \
     fix_stochastic, identity, fix_infinitesimal, str_array, is_square
 
@@ -12,17 +16,19 @@ class DiscreteTimeMarkovChain:
     """
     Class representing discrete time Markov chain.
     """
-    def __init__(self, matrix: Union[Sequence[Sequence[float]], np.ndarray],
+    def __init__(self, matrix: Union[Sequence[Sequence[float]], np.ndarray,
+                                     sp.spmatrix],
                  safe: bool = False, tol: float = 1e-3):
         """
         Discrete time Markov chain constructor.
 
         Parameters
         ----------
-        matrix : 2-D array_like
+        matrix : 2-D array_like or scipy.sparse matrix
             Transition matrix. If `safe = False` it is checked to be stochastic
             and, if check fails, attempt to fix it with `fix_stochastic()`
-            call is made. When fixing, use tolerance `tol`.
+            call is made. When fixing, use tolerance `tol`. Sparse matrices
+            are stored in CSR format.
         safe : bool, optional
             Flag indicating whether there is no need to validate matrix.
             Default: `False`.
@@ -30,19 +36,24 @@ class DiscreteTimeMarkovChain:
             Tolerance used when fixing broken transition matrix.
             If `safe = True` is set, this field is ignored. Default: 1e-3.
         """
-        if not isinstance(matrix, np.ndarray):
+        if sp.issparse(matrix):
+            matrix = sp.csr_matrix(matrix, copy=True)
+        elif not isinstance(matrix, np.ndarray):
             matrix = np.asarray(matrix)
         else:
             matrix = matrix.copy()  # copy to avoid side-effects
         if not is_square(matrix):
             raise MatrixShapeError('(N, N)', matrix.shape, 'transition matrix')
-        if not safe and not is_stochastic(matrix):
-            matrix = fix_stochastic(matrix, tol=tol)[0]
+        if not safe:
+            if sp.issparse(matrix):
+                matrix = _fix_sparse_stochastic(matrix, tol=tol)
+            elif not is_stochastic(matrix):
+                matrix = fix_stochastic(matrix, tol=tol)[0]
         self._matrix = matrix
         self._order = order_of(matrix)
 
     @property
-    def matrix(self) -> np.ndarray:
+    def matrix(self) -> Union[np.ndarray, sp.csr_matrix]:
         """
         Get transitions matrix.
         """
@@ -60,9 +71,11 @@ class DiscreteTimeMarkovChain:
         """
         Returns the steady-state probabilities distribution (mass function).
 
-        The algorithm will attempt to use `numpy.linalg.solve()` method to
-        solve the system. If it fails due to singular matrix,
-        `numpy.linalg.lstsq()` method will be used.
+        For dense matrices, the algorithm will attempt to use
+        `numpy.linalg.solve()` method to solve the system. If it fails due to
+        singular matrix, `numpy.linalg.lstsq()` method will be used.
+        For sparse matrices, sparse LU decomposition is used.
+        See `solve_steady_pmf()` for other methods.
 
         Notes
         -----
@@ -70,16 +83,23 @@ class DiscreteTimeMarkovChain:
         lot of time, all the succeeding calls will require only cache
         lookups and have O(1) complexity.
         """
-        n = self.order
-        left_side = np.vstack((self.matrix.T - np.eye(n), np.ones((1, n))))
-        right_side = np.zeros(n + 1)
-        right_side[-1] = 1.
-        try:
-            left_side_ = left_side[1:, :]
-            right_side_ = right_side[1:]
-            return np.linalg.solve(left_side_, right_side_)
-        except np.linalg.LinAlgError:
-            return np.linalg.lstsq(left_side, right_side)[0]
+        return self.solve_steady_pmf()
+
+    def solve_steady_pmf(self, method: str = 'auto', tol: float = 1e-10,
+                         max_iter: int = 10000) -> np.ndarray:
+        """
+        Find the steady-state PMF with the given method (without caching).
+
+        The chain is solved as a CTMC with generator `P - I`, so the methods
+        are the same as in `ContinuousTimeMarkovChain.solve_steady_pmf()`.
+        Periodic chains are supported by iterative methods as well, since
+        uniformization makes the chain aperiodic.
+        """
+        if sp.issparse(self.matrix):
+            generator = self.matrix - sp.identity(self.order, format='csr')
+        else:
+            generator = self.matrix - np.eye(self.order)
+        return _solve_steady_pmf(generator, method, tol, max_iter)
 
     def trace(self, size: Optional[int] = None,
               init: Union[int, Sequence[float], None] = None,
@@ -138,6 +158,8 @@ class DiscreteTimeMarkovChain:
         step = 0
         while size is None or step < size and (not ends or state not in ends):
             probs = self.matrix[state]
+            if sp.issparse(probs):
+                probs = probs.toarray().flatten()
             next_state = np.random.choice(np.arange(self.order), p=probs)
             yield state, next_state
             state = next_state
@@ -180,14 +202,18 @@ class DiscreteTimeMarkovChain:
         return first + tuple(step[1] for step in generator)
 
     def __repr__(self):
-        return f"(DTMC: t={str_array(self.matrix)})"
+        matrix = self.matrix
+        if sp.issparse(matrix):
+            matrix = matrix.toarray()
+        return f"(DTMC: t={str_array(matrix)})"
 
 
 class ContinuousTimeMarkovChain:
     """
     Class representing continuous time Markov chain.
     """
-    def __init__(self, matrix: Sequence[Sequence[float]],
+    def __init__(self, matrix: Union[Sequence[Sequence[float]], np.ndarray,
+                                     sp.spmatrix],
                  safe: bool = False,
                  tol: float = 1e-3):
         """
@@ -195,8 +221,9 @@ class ContinuousTimeMarkovChain:
 
         Parameters
         ----------
-        matrix : 2-D array_like
-            An infinitesimal matrix (chain generator).
+        matrix : 2-D array_like or scipy.sparse matrix
+            An infinitesimal matrix (chain generator). Sparse matrices are
+            stored in CSR format.
         safe : bool, optional
             Flag indicating the matrix is safe to use. If `False` (default),
             no validation or attempts to fix will be performed.
@@ -204,21 +231,31 @@ class ContinuousTimeMarkovChain:
             Tolerance used when fixing broken infinitesimal generator matrix.
             If `safe = True` is set, this field is ignored. Default: 1e-3.
         """
-        need_copy = False
-        if not isinstance(matrix, np.ndarray):
-            matrix = np.asarray(matrix)
+        if sp.issparse(matrix):
+            matrix = sp.csr_matrix(matrix, copy=True)
+            if not is_square(matrix):
+                raise MatrixShapeError('(N, N)', matrix.shape, 'generator')
+            if not safe:
+                matrix = _fix_sparse_infinitesimal(matrix, tol=tol)
         else:
-            need_copy = True
-
-        if not safe and not is_infinitesimal(matrix):
-            matrix = fix_infinitesimal(matrix, tol=tol)[0]
             need_copy = False
+            if not isinstance(matrix, np.ndarray):
+                matrix = np.asarray(matrix)
+            else:
+                need_copy = True
 
-        self._matrix = matrix if not need_copy else matrix.copy()
+            if not safe and not is_infinitesimal(matrix):
+                matrix = fix_infinitesimal(matrix, tol=tol)[0]
+                need_copy = False
+
+            if need_copy:
+                matrix = matrix.copy()
+
+        self._matrix = matrix
         self._order = order_of(matrix)
 
     @property
-    def matrix(self) -> np.ndarray:
+    def matrix(self) -> Union[np.ndarray, sp.csr_matrix]:
         """
         Get infinitesimal generator of the chain.
         """
@@ -246,6 +283,8 @@ class ContinuousTimeMarkovChain:
         Depending on the generator matrix  the algorithm will use either
         `numpy.linalg.solve()` (if the generator matrix has rank N-1), or
         `numpy.linalg.lstsq()` (if the generator matrix has rank N-2 or less).
+        If the generator is sparse, sparse LU decomposition is used instead.
+        See `solve_steady_pmf()` for other methods.
 
         Notes
         -----
@@ -253,15 +292,47 @@ class ContinuousTimeMarkovChain:
         lot of time, all the succeeding calls will require only cache
         lookups and have O(1) complexity.
         """
-        left_side = np.vstack((self.matrix.T, np.ones((1, self.order))))
-        right_side = np.zeros(self.order + 1)
-        right_side[-1] = 1.
-        try:
-            left_side_ = left_side[1:, :]
-            right_side_ = right_side[1:]
-            return np.linalg.solve(left_side_, right_side_)
-        except np.linalg.LinAlgError:
-            return np.linalg.lstsq(left_side, right_side)[0]
+        return self.solve_steady_pmf()
+
+    def solve_steady_pmf(self, method: str = 'auto', tol: float = 1e-10,
+                         max_iter: int = 10000) -> np.ndarray:
+        """
+        Find the steady-state PMF with the given method (without caching).
+
+        Supported methods:
+
+        - `'dense'`: `numpy.linalg.solve()` with one equation replaced by
+          the normalization condition, `numpy.linalg.lstsq()` if singular;
+        - `'splu'`: sparse LU decomposition (SuperLU) of the system with
+          `pi_0 = 1` fixed, then normalized; `scipy.sparse.linalg.lsqr()`
+          is used if the system is singular;
+        - `'gmres'`, `'bicgstab'`: Krylov solvers of the same system with
+          incomplete LU preconditioner;
+        - `'power'`: power iteration on the uniformized chain;
+        - `'gauss-seidel'`: Gauss-Seidel iteration, chain must not have
+          absorbing states.
+
+        By default (`'auto'`), `'dense'` is used for dense generators and
+        `'splu'` for sparse ones.
+
+        Parameters
+        ----------
+        method : str, optional
+            one of the methods listed above. Default: `'auto'`.
+        tol : float, optional
+            tolerance of the iterative methods. For power and Gauss-Seidel
+            iterations, this is the L1-norm of the PMF change. Default: 1e-10.
+        max_iter : int, optional
+            maximum number of iterations. Default: 10000.
+
+        Raises
+        ------
+        ValueError
+            if method is unknown
+        RuntimeError
+            if iterative method did not converge
+        """
+        return _solve_steady_pmf(self.matrix, method, tol, max_iter)
 
     def trace(self, size: Optional[int] = None,
               init: Union[int, Sequence[float], None] = None,
@@ -315,6 +386,15 @@ class ContinuousTimeMarkovChain:
         """
         Get the discrete time Markov chain embedded in this CTMC.
         """
+        if sp.issparse(self.matrix):
+            absorbing = self.rates <= 1e-12
+            scale = 1 / np.where(absorbing, 1., self.rates)
+            scale[absorbing] = 0.
+            trans_matrix = \
+                sp.diags(scale) @ (self.matrix + sp.diags(self.rates)) + \
+                sp.diags(absorbing.astype(float))
+            return DiscreteTimeMarkovChain(trans_matrix)
+
         # Build transition matrix:
         n = self.order
         d1 = self.matrix + np.diag(self.rates)
@@ -336,4 +416,269 @@ class ContinuousTimeMarkovChain:
         return DiscreteTimeMarkovChain(trans_matrix)
 
     def __repr__(self):
-        return f"(CTMC: g={str_array(self.matrix)})"
+        matrix = self.matrix
+        if sp.issparse(matrix):
+            matrix = matrix.toarray()
+        return f"(CTMC: g={str_array(matrix)})"
+
+
+def _fix_sparse_stochastic(matrix: sp.csr_matrix,
+                           tol: float) -> sp.csr_matrix:
+    """
+    Sparse version of `fix_stochastic()`.
+
+    In contrast to the dense version, small negative elements are replaced
+    with zeros instead of shifting the whole row, so the sparsity pattern
+    is kept.
+    """
+    matrix = matrix.tocsr(copy=True)
+    if matrix.nnz > 0 and (min_el := matrix.data.min()) < 0:
+        if -min_el > tol:
+            rows, cols = matrix.nonzero()
+            index = matrix.data.argmin()
+            raise CellValueError(rows[index], cols[index], min_el,
+                                 error=-min_el, tol=tol, lower=0.0, upper=1.0)
+        matrix.data[matrix.data < 0] = 0.0
+    row_sums = np.asarray(matrix.sum(axis=1)).flatten()
+    row_errors = np.abs(row_sums - 1.0)
+    row = row_errors.argmax()
+    if row_errors[row] > tol:
+        raise RowSumError(row, row_sums[row], 1.0, error=row_errors[row],
+                          tol=tol)
+    if row_errors.any():
+        matrix = (sp.diags(1 / row_sums) @ matrix).tocsr()
+    return matrix
+
+
+def _fix_sparse_infinitesimal(matrix: sp.csr_matrix,
+                              tol: float) -> sp.csr_matrix:
+    """
+    Sparse version of `fix_infinitesimal()`.
+    """
+    diagonal = matrix.diagonal()
+    off_diag = (matrix - sp.diags(diagonal)).tocsr()
+    if off_diag.nnz > 0 and (min_el := off_diag.data.min()) < 0:
+        if -min_el > tol:
+            rows, cols = off_diag.nonzero()
+            index = off_diag.data.argmin()
+            raise CellValueError(rows[index], cols[index], min_el,
+                                 error=-min_el, tol=tol, lower=0, upper=None)
+        off_diag.data[off_diag.data < 0] = 0.0
+    off_diag_sums = np.asarray(off_diag.sum(axis=1)).flatten()
+    row_sums = off_diag_sums + diagonal
+    row = np.abs(row_sums).argmax()
+    if abs(row_sums[row]) > tol:
+        raise RowSumError(row, row_sums[row], 0.0, error=abs(row_sums[row]),
+                          tol=tol)
+    return (off_diag + sp.diags(-off_diag_sums)).tocsr()
+
+
+def _solve_steady_pmf(
+        generator: Union[np.ndarray, sp.spmatrix],
+        method: str,
+        tol: float,
+        max_iter: int) -> np.ndarray:
+    """
+    Find steady-state PMF of a CTMC with the given generator.
+
+    See `ContinuousTimeMarkovChain.solve_steady_pmf()` for methods.
+    """
+    is_sparse = sp.issparse(generator)
+    if method == 'auto':
+        method = 'splu' if is_sparse else 'dense'
+    if method == 'dense':
+        if is_sparse:
+            generator = generator.toarray()
+        return _steady_pmf_dense(generator)
+
+    generator = sp.csr_matrix(generator)
+    if method == 'splu':
+        return _steady_pmf_splu(generator)
+    if method in ('gmres', 'bicgstab'):
+        return _steady_pmf_krylov(generator, method, tol, max_iter)
+    if method == 'power':
+        return _steady_pmf_power(generator, tol, max_iter)
+    if method == 'gauss-seidel':
+        return _steady_pmf_gauss_seidel(generator, tol, max_iter)
+    raise ValueError(f"unknown steady PMF method '{method}'")
+
+
+def _steady_pmf_dense(generator: np.ndarray) -> np.ndarray:
+    n = generator.shape[0]
+    left_side = np.vstack((generator.T, np.ones((1, n))))
+    right_side = np.zeros(n + 1)
+    right_side[-1] = 1.
+    try:
+        left_side_ = left_side[1:, :]
+        right_side_ = right_side[1:]
+        return np.linalg.solve(left_side_, right_side_)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(left_side, right_side)[0]
+
+
+def _build_sparse_system(generator: sp.csr_matrix) \
+        -> Tuple[sp.csc_matrix, np.ndarray]:
+    """
+    Build system `pi Q = 0` with `pi_0 = 1` fixed and the first equation
+    removed, i.e. `x Q[1:, 1:] = -Q[0, 1:]`.
+
+    In contrast to replacing an equation with normalization condition, this
+    doesn't add a dense row, so LU factors keep sparsity.
+    """
+    generator_t = generator.T.tocsr()
+    left_side = generator_t[1:, 1:].tocsc()
+    right_side = -generator_t[1:, 0].toarray().flatten()
+    return left_side, right_side
+
+
+def _normalize_reduced_pmf(reduced: np.ndarray) -> np.ndarray:
+    pmf = np.concatenate(([1.0], reduced))
+    return pmf / pmf.sum()
+
+
+def _steady_pmf_splu(generator: sp.csr_matrix) -> np.ndarray:
+    n = generator.shape[0]
+    if n == 1:
+        return np.ones(1)
+    left_side, right_side = _build_sparse_system(generator)
+    try:
+        return _normalize_reduced_pmf(splu(left_side).solve(right_side))
+    except RuntimeError:
+        # Matrix is singular, solve the full system in least squares sense:
+        left_side = sp.vstack((generator.T, np.ones((1, n)))).tocsr()
+        return lsqr(left_side, identity(n + 1, n), atol=1e-12,
+                    btol=1e-12)[0]
+
+
+def _steady_pmf_krylov(generator: sp.csr_matrix, method: str, tol: float,
+                       max_iter: int) -> np.ndarray:
+    if generator.shape[0] == 1:
+        return np.ones(1)
+    left_side, right_side = _build_sparse_system(generator)
+    ilu = spilu(left_side)
+    preconditioner = LinearOperator(left_side.shape, ilu.solve)
+    solver = gmres if method == 'gmres' else bicgstab
+    # SciPy 1.12 renamed `tol` to `rtol` (and later removed `tol`):
+    tol_kwarg = 'rtol' if 'rtol' in signature(solver).parameters else 'tol'
+    reduced, info = solver(left_side, right_side, atol=0.0,
+                           maxiter=max_iter, M=preconditioner,
+                           **{tol_kwarg: tol})
+    if info != 0:
+        raise RuntimeError(f"{method} did not converge (info = {info})")
+    return _normalize_reduced_pmf(reduced)
+
+
+def _steady_pmf_power(generator: sp.csr_matrix, tol: float,
+                      max_iter: int) -> np.ndarray:
+    n = generator.shape[0]
+    pmf = np.full(n, 1 / n)
+    # Uniformization rate is taken a bit larger than the maximum rate,
+    # so the uniformized chain is aperiodic:
+    rate = -generator.diagonal().min() * 1.05
+    if rate <= 0:
+        return pmf
+    trans_t = (sp.identity(n, format='csr') + generator / rate).T.tocsr()
+    for _ in range(max_iter):
+        next_pmf = trans_t.dot(pmf)
+        next_pmf /= next_pmf.sum()
+        if np.abs(next_pmf - pmf).sum() < tol:
+            return next_pmf
+        pmf = next_pmf
+    raise RuntimeError(f"power iteration did not converge after "
+                       f"{max_iter} iterations")
+
+
+def _steady_pmf_gauss_seidel(generator: sp.csr_matrix, tol: float,
+                             max_iter: int) -> np.ndarray:
+    # Solve Q^T x = 0 with splitting Q^T = (D + L) + U:
+    left_side = generator.T.tocsr()
+    if (left_side.diagonal() == 0).any():
+        raise ValueError("Gauss-Seidel method requires a chain without "
+                         "absorbing states")
+    # Lower triangular part is factorized once without reordering and
+    # pivoting, so LU has no fill-in and each sweep is a cheap substitution:
+    lower = splu(sp.tril(left_side, format='csc'), permc_spec='NATURAL',
+                 diag_pivot_thresh=0.0)
+    upper = sp.triu(left_side, k=1, format='csr')
+    n = generator.shape[0]
+    pmf = np.full(n, 1 / n)
+    for _ in range(max_iter):
+        next_pmf = lower.solve(-upper.dot(pmf))
+        next_pmf /= next_pmf.sum()
+        if np.abs(next_pmf - pmf).sum() < tol:
+            return next_pmf
+        pmf = next_pmf
+    raise RuntimeError(f"Gauss-Seidel iteration did not converge after "
+                       f"{max_iter} iterations")
+
+
+def block_tridiagonal_steady_pmf(
+        diag: Sequence[np.ndarray],
+        upper: Sequence[np.ndarray],
+        lower: Sequence[np.ndarray]) -> Sequence[np.ndarray]:
+    """
+    Find steady-state PMF of a finite level-dependent QBD process.
+
+    The generator of the process is block-tridiagonal with `L` levels::
+
+        | A_0  U_0                      |
+        | L_1  A_1  U_1                 |
+        |      L_2  A_2  U_2            |
+        |            ...                |
+        |               L_{L-1} A_{L-1} |
+
+    The method uses linear level reduction: starting from the last level,
+    levels are eliminated one by one, computing matrices `R_k` such that
+    `pi_{k+1} = pi_k R_k`. Then `pi_0` is found from the reduced
+    generator of the first level, and the remaining levels are computed
+    using `R_k`. Complexity is `O(L B^3)` and memory is `O(L B^2)`, where
+    `B` is the levels size, while the full generator is never built.
+
+    The same block objects can be passed for different levels, they are
+    not modified.
+
+    Parameters
+    ----------
+    diag : sequence of 2D arrays
+        diagonal blocks `A_0, A_1, ..., A_{L-1}`
+    upper : sequence of 2D arrays
+        blocks `U_0, U_1, ..., U_{L-2}` of transitions from level `k`
+        to level `k + 1`
+    lower : sequence of 2D arrays
+        blocks `L_1, L_2, ..., L_{L-1}` of transitions from level `k`
+        to level `k - 1`
+
+    Returns
+    -------
+    pmf : list of 1D arrays
+        steady-state probabilities of states at each level
+    """
+    num_levels = len(diag)
+    if len(upper) != num_levels - 1 or len(lower) != num_levels - 1:
+        raise ValueError(
+            f"expected {num_levels - 1} upper and lower blocks, "
+            f"{len(upper)} and {len(lower)} found")
+
+    # 1) Reduce levels from the last one: S_{L-1} = A_{L-1},
+    #    R_{k} = -U_{k} S_{k+1}^{-1}, S_k = A_k + R_k L_{k+1}.
+    rs = [None] * (num_levels - 1)
+    s = np.asarray(diag[-1])
+    for k in range(num_levels - 2, -1, -1):
+        # R_k S_{k+1} = -U_k  <=>  S_{k+1}^T R_k^T = -U_k^T
+        rs[k] = np.linalg.solve(s.T, -np.asarray(upper[k]).T).T
+        s = np.asarray(diag[k]) + rs[k].dot(lower[k])
+
+    # 2) Find (non-normalized) pi_0 from pi_0 S_0 = 0:
+    n0 = s.shape[0]
+    left_side = np.vstack((s.T, np.ones((1, n0))))
+    right_side = np.zeros(n0 + 1)
+    right_side[-1] = 1.
+    pi = np.linalg.lstsq(left_side, right_side, rcond=None)[0]
+
+    # 3) Compute other levels and normalize:
+    pmf = [pi]
+    for k in range(num_levels - 1):
+        pi = pi.dot(rs[k])
+        pmf.append(pi)
+    total = sum(level.sum() for level in pmf)
+    return [level / total for level in pmf]
@@ -1,12 +1,17 @@
+from libcpp.string cimport string
 from libcpp.vector cimport vector
 
-cdef extern from "Randoms.h" namespace "cqumo":
+cdef extern from "Randoms.h" namespace "cqumo" nogil:
     cdef cppclass RandomVariable:
         double eval()
+        void fill(double *buffer, size_t size)
     
     cdef cppclass Randoms:
         Randoms()
         Randoms(unsigned seed)
+        void seed(unsigned seed)
+        string getState()
+        void setState(const string& state) except +
         
         RandomVariable* createConstant(double value)
         RandomVariable* createExponential(double rate)
@@ -36,3 +41,11 @@ cdef extern from "Randoms.h" namespace "cqumo":
             const vector[RandomVariable*]& vars,
             const vector[double]& initProbs,
             const vector[vector[double]]& allTransProbs)
+
+
+cdef class Variable:
+    cdef RandomVariable* variable
+
+    cdef set_variable(self, RandomVariable *variable)
+    cdef RandomVariable *get_variable(self)
+    cpdef eval(self)
@@ -37,13 +37,41 @@ cdef class Rnd:
 
 
 cdef class RandomsFactory:
+    """
+    Factory of random variables sharing a single random engine.
+
+    If `seed` is given (an integer in `[0, 2**32)`), the engine is seeded
+    with it, otherwise it is seeded with the system clock.
+    """
     cdef Randoms* randoms
 
-    def __init__(self):
-        self.randoms = new Randoms()
+    def __init__(self, seed=None):
+        if seed is None:
+            self.randoms = new Randoms()
+        else:
+            self.randoms = new Randoms(<unsigned>seed)
     
     def __dealloc__(self):
         del self.randoms
+
+    def seed(self, seed):
+        """
+        Re-seed the engine with an integer in `[0, 2**32)`. Variables created
+        by this factory continue with the new random sequence.
+        """
+        self.randoms.seed(<unsigned>seed)
+
+    def __getstate__(self):
+        return self.randoms.getState()
+
+    def __setstate__(self, state):
+        self.randoms.setState(state)
+
+    def __reduce__(self):
+        # Factory is pickled with the engine state, so the restored factory
+        # continues the random sequence. Variables are not picklable, since
+        # they keep pointers to the engine.
+        return RandomsFactory, (), self.__getstate__()
     
     def createConstantVariable(self, value):
         cdef CxxRandomVariable *c_var = self.randoms.createConstant(value)
@@ -147,8 +175,6 @@ cdef class RandomsFactory:
 
 
 cdef class Variable:
-    cdef CxxRandomVariable* variable
-
     def __init__(self):
         self.variable = NULL
 
@@ -164,5 +190,25 @@ cdef class Variable:
     cpdef eval(self):
         return self.variable.eval()
 
+    def fill(self, double[::1] buffer):
+        """
+        Write samples into the given contiguous float64 buffer.
+
+        Samples are generated in C++ with GIL released.
+        """
+        cdef size_t size = buffer.shape[0]
+        if size == 0:
+            return
+        with nogil:
+            self.variable.fill(&buffer[0], size)
+
+    def eval_many(self, size):
+        """
+        Get a 1D array of `size` samples.
+        """
+        buffer = np.empty(size, dtype=np.float64)
+        self.fill(buffer)
+        return buffer
+
     def __call__(self, size):
-        return np.asarray([self.eval() for _ in range(size)])
+        return self.eval_many(size)
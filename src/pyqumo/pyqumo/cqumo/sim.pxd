@@ -1,6 +1,7 @@
 from libcpp.vector cimport vector
 from libcpp.map cimport map
 from libcpp.functional cimport function
+from pyqumo.cqumo.randoms cimport RandomVariable
 
 
 cdef extern from "Statistics.h" namespace "cqumo":
@@ -56,6 +57,13 @@ cdef extern from "Simulation.h" namespace "cqumo":
             int queueCapacity,
             int maxPackets)
 
+    SimData simMM1(
+            double arrivalRate,
+            double serviceRate,
+            int queueCapacity,
+            int maxPackets,
+            unsigned seed)
+
     SimData simGG1(
             DblFn arrival,
             DblFn service,
@@ -67,3 +75,15 @@ cdef extern from "Simulation.h" namespace "cqumo":
             vector[DblFn]& services,
             int queueCapacity,
             int maxPackets)
+
+    cdef cppclass TandemConfig:
+        RandomVariable *arrival
+        vector[RandomVariable*] services
+        int queueCapacity
+        int maxPackets
+
+    vector[SimData] simTandemBatch(
+            const vector[TandemConfig]& configs,
+            int numReplications,
+            int numThreads,
+            unsigned baseSeed) nogil except +
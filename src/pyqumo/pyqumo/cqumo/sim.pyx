@@ -1,10 +1,14 @@
+from typing import Optional, Sequence, Mapping, List
+
 import numpy as np
 from libcpp.vector cimport vector
 from pyqumo.cqumo.sim cimport SimData, NodeData, simMM1, VarData, simGG1, \
-    makeDblFn, DblFn
+    makeDblFn, DblFn, TandemConfig, simTandemBatch
+from pyqumo.cqumo.randoms cimport Variable, \
+    RandomVariable as CxxRandomVariable
 from pyqumo.sim.helpers import Statistics
 from pyqumo.sim.gg1 import Results as GG1Results
-from pyqumo.sim.tandem import Results as TandemResults
+from pyqumo.sim.tandem import Results as TandemResults, BatchResults
 from pyqumo.random import CountableDistribution, Exponential
 
 
@@ -70,13 +74,59 @@ cdef double _call_pyobject(void *context):
         return -1
 
 
+cdef double _call_pycallable(void *context):
+    # noinspection PyBroadException
+    try:
+        fn = <object>context
+        return fn()
+    except:
+        return -1
+
+
+cdef double _call_variable(void *context) nogil:
+    return (<CxxRandomVariable*>context).eval()
+
+
+cdef object _get_evaluable(object dist):
+    """
+    Get an object, that will be used to generate samples of the distribution.
+
+    If the distribution provides a native random variable (`rnd` property
+    returning `pyqumo.cqumo.randoms.Variable`), it is returned. Otherwise,
+    `rnd` is returned if it defines `eval()`, or the distribution itself
+    is returned, and it will be called as `dist()` on each sample.
+    """
+    try:
+        rnd = dist.rnd
+    except (AttributeError, NotImplementedError):
+        return dist
+    return rnd if hasattr(rnd, 'eval') else dist
+
+
+cdef DblFn _make_dbl_fn(object evaluable):
+    """
+    Build a C++ function generating samples from the evaluable object.
+
+    If the evaluable is a native variable, samples are generated directly
+    by the C++ `RandomVariable`, so no Python code is called during the
+    simulation. Otherwise, a Python callback is used. Caller MUST keep
+    a reference to the evaluable until the simulation finishes.
+    """
+    cdef CxxRandomVariable *c_var = NULL
+    if isinstance(evaluable, Variable):
+        c_var = (<Variable>evaluable).get_variable()
+        if c_var != NULL:
+            return makeDblFn(_call_variable, <void*>c_var)
+    if hasattr(evaluable, 'eval'):
+        return makeDblFn(_call_pyobject, <void*>evaluable)
+    return makeDblFn(_call_pycallable, <void*>evaluable)
+
+
 cdef call_simGG1(
-        void* pyArrival,
-        void* pyService,
+        DblFn cArrival,
+        DblFn cService,
         int queue_capacity,
         int max_packets):
-    cdef DblFn cArrival = makeDblFn(_call_pyobject, pyArrival)
-    cdef DblFn cService = makeDblFn(_call_pyobject, pyService)
     cdef SimData c_ret = simGG1(
         cArrival, cService, queue_capacity, max_packets)
     result: Results = _build_gg1_results(c_ret)
@@ -87,32 +137,33 @@ cdef call_simMM1(
         double arrival_rate,
         double service_rate,
         int queue_capacity,
-        int max_packets):
-    cdef SimData c_ret = simMM1(
-        arrival_rate, service_rate, queue_capacity, max_packets)
+        int max_packets,
+        seed):
+    cdef SimData c_ret
+    if seed is None:
+        c_ret = simMM1(arrival_rate, service_rate, queue_capacity, max_packets)
+    else:
+        c_ret = simMM1(
+            arrival_rate, service_rate, queue_capacity, max_packets, seed)
     result: Results = _build_gg1_results(c_ret)
     return result
 
 
 cdef call_simTandem(
-        void* pyArrival,
-        vector[void*] pyServices,
+        DblFn cArrival,
+        vector[DblFn]& cServices,
         int queue_capacity,
         int max_packets):
-    cdef DblFn cArrival = makeDblFn(_call_pyobject, pyArrival)
-    cdef vector[DblFn] cServices
-    cdef unsigned i
-    for i in range(pyServices.size()):
-        cServices.push_back(makeDblFn(_call_pyobject, pyServices[i]))
     cdef SimData c_ret = simTandem(
         cArrival, cServices, queue_capacity, max_packets)
-    return _build_tandem_results(c_ret, pyServices.size())
+    return _build_tandem_results(c_ret, cServices.size())
 
 def simulate_mm1n(
         arrival_rate: float,
         service_rate: float,
         queue_capacity: int,
-        max_packets: int = 100000
+        max_packets: int = 100000,
+        seed: Optional[int] = None
 ) -> GG1Results:
     """
     Wrapper for C++ implementation of M/M/1/N or M/M/1 model.
@@ -127,12 +178,15 @@ def simulate_mm1n(
     queue_capacity : int
     max_packets : int, optional
         By default 100'000
+    seed : int, optional
+        Random engine seed. If not given, wall clock is used.
 
     Returns
     -------
     results : Results
     """
-    return call_simMM1(arrival_rate, service_rate, queue_capacity, max_packets)
+    return call_simMM1(
+        arrival_rate, service_rate, queue_capacity, max_packets, seed)
 
 
 def simulate_gg1n(
@@ -147,10 +201,15 @@ def simulate_gg1n(
     Returns results in the same dataclass as defined for G/G/1 model
     in `pyqumo.sim.gg1.Results`.
 
+    If arrival and service distributions provide native random variables
+    (see `pyqumo.cqumo.randoms.Variable`), samples are generated in C++
+    without calling Python code. Otherwise, samples are generated using
+    Python callbacks, which is much slower.
+
     Parameters
     ----------
-    arrival : callable `() -> double`
-    service : callable `() -> double`
+    arrival : Distribution or callable `() -> double`
+    service : Distribution or callable `() -> double`
     queue_capacity : int
     max_packets : int, optional
         By default 100'000
@@ -159,11 +218,15 @@ def simulate_gg1n(
     -------
     results : Results
     """
-    cdef void* pyArrival = <void*>arrival.rnd
-    cdef void* pyService = <void*>service.rnd
+    py_arrival = _get_evaluable(arrival)
+    py_service = _get_evaluable(service)
     if queue_capacity == np.inf:
         queue_capacity = -1
-    return call_simGG1(pyArrival, pyService, queue_capacity, max_packets)
+    return call_simGG1(
+        _make_dbl_fn(py_arrival),
+        _make_dbl_fn(py_service),
+        queue_capacity,
+        max_packets)
 
 
 def simulate_tandem(
@@ -185,6 +248,9 @@ def simulate_tandem(
 
     Results returned are defined in pyqumo.sim.tandem.Results.
 
+    Distributions providing native random variables are sampled in C++,
+    others are sampled using Python callbacks.
+
     Parameters
     ----------
     arrival : Distribution instance
@@ -193,11 +259,114 @@ def simulate_tandem(
     queue_capacity: int or np.inf
     max_packets: 
     """
-    cdef void* pyArrival = <void*>arrival.rnd
-    cdef vector[void*] pyServices
-    cdef unsigned i = 0
-    for i in range(len(services)):
-        pyServices.push_back(<void*>services[i].rnd)
+    py_arrival = _get_evaluable(arrival)
+    py_services = [_get_evaluable(service) for service in services]
+    cdef vector[DblFn] c_services
+    for py_service in py_services:
+        c_services.push_back(_make_dbl_fn(py_service))
     if queue_capacity == np.inf:
         queue_capacity = -1
-    return call_simTandem(pyArrival, pyServices, queue_capacity, max_packets)
+    return call_simTandem(
+        _make_dbl_fn(py_arrival), c_services, queue_capacity, max_packets)
+
+
+cdef CxxRandomVariable *_get_native_variable(object dist) except NULL:
+    evaluable = _get_evaluable(dist)
+    cdef CxxRandomVariable *c_var = NULL
+    if isinstance(evaluable, Variable):
+        c_var = (<Variable>evaluable).get_variable()
+    if c_var == NULL:
+        raise TypeError(f"distribution {dist} has no native random variable")
+    return c_var
+
+
+def simulate_tandem_batch(
+        configs: Sequence[Mapping],
+        num_replications: int,
+        num_threads: int = 0,
+        base_seed: int = 0,
+        max_packets: int = 100000,
+        confidence: float = 0.95
+) -> List[BatchResults]:
+    """
+    Run independent replications of tandem networks in parallel.
+
+    Replications are executed by C++ threads without holding GIL. Each
+    replication gets its own random engine, seeded with a value derived
+    from `base_seed`, config index and replication index. Thus, results
+    are reproducible and don't depend on the number of threads.
+
+    Each config is a mapping with keys `arrival`, `services` and
+    `queue_capacity` (and, optionally, `max_packets`), having the same
+    meaning as `simulate_tandem()` arguments. All distributions MUST
+    provide native random variables, since no Python code can be called
+    from the threads.
+
+    Example
+    -------
+    >>> simulate_tandem_batch([
+    >>>     {'arrival': Poisson(1), 'services': [Exponential(2)] * 3,
+    >>>      'queue_capacity': 10},
+    >>>     {'arrival': Poisson(1.5), 'services': [Exponential(2)] * 3,
+    >>>      'queue_capacity': 10},
+    >>> ], num_replications=20, num_threads=4, base_seed=1)
+
+    Parameters
+    ----------
+    configs : sequence of mappings
+    num_replications : int
+        number of replications of each config
+    num_threads : int, optional
+        number of threads, if zero (default), use all hardware threads
+    base_seed : int, optional
+        seed used to derive replications seeds (default: 0)
+    max_packets : int, optional
+        default number of packets for configs without `max_packets` key
+        (default: 100'000)
+    confidence : float, optional
+        confidence level of intervals (default: 0.95)
+
+    Returns
+    -------
+    results : list of BatchResults
+        results for each config, in the same order as configs
+    """
+    cdef vector[TandemConfig] c_configs
+    cdef TandemConfig c_config
+    cdef vector[SimData] c_ret
+    cdef int c_num_replications = num_replications
+    cdef int c_num_threads = num_threads
+    cdef unsigned c_base_seed = base_seed
+    cdef int i, j
+
+    if num_replications <= 0:
+        raise ValueError(
+            f"positive number of replications expected, "
+            f"{num_replications} found")
+
+    # Python objects owning native variables are kept in `configs`
+    # (distributions cache their `rnd`), so pointers are valid during the call.
+    for config in configs:
+        c_config.arrival = _get_native_variable(config['arrival'])
+        c_config.services.clear()
+        for service in config['services']:
+            c_config.services.push_back(_get_native_variable(service))
+        queue_capacity = config.get('queue_capacity', np.inf)
+        c_config.queueCapacity = \
+            -1 if queue_capacity == np.inf else queue_capacity
+        c_config.maxPackets = config.get('max_packets', max_packets)
+        c_configs.push_back(c_config)
+
+    with nogil:
+        c_ret = simTandemBatch(
+            c_configs, c_num_replications, c_num_threads, c_base_seed)
+
+    results = []
+    for i in range(c_configs.size()):
+        num_stations = c_configs[i].services.size()
+        replications = [
+            _build_tandem_results(c_ret[i * num_replications + j], num_stations)
+            for j in range(num_replications)
+        ]
+        results.append(BatchResults(replications, confidence=confidence))
+    return results
@@ -3,6 +3,7 @@ from typing import Union, Callable, Mapping
 
 import numpy as np
 
+from pyqumo.chains import block_tridiagonal_steady_pmf
 from pyqumo.matrix import cbdiag
 from pyqumo.random import Distribution, CountableDistribution, PhaseType
 from pyqumo.arrivals import Poisson, MarkovArrival, RandomProcess, \
@@ -348,16 +349,50 @@ class MapPh1NQueue(BasicQueueingSystem):
         return MarkovArrival(d0_dep, D1_dep)
 
     @cached_property
-    def get_system_size_prob(self) -> Callable[[int], float]:
+    def levels_pmf(self) -> np.ndarray:
+        """
+        Get steady-state PMF of the queue CTMC arranged by levels.
+
+        Returns a matrix of shape `(N + 1, V * W)`, where `N` is the
+        system capacity, `V` - PH order and `W` - MAP order. K-th row
+        contains probabilities of states `kVW + iV + j` of the departure
+        CTMC (`i` - MAP state, `j` - PH state).
+
+        The CTMC is a finite QBD process, so instead of solving the dense
+        generator of the departure MAP, its blocks are passed to the
+        level reduction solver (see `block_tridiagonal_steady_pmf()`).
+        This takes time linear in the capacity.
+        """
         arrival, service = self._get_casted_arrival_and_service()
-        departure = self.departure
 
-        b = arrival.order * service.order
-        ctmc = departure.ctmc
-        pmf = ctmc.steady_pmf
+        d0 = arrival.d0
+        d1 = arrival.d1
+        w = arrival.order
+        iw = np.eye(w)
+        s = service.s
+        tau = service.init_probs
+        v = service.order
+        iv = np.eye(v)
+        ev = np.ones((v, 1))
+        n = self.capacity
+
+        # Blocks are the same as in the departure MAP generator:
+        d0_iv = np.kron(d0, iv)
+        d1_iv = np.kron(d1, iv)
+        d0_s = np.kron(d0, iv) + np.kron(iw, s)
+        iw_ct = np.kron(iw, np.kron(-s.dot(ev), tau))
+        r0 = np.kron(d1, np.kron(tau, ev))
+        ra = np.kron(d0 + d1, iv) + np.kron(iw, s)
 
-        return lambda x: ctmc.steady_pmf[x*b: (x+1)*b].sum() \
-            if 0 <= x <= self.capacity else 0.0
+        diag = [d0_iv] + [d0_s] * (n - 1) + [ra]
+        upper = [r0] + [d1_iv] * (n - 1)
+        lower = [iw_ct] * n
+        return np.asarray(block_tridiagonal_steady_pmf(diag, upper, lower))
+
+    @cached_property
+    def get_system_size_prob(self) -> Callable[[int], float]:
+        pmf = self.levels_pmf.sum(axis=1)
+        return lambda x: pmf[x] if 0 <= x <= self.capacity else 0.0
 
     @cached_property
     def response_time(self):
@@ -379,6 +414,8 @@ class MapPh1NQueue(BasicQueueingSystem):
         To compute :math:`Psi_{k,i}` we need to find sum:
         :math:`Theta[kVW+iV] + Theta[kVW+iV + 1] + ... + Theta[kVW+iV + V-1]`
 
+        Theta is taken from `levels_pmf`, so the departure CTMC is not solved.
+
         Returns
         -------
         psi : np.ndarray
@@ -387,17 +424,8 @@ class MapPh1NQueue(BasicQueueingSystem):
         """
         arrival, service = self._get_casted_arrival_and_service()
         v, w = service.order, arrival.order
-        theta = self.departure.ctmc.steady_pmf
-        psi = []
-
-        for k in range(self.capacity + 1):
-            pmf = np.zeros(w)
-            for i in range(w):
-                base = k * v * w + i * v
-                pmf[i] = theta[base:(base + v)].sum()
-            psi.append(pmf)
-
-        return np.asarray(psi)
+        theta = self.levels_pmf
+        return theta.reshape((self.capacity + 1, w, v)).sum(axis=2)
 
     @cached_property
     def loss_prob(self) -> float:
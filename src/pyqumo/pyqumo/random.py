@@ -1,4 +1,6 @@
 from functools import lru_cache, cached_property
+from copy import copy
+from types import FunctionType
 from typing import Union, Sequence, Callable, Mapping, Tuple, Iterator, \
     Optional, Iterable
 
@@ -118,7 +120,7 @@ class Distribution:
         """
         if size == 1:
             return self.rnd.eval()
-        return np.asarray([self.rnd.eval() for _ in range(size)])
+        return self.rnd.eval_many(size)
 
     @property
     def order(self) -> int:
@@ -139,6 +141,57 @@ class Distribution:
     def copy(self) -> 'Distribution':
         raise NotImplementedError
 
+    def with_factory(self, factory: RandomsFactory) -> 'Distribution':
+        """
+        Get a shallow copy of the distribution, which random variable
+        (including variables of the nested distributions) is created with
+        the given factory.
+
+        By default, all distributions share `default_randoms_factory` and
+        its engine, seeded with the system clock. Use this method to sample
+        the distribution with a separate (e.g., seeded) engine. The factory
+        MUST be alive while the variable is used, and the copy keeps it.
+
+        Parameters
+        ----------
+        factory : RandomsFactory
+
+        Returns
+        -------
+        distribution : Distribution
+        """
+        dist = copy(self)
+        dist.__dict__.pop('rnd', None)  # drop cached variable, if any
+        dist._factory = factory
+        for name, value in list(vars(dist).items()):
+            if isinstance(value, Distribution):
+                setattr(dist, name, value.with_factory(factory))
+            elif (isinstance(value, (tuple, list)) and value and
+                  all(isinstance(item, Distribution) for item in value)):
+                setattr(dist, name, type(value)(
+                    item.with_factory(factory) for item in value))
+        return dist
+
+    def __getstate__(self):
+        # Random variables and cached functions (e.g., `pdf` lambdas) can not
+        # be pickled, so they are dropped and created again when used. Note
+        # that variables states (e.g., MAP current state) are not kept.
+        cls = type(self)
+        state = {
+            name: value for name, value in self.__dict__.items()
+            if not (isinstance(getattr(cls, name, None), cached_property) and
+                    isinstance(value, (Variable, FunctionType)))
+        }
+        # Restored distribution should share the default factory:
+        if state.get('_factory') is default_randoms_factory:
+            state['_factory'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._factory is None:
+            self._factory = default_randoms_factory
+
     def as_ph(self, **kwargs) -> 'PhaseType':
         """
         Get distribution representation in the form of a PH distribution.
@@ -780,7 +833,7 @@ class AbsorbMarkovPhasedEvalMixin:
     def __call__(self, size: int = 1):
         if size == 1:
             return self.rnd.eval()
-        return np.asarray([self.rnd.eval() for _ in range(size)])
+        return self.rnd.eval_many(size)
 
     @cached_property
     def rnd(self) -> Variable:
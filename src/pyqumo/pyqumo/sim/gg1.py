@@ -7,7 +7,8 @@ from tabulate import tabulate
 from pyqumo.matrix import str_array
 from pyqumo.random import CountableDistribution, Distribution
 from pyqumo.sim.helpers import build_statistics, FiniteFifoQueue, \
-    InfiniteFifoQueue, Server, Queue, TimeSizeRecords, Statistics
+    InfiniteFifoQueue, Server, Queue, TimeSizeRecords, Statistics, \
+    lindley_departures
 
 
 @dataclass
@@ -219,12 +220,17 @@ class System:
         return Event.ARRIVAL
 
 
+# Number of samples drawn at once in Lindley-recursion mode:
+LINDLEY_CHUNK_SIZE = 100000
+
+
 def simulate(
         arrival: Distribution,
         service: Distribution,
         queue_capacity: int = np.inf,
         max_time: float = np.inf,
-        max_packets: int = 1000000
+        max_packets: int = 1000000,
+        method: str = 'events'
 ) -> Results:
     """
     Run simulation model of G/G/1/N system.
@@ -233,12 +239,16 @@ def simulate(
     or by reaching the maximum number of generated packets. By default,
     simulation is limited with the maximum number of packets only (1 million).
 
-    Queue is expected to have finite capacity.
-
     Arrival and service time processes can be of any kind, including Poisson
     or MAP. To use a PH or normal distribution, a GenericIndependentProcess
     model with the corresponding distribution may be used.
 
+    By default (`method = 'events'`), an event-by-event model is executed.
+    If the queue is infinite, `method = 'lindley'` may be used instead:
+    packets departure times are computed from arrays of arrival and service
+    intervals with Lindley recursion, that is much faster
+    (see `simulate_lindley()`).
+
     Parameters
     ----------
     arrival : RandomProcess
@@ -251,12 +261,28 @@ def simulate(
         Maximum simulation time (default: infinity).
     max_packets
         Maximum number of simulated packets (default: 1'000'000)
+    method : 'events' or 'lindley', optional
+        Simulation method (default: 'events').
 
     Returns
     -------
     results : Results
         Simulation results.
+
+    Raises
+    ------
+    ValueError
+        if method is unknown, or if 'lindley' method is used with a finite
+        queue capacity
     """
+    if method == 'lindley':
+        if queue_capacity < np.inf:
+            raise ValueError("Lindley recursion requires infinite queue, "
+                             f"but queue capacity is {queue_capacity}")
+        return simulate_lindley(arrival, service, max_time, max_packets)
+    if method != 'events':
+        raise ValueError(f"unknown simulation method '{method}'")
+
     params = Params(
         arrival=arrival.rnd, service=service.rnd, queue_capacity=queue_capacity,
         max_packets=max_packets, max_time=max_time)
@@ -291,6 +317,113 @@ def simulate(
     return _build_results(records)
 
 
+def simulate_lindley(
+        arrival: Distribution,
+        service: Distribution,
+        max_time: float = np.inf,
+        max_packets: int = 1000000,
+        chunk_size: int = LINDLEY_CHUNK_SIZE
+) -> Results:
+    """
+    Simulate G/G/1 system with infinite FIFO queue using Lindley recursion.
+
+    Arrival and service intervals are drawn in chunks of `chunk_size`
+    samples. Departure time of n-th packet is `D_n = max(A_n, D_{n-1}) + S_n`,
+    where `A_n` is its arrival time and `S_n` - service time. Departures of
+    a whole chunk are computed at once with `lindley_departures()`.
+
+    System size PMF is computed from the sorted arrival and departure
+    epochs. As in the event model, simulation ends at the last arrival
+    (or at `max_time`), and packets departing later are not counted
+    as served.
+
+    Parameters
+    ----------
+    arrival : RandomProcess
+        Arrival random process.
+    service : RandomProcess
+        Service time random process.
+    max_time : float, optional
+        Maximum simulation time (default: infinity).
+    max_packets : int, optional
+        Maximum number of simulated packets (default: 1'000'000)
+    chunk_size : int, optional
+        Number of samples drawn at once.
+
+    Returns
+    -------
+    results : Results
+        Simulation results.
+    """
+    arrival_rnd = arrival.rnd
+    service_rnd = service.rnd
+
+    arrivals_chunks: List[np.ndarray] = []
+    departures_chunks: List[np.ndarray] = []
+    services_chunks: List[np.ndarray] = []
+    num_packets = 0
+    last_arrival = 0.0
+    last_departure = 0.0
+
+    while num_packets < max_packets and last_arrival <= max_time:
+        size = min(chunk_size, max_packets - num_packets)
+        arrivals = last_arrival + np.cumsum(arrival_rnd.eval_many(size))
+        if arrivals[-1] > max_time:
+            arrivals = arrivals[arrivals <= max_time]
+            size = len(arrivals)
+            if size == 0:
+                break
+        services = service_rnd.eval_many(size)
+        departures = lindley_departures(arrivals, services, last_departure)
+
+        arrivals_chunks.append(arrivals)
+        departures_chunks.append(departures)
+        services_chunks.append(services)
+        num_packets += size
+        last_arrival = arrivals[-1]
+        last_departure = departures[-1]
+        if size < chunk_size and num_packets < max_packets:
+            break  # stopped by max_time
+
+    ret = Results()
+    if num_packets == 0:
+        _fill_size_distributions(ret, [1.0])
+        ret.departures = build_statistics([])
+        ret.response_time = build_statistics([])
+        ret.wait_time = build_statistics([])
+        return ret
+
+    arrivals = np.concatenate(arrivals_chunks)
+    departures = np.concatenate(departures_chunks)
+    services = np.concatenate(services_chunks)
+    end_time = min(max_time, arrivals[-1])
+    served = departures <= end_time
+
+    # System size PMF: merge arrival (+1) and departure (-1) epochs.
+    # Arrivals go first, since on equal times the event model handles
+    # arrival before service end:
+    served_departures = departures[served]
+    times = np.concatenate((arrivals, served_departures))
+    steps = np.concatenate((
+        np.ones(len(arrivals), dtype=int),
+        -np.ones(len(served_departures), dtype=int)))
+    order = np.argsort(times, kind='stable')
+    times = np.concatenate(([0.0], times[order], [end_time]))
+    sizes = np.concatenate(([0], np.cumsum(steps[order])))
+    durations = np.diff(times)
+    system_size_pmf = np.bincount(sizes, weights=durations) / end_time
+    _fill_size_distributions(ret, list(system_size_pmf))
+
+    ret.loss_prob = 0.0
+    ret.departures = build_statistics(
+        np.diff(served_departures, prepend=0.0))
+    ret.response_time = build_statistics(
+        served_departures - arrivals[served])
+    ret.wait_time = build_statistics(
+        served_departures - services[served] - arrivals[served])
+    return ret
+
+
 def _handle_arrival(system: System, params: Params, records: Records):
     """
     Handle new packet arrival event.
@@ -401,22 +534,17 @@ def _get_departure_intervals(packets_list: Sequence[Packet]) -> List[float]:
     return intervals
 
 
-def _build_results(records: Records) -> Results:
+def _fill_size_distributions(ret: Results, system_size_pmf: List[float]):
     """
-    Create results from the records.
+    Set system size, queue size and busy distributions of the results.
+
+    Queue size PMF and busy PMF are computed from system size PMF.
 
     Parameters
     ----------
-    records : Records
+    ret : Results
+    system_size_pmf : list of float
     """
-    ret = Results()
-
-    #
-    # 1) Build system size, queue size and busy (server size)
-    #    distributions. To do this, we need PMFs. Queue size
-    #    PMF and busy PMF can be computed from system size PMF.
-    #
-    system_size_pmf = list(records.system_size.pmf)
     num_states = len(system_size_pmf)
     p0 = system_size_pmf[0]
     p1 = system_size_pmf[1] if num_states > 1 else 0.0
@@ -428,6 +556,23 @@ def _build_results(records: Records) -> Results:
     ret.queue_size = CountableDistribution(queue_size_pmf)
     ret.busy = CountableDistribution(server_size_pmf)
 
+
+def _build_results(records: Records) -> Results:
+    """
+    Create results from the records.
+
+    Parameters
+    ----------
+    records : Records
+    """
+    ret = Results()
+
+    #
+    # 1) Build system size, queue size and busy (server size)
+    #    distributions.
+    #
+    _fill_size_distributions(ret, list(records.system_size.pmf))
+
     #
     # 2) For future estimations, we need packets and some filters.
     #    Group all of them here.
@@ -1,11 +1,13 @@
 from collections import namedtuple
 from typing import Optional, Sequence, TypeVar, Generic, List
 import numpy as np
+import scipy.stats
 
 from pyqumo.matrix import str_array
 
 
 Statistics = namedtuple('Statistics', ['avg', 'var', 'std', 'count'])
+Estimate = namedtuple('Estimate', ['avg', 'std', 'count', 'lower', 'upper'])
 
 
 class TimeSizeRecords:
@@ -58,6 +60,35 @@ class TimeSizeRecords:
         self._durations[prev_value] += time - self._updated_at
         self._updated_at = time
 
+    def add_steps(self, times: np.ndarray, steps: np.ndarray):
+        """
+        Record a sorted sequence of value changes at once.
+
+        This is the same as calling `add(times[i], value + steps[0] + ...
+        + steps[i])` for each `i`, but durations are accumulated with
+        `numpy.bincount()`.
+
+        Parameters
+        ----------
+        times : 1D array of float
+            non-decreasing times of the changes, not less than the last
+            update time
+        steps : 1D array of int
+            value increments at the given times
+        """
+        if len(times) == 0:
+            return
+        values = self._curr_value + np.cumsum(steps)
+        prev_values = np.concatenate(([self._curr_value], values[:-1]))
+        intervals = np.diff(times, prepend=self._updated_at)
+        durations = np.bincount(prev_values, weights=intervals)
+        if (num_cells := len(self._durations)) < len(durations):
+            self._durations.extend([0.0] * (len(durations) - num_cells))
+        for value, duration in enumerate(durations):
+            self._durations[value] += duration
+        self._curr_value = int(values[-1])
+        self._updated_at = times[-1]
+
     @property
     def pmf(self) -> np.ndarray:
         """
@@ -93,6 +124,110 @@ def build_statistics(intervals: Sequence[float]) -> Statistics:
     return Statistics(avg=avg, var=var, std=std, count=len(intervals))
 
 
+class StatisticsAccumulator:
+    """
+    Accumulator of samples statistics, that doesn't store the samples.
+
+    Samples are added in batches with `add()`. Mean and sum of squared
+    deviations of batches are merged using the parallel algorithm by Chan
+    et al., so the result matches `build_statistics()` of all samples.
+    """
+    def __init__(self):
+        self._count = 0
+        self._avg = 0.0
+        self._m2 = 0.0
+
+    def add(self, samples: np.ndarray):
+        """
+        Add a batch of samples.
+        """
+        if (count := len(samples)) == 0:
+            return
+        avg = np.mean(samples)
+        m2 = np.sum((samples - avg)**2)
+        total = self._count + count
+        delta = avg - self._avg
+        self._m2 += m2 + delta**2 * self._count * count / total
+        self._avg += delta * count / total
+        self._count = total
+
+    def build(self) -> Statistics:
+        """
+        Build Statistics of all added samples.
+        """
+        if self._count == 0:
+            return Statistics(avg=0.0, var=0.0, std=0.0, count=0)
+        var = self._m2 / (self._count - 1) if self._count > 1 else np.nan
+        return Statistics(avg=self._avg, var=var, std=var**0.5,
+                          count=self._count)
+
+
+def lindley_departures(arrivals: np.ndarray, services: np.ndarray,
+                       last_departure: float = 0.0) -> np.ndarray:
+    """
+    Compute departure times of packets from a single-server FIFO queue.
+
+    Departure of n-th packet is `D_n = max(A_n, D_{n-1}) + S_n`, where `A_n`
+    is its arrival time and `S_n` - service time. If `C_n` is the cumulative
+    service time, then `D_n = C_n + max_{k <= n} (A_k - C_{k-1})`, so all
+    departures are found with `numpy.maximum.accumulate()`.
+
+    Parameters
+    ----------
+    arrivals : 1D array of float
+        sorted arrival times
+    services : 1D array of float
+        service times
+    last_departure : float, optional
+        departure time of the packet served before `arrivals[0]`,
+        if any (default: 0.0)
+
+    Returns
+    -------
+    departures : 1D array of float
+    """
+    if len(arrivals) == 0:
+        return np.zeros(0)
+    cum_services = np.cumsum(services)
+    ready_at = arrivals.copy()
+    ready_at[0] = max(ready_at[0], last_departure)
+    return cum_services + np.maximum.accumulate(
+        ready_at - (cum_services - services))
+
+
+def build_estimate(samples: Sequence[float],
+                   confidence: float = 0.95) -> Estimate:
+    """
+    Build Estimate of the mean value from independent samples.
+
+    Samples are typically values of some metric obtained in independent
+    replications. Confidence interval is computed using Student
+    t-distribution. If less than two samples are given, confidence interval
+    bounds are equal to the average value.
+
+    Parameters
+    ----------
+    samples : 1D array_like
+    confidence : float, optional
+        confidence level (default: 0.95)
+
+    Returns
+    -------
+    estimate : Estimate
+    """
+    count = len(samples)
+    if count == 0:
+        return Estimate(avg=0.0, std=0.0, count=0, lower=0.0, upper=0.0)
+    avg = np.mean(samples)
+    if count == 1:
+        return Estimate(avg=avg, std=0.0, count=1, lower=avg, upper=avg)
+    std = np.std(samples, ddof=1)
+    t = scipy.stats.t.ppf((1 + confidence) / 2, count - 1)
+    delta = t * std / count**0.5
+    return Estimate(avg=avg, std=std, count=count, lower=avg - delta,
+                    upper=avg + delta)
+
+
 T = TypeVar('T')
 
 
@@ -7,7 +7,8 @@ from tabulate import tabulate
 from pyqumo.matrix import str_array
 from pyqumo.random import CountableDistribution, Distribution
 from pyqumo.sim.helpers import Statistics, build_statistics, Queue, \
-    TimeSizeRecords, FiniteFifoQueue, InfiniteFifoQueue, Server
+    TimeSizeRecords, FiniteFifoQueue, InfiniteFifoQueue, Server, Estimate, \
+    build_estimate, StatisticsAccumulator, lindley_departures
 
 
 class Packet:
@@ -170,17 +171,8 @@ class Results:
             #    distributions for each node. To do this, we need PMFs.
             #    Queue size PMF and busy PMF can be computed from system size PMF.
             #
-            system_size_pmf = list(records.get_system_size(i).pmf)
-            num_states = len(system_size_pmf)
-            p0 = system_size_pmf[0]
-            p1 = system_size_pmf[1] if num_states > 1 else 0.0
-
-            queue_size_pmf = [p0 + p1] + system_size_pmf[2:]
-            server_size_pmf = [p0, sum(system_size_pmf[1:])]
-
-            self.system_size.append(CountableDistribution(system_size_pmf))
-            self.queue_size.append(CountableDistribution(queue_size_pmf))
-            self.busy.append(CountableDistribution(server_size_pmf))
+            self.add_size_distributions(
+                list(records.get_system_size(i).pmf))
 
             #
             # 2) For future estimations, we need packets and some filters.
@@ -237,6 +229,22 @@ class Results:
             self.delivery_delays.append(build_statistics([
                 p.delivery_time - p.arrived[i] for p in delivered_packets]))
 
+    def add_size_distributions(self, system_size_pmf: List[float]):
+        """
+        Append system size, queue size and busy distributions of the next
+        node. Queue size PMF and busy PMF are computed from system size PMF.
+        """
+        num_states = len(system_size_pmf)
+        p0 = system_size_pmf[0]
+        p1 = system_size_pmf[1] if num_states > 1 else 0.0
+
+        queue_size_pmf = [p0 + p1] + system_size_pmf[2:]
+        server_size_pmf = [p0, sum(system_size_pmf[1:])]
+
+        self.system_size.append(CountableDistribution(system_size_pmf))
+        self.queue_size.append(CountableDistribution(queue_size_pmf))
+        self.busy.append(CountableDistribution(server_size_pmf))
+
     def get_utilization(self, node: int) -> float:
         """
         Get utilization coefficient, that is `Busy = 1` probability.
@@ -286,6 +294,83 @@ class Results:
         return tabulate(items, headers=('Param', 'Value'))
 
 
+class BatchResults:
+    """
+    Results of independent replications of the same tandem network.
+
+    Stores results of each replication in `replications` list and estimates
+    of the mean values of key metrics with confidence intervals. Estimates
+    are lists with `Estimate` tuple per station.
+    """
+    def __init__(self, replications: Sequence[Results],
+                 confidence: float = 0.95):
+        """
+        Aggregate results of replications.
+
+        Parameters
+        ----------
+        replications : sequence of Results
+        confidence : float, optional
+            confidence level of intervals (default: 0.95)
+        """
+        self.replications: List[Results] = list(replications)
+        self.confidence = confidence
+        self.real_time = sum(r.real_time for r in self.replications)
+        num_stations = (self.replications[0]._num_stations
+                        if self.replications else 0)
+        self._num_stations = num_stations
+
+        def estimate(fn: Callable[[Results, int], float]) -> List[Estimate]:
+            return [
+                build_estimate([fn(r, i) for r in self.replications],
+                               confidence)
+                for i in range(num_stations)
+            ]
+
+        self.system_size = estimate(lambda r, i: r.system_size[i].mean)
+        self.queue_size = estimate(lambda r, i: r.queue_size[i].mean)
+        self.utilization = estimate(lambda r, i: r.get_utilization(i))
+        self.drop_prob = estimate(lambda r, i: r.drop_prob[i])
+        self.delivery_prob = estimate(lambda r, i: r.delivery_prob[i])
+        self.departures = estimate(lambda r, i: r.departures[i].avg)
+        self.wait_time = estimate(lambda r, i: r.wait_time[i].avg)
+        self.response_time = estimate(lambda r, i: r.response_time[i].avg)
+        self.delivery_delays = estimate(
+            lambda r, i: r.delivery_delays[i].avg)
+
+    @property
+    def num_replications(self) -> int:
+        return len(self.replications)
+
+    def tabulate(self) -> str:
+        """
+        Build a pretty formatted table with estimates and their intervals.
+        """
+        def fmt(est: Estimate) -> str:
+            return f'{est.avg:.6g} [{est.lower:.6g}, {est.upper:.6g}]'
+
+        items = [
+            ('Number of stations', self._num_stations),
+            ('Number of replications', self.num_replications),
+            ('Confidence', self.confidence),
+        ]
+        for node in range(self._num_stations):
+            items.extend([
+                (f'[[ STATION #{node} ]]', ''),
+                ('System size average', fmt(self.system_size[node])),
+                ('Queue size average', fmt(self.queue_size[node])),
+                ('Utilization', fmt(self.utilization[node])),
+                ('Drop probability', fmt(self.drop_prob[node])),
+                ('Delivery probability', fmt(self.delivery_prob[node])),
+                ('Departures, average', fmt(self.departures[node])),
+                ('Response time, average', fmt(self.response_time[node])),
+                ('Wait time, average', fmt(self.wait_time[node])),
+                ('End-to-end delays, average',
+                 fmt(self.delivery_delays[node])),
+            ])
+        return tabulate(items, headers=('Param', 'Value'))
+
+
 @dataclass
 class Params:
     """
@@ -418,7 +503,8 @@ def simulate(
         num_stations: int = 1,
         cross_traffic: bool = False,
         max_time: float = np.inf,
-        max_packets: int = 1000000
+        max_packets: int = 1000000,
+        method: str = 'events'
 ) -> Results:
     """
     Run simulation model of G/G/1/N system.
@@ -427,12 +513,14 @@ def simulate(
     or by reaching the maximum number of generated packets. By default,
     simulation is limited with the maximum number of packets only (1 million).
 
-    Queue is expected to have finite capacity.
-
     Arrival and service time processes can be of any kind, including Poisson
     or MAP. To use a PH or normal distribution, a GenericIndependentProcess
     model with the corresponding distribution may be used.
 
+    By default (`method = 'events'`), an event-by-event model is executed.
+    If queues are infinite, `method = 'maxplus'` may be used instead to
+    compute departure times of packets in chunks (see `simulate_maxplus()`).
+
     Parameters
     ----------
     arrivals : RandomProcess or sequence of RandomProcess
@@ -451,12 +539,26 @@ def simulate(
         Maximum simulation time (default: infinity).
     max_packets
         Maximum number of simulated packets (default: 1'000'000)
+    method : 'events' or 'maxplus', optional
+        Simulation method (default: 'events').
 
     Returns
     -------
     results : Results
         Simulation results.
+
+    Raises
+    ------
+    ValueError
+        if method is unknown, or if 'maxplus' method is used with a finite
+        queue capacity
     """
+    if method not in ('events', 'maxplus'):
+        raise ValueError(f"unknown simulation method '{method}'")
+    if method == 'maxplus' and queue_capacity < np.inf:
+        raise ValueError("max-plus simulation requires infinite queues, "
+                         f"but queue capacity is {queue_capacity}")
+
     arrivals_: List[Optional[Distribution]] = []
     if isinstance(arrivals, Distribution):
         if cross_traffic:
@@ -477,6 +579,10 @@ def simulate(
     if (n := len(services_)) != num_stations:
         raise ValueError(f"expected {num_stations} services, but {n} found")
 
+    if method == 'maxplus':
+        return simulate_maxplus(arrivals_, services_, max_time=max_time,
+                                max_packets=max_packets)
+
     params = Params(
         arrivals=arrivals_,
         services=services_,
@@ -518,6 +624,287 @@ def simulate(
     return Results(records)
 
 
+# Approximate number of packets generated in one step of max-plus model:
+MAXPLUS_CHUNK_SIZE = 100000
+
+
+class _Flow:
+    """
+    Packets arriving at some node in max-plus model, stored as arrays.
+
+    For each packet stores arrival time at the node, the node where the
+    packet was created (source) and the creation time.
+    """
+    def __init__(self, arrived: np.ndarray, sources: np.ndarray,
+                 created: np.ndarray):
+        self.arrived = arrived
+        self.sources = sources
+        self.created = created
+
+    @staticmethod
+    def empty() -> '_Flow':
+        return _Flow(np.zeros(0), np.zeros(0, dtype=int), np.zeros(0))
+
+    @staticmethod
+    def concat(first: '_Flow', second: '_Flow') -> '_Flow':
+        """
+        Concatenate two flows.
+        """
+        if len(first) == 0:
+            return second
+        if len(second) == 0:
+            return first
+        return _Flow(np.concatenate((first.arrived, second.arrived)),
+                     np.concatenate((first.sources, second.sources)),
+                     np.concatenate((first.created, second.created)))
+
+    @staticmethod
+    def merge(first: '_Flow', second: '_Flow') -> '_Flow':
+        """
+        Merge two flows sorted by arrival times into a sorted flow.
+        On equal times packets from the first flow go first.
+        """
+        if len(first) == 0:
+            return second
+        if len(second) == 0:
+            return first
+        flow = _Flow.concat(first, second)
+        order = np.argsort(flow.arrived, kind='stable')
+        return _Flow(flow.arrived[order], flow.sources[order],
+                     flow.created[order])
+
+    def split(self, n: int) -> Tuple['_Flow', '_Flow']:
+        """
+        Split flow into the first `n` packets and the rest.
+        """
+        return (_Flow(self.arrived[:n], self.sources[:n], self.created[:n]),
+                _Flow(self.arrived[n:], self.sources[n:], self.created[n:]))
+
+    def split_at(self, time: float) -> Tuple['_Flow', '_Flow']:
+        """
+        Split sorted flow into packets arrived not later than `time`
+        and the rest.
+        """
+        return self.split(np.searchsorted(self.arrived, time, side='right'))
+
+    def __len__(self):
+        return len(self.arrived)
+
+
+class _ArrivalSource:
+    """
+    Generator of packets arrival times at a node in max-plus model.
+    """
+    def __init__(self, node: int, arrival: Distribution):
+        self.node = node
+        self.rnd = arrival.rnd
+        self.rate = 1 / arrival.mean
+        self._last_time = 0.0
+        self._pending = np.zeros(0)
+
+    def generate(self, time: float) -> _Flow:
+        """
+        Get packets arrived after the previous call and not later than `time`.
+        """
+        chunks = [self._pending]
+        while self._last_time <= time:
+            size = max(16, int((time - self._last_time) * self.rate * 1.1))
+            times = self._last_time + np.cumsum(self.rnd.eval_many(size))
+            chunks.append(times)
+            self._last_time = times[-1]
+        times = np.concatenate(chunks)
+        n = np.searchsorted(times, time, side='right')
+        self._pending = times[n:]
+        return _Flow(times[:n], np.full(n, self.node), times[:n])
+
+
+class _MaxPlusNode:
+    """
+    State of a station in max-plus model.
+
+    Packets are served in FIFO order, so departure times are computed with
+    Lindley recursion. Packets departing after the current step end are kept
+    in `served` till the step when they depart, since only then their
+    departures can be recorded in system size and intervals statistics.
+    """
+    def __init__(self, service: Distribution):
+        self.rnd = service.rnd
+        self.waiting = _Flow.empty()
+        self.served = _Flow.empty()
+        self.started = np.zeros(0)
+        self.departed = np.zeros(0)
+        self.last_departure = 0.0
+        self.last_recorded_arrival = 0.0
+        self.last_recorded_departure = 0.0
+
+        self.system_size = TimeSizeRecords()
+        self.arrivals = StatisticsAccumulator()
+        self.departures = StatisticsAccumulator()
+        self.response_time = StatisticsAccumulator()
+        self.wait_time = StatisticsAccumulator()
+
+    def serve(self, flow: _Flow, time: float) -> Tuple[_Flow, _Flow]:
+        """
+        Serve all packets arrived not later than `time`.
+
+        Parameters
+        ----------
+        flow : _Flow
+            new packets arrived at the node, sorted by arrival time
+        time : float
+            step end time
+
+        Returns
+        -------
+        outgoing : _Flow
+            all served packets with departure times as arrival times
+        departed : _Flow
+            packets departed not later than `time`, also with departure
+            times as arrival times
+        """
+        flow, self.waiting = _Flow.merge(self.waiting, flow).split_at(time)
+        services = self.rnd.eval_many(len(flow))
+        departures = lindley_departures(
+            flow.arrived, services, self.last_departure)
+        if len(departures) > 0:
+            self.last_departure = departures[-1]
+
+        # Since FIFO order is kept, departed packets are the first ones:
+        self.served = _Flow.concat(self.served, flow)
+        self.started = np.concatenate((self.started, departures - services))
+        self.departed = np.concatenate((self.departed, departures))
+        n = np.searchsorted(self.departed, time, side='right')
+        departed, self.served = self.served.split(n)
+        started, self.started = self.started[:n], self.started[n:]
+        departed_at, self.departed = self.departed[:n], self.departed[n:]
+
+        # Record system size changes. On equal times arrivals go first:
+        times = np.concatenate((flow.arrived, departed_at))
+        steps = np.concatenate((np.ones(len(flow), dtype=int),
+                                -np.ones(n, dtype=int)))
+        order = np.argsort(times, kind='stable')
+        times, steps = times[order], steps[order]
+        self.system_size.add_steps(times, steps)
+
+        # Record statistics of departed packets:
+        if n > 0:
+            self.arrivals.add(np.diff(
+                departed.arrived, prepend=self.last_recorded_arrival))
+            self.departures.add(np.diff(
+                departed_at, prepend=self.last_recorded_departure))
+            self.response_time.add(departed_at - departed.arrived)
+            self.wait_time.add(started - departed.arrived)
+            self.last_recorded_arrival = departed.arrived[-1]
+            self.last_recorded_departure = departed_at[-1]
+
+        outgoing = _Flow(departures, flow.sources, flow.created)
+        return outgoing, _Flow(departed_at, departed.sources, departed.created)
+
+
+def simulate_maxplus(
+        arrivals: Sequence[Optional[Distribution]],
+        services: Sequence[Distribution],
+        max_time: float = np.inf,
+        max_packets: int = 1000000,
+        chunk_size: int = MAXPLUS_CHUNK_SIZE
+) -> Results:
+    """
+    Simulate tandem network with infinite queues using max-plus recursion.
+
+    Without cross traffic, departure of n-th packet from k-th station is
+    `D[k, n] = max(D[k-1, n], D[k, n-1]) + S[k, n]`. With cross traffic,
+    packets from the previous station and from the external source are
+    merged by their arrival times, and then the same Lindley recursion
+    is applied (see `lindley_departures()`).
+
+    Time is split into steps with about `chunk_size` new packets each.
+    At each step stations, from the first to the last, serve all packets
+    arrived till the step end. Packets arriving later (e.g., served by the
+    previous station after the step end) are postponed till the next step.
+    Statistics are accumulated without storing all packets, so memory
+    doesn't grow with the number of packets.
+
+    As in the event model, simulation ends at the arrival of the last
+    packet (or at `max_time`), and packets that didn't leave a station
+    till this time are not counted as served there.
+
+    Parameters
+    ----------
+    arrivals : sequence of RandomProcess or None
+        Arrival processes at each station, `None` if there are no
+        external arrivals at the station.
+    services : sequence of RandomProcess
+        Service time processes.
+    max_time : float, optional
+        Maximum simulation time (default: infinity).
+    max_packets : int, optional
+        Maximum number of simulated packets (default: 1'000'000)
+    chunk_size : int, optional
+        Approximate number of packets generated in one step.
+
+    Returns
+    -------
+    results : Results
+        Simulation results.
+    """
+    num_stations = len(services)
+    sources = [_ArrivalSource(node, arrival)
+               for node, arrival in enumerate(arrivals)
+               if arrival is not None]
+    if not sources:
+        raise ValueError("at least one station with arrivals expected, "
+                         "but all arrivals are None")
+    nodes = [_MaxPlusNode(service) for service in services]
+    delivery_delays = [StatisticsAccumulator() for _ in range(num_stations)]
+
+    step = chunk_size / sum(source.rate for source in sources)
+    num_packets = 0
+    time = 0.0
+    finished = False
+    while not finished:
+        time = min(time + step, max_time)
+        finished = time >= max_time
+
+        # 1) Generate new packets at all sources:
+        external = [_Flow.empty() for _ in range(num_stations)]
+        for source in sources:
+            external[source.node] = source.generate(time)
+
+        # 2) If too many packets were generated, stop at the arrival of
+        #    the last allowed packet:
+        num_new_packets = sum(len(flow) for flow in external)
+        if num_packets + num_new_packets >= max_packets:
+            all_times = np.sort(np.concatenate(
+                [flow.arrived for flow in external]))
+            time = all_times[max_packets - num_packets - 1]
+            external = [flow.split_at(time)[0] for flow in external]
+            finished = True
+        num_packets += sum(len(flow) for flow in external)
+
+        # 3) Pass packets through all stations:
+        incoming = _Flow.empty()
+        for node in range(num_stations):
+            flow = _Flow.merge(incoming, external[node])
+            incoming, departed = nodes[node].serve(flow, time)
+        delays = departed.arrived - departed.created
+        for source in range(num_stations):
+            delivery_delays[source].add(delays[departed.sources == source])
+
+    # Build results. Since queues are infinite, no packets are dropped:
+    ret = Results(num_stations=num_stations)
+    for node, state in enumerate(nodes):
+        state.system_size.add_steps(np.asarray([time]), np.zeros(1, int))
+        ret.add_size_distributions(list(state.system_size.pmf))
+        ret.drop_prob.append(0.0)
+        ret.delivery_prob.append(1.0)
+        ret.departures.append(state.departures.build())
+        ret.arrivals.append(state.arrivals.build())
+        ret.response_time.append(state.response_time.build())
+        ret.wait_time.append(state.wait_time.build())
+        ret.delivery_delays.append(delivery_delays[node].build())
+    return ret
+
+
 def _process_packet(node: int, packet: Packet, system: System, params: Params,
                     records: Records):
     """
@@ -11,6 +11,7 @@ extensions = [
             "pyqumo/cqumo/sim.pyx",
             "cqumo/Base.cpp",
             "cqumo/Functions.cpp",
+            "cqumo/Randoms.cpp",
             "cqumo/tandem/Components.cpp",
             "cqumo/tandem/Journals.cpp",
             "cqumo/tandem/Simulation.cpp",
@@ -20,8 +21,8 @@ extensions = [
         ],
         include_dirs=['cqumo', 'cqumo/tandem'],
         language="c++",
-        extra_compile_args=["-std=c++14", "-Wno-deprecated", "-O3"],
-        extra_link_args=["-std=c++14"]
+        extra_compile_args=["-std=c++14", "-Wno-deprecated", "-O3", "-pthread"],
+        extra_link_args=["-std=c++14", "-pthread"]
     ),
     Extension(
         "pyqumo.cqumo.randoms", [
@@ -1,10 +1,12 @@
 from unittest.mock import patch, Mock
 
 import numpy as np
+import scipy.sparse as sp
 from numpy.testing import assert_allclose
 import pytest
 
-from pyqumo.chains import DiscreteTimeMarkovChain, ContinuousTimeMarkovChain
+from pyqumo.chains import DiscreteTimeMarkovChain, ContinuousTimeMarkovChain, \
+    block_tridiagonal_steady_pmf
 from pyqumo.errors import CellValueError, RowSumError, MatrixShapeError
 
 
@@ -141,6 +143,44 @@ def test_dtmc__steady_pmf(chain: DiscreteTimeMarkovChain, pmf, comment):
     assert_allclose(chain.steady_pmf, pmf, rtol=0.01, err_msg=comment)
 
 
+@pytest.mark.parametrize('method', [
+    'dense', 'splu', 'gmres', 'bicgstab', 'power', 'gauss-seidel'
+])
+@pytest.mark.parametrize('chain, pmf, comment', [
+    (dtmc2(), [0.5, 0.5], 'periodic DTMC of order 2'),
+    (
+        dtmc9(), [.077, .154, .077, .115, 0.154, 0.115, 0.077, 0.154, 0.077],
+        'DTMC of order 9 with non-trivial matrix and steady-state PMF'
+    )
+])
+def test_dtmc__solve_steady_pmf(chain, pmf, comment, method):
+    """
+    Validate all steady-state PMF methods give the same result for DTMC.
+    """
+    assert_allclose(chain.solve_steady_pmf(method), pmf, rtol=0.01,
+                    err_msg=f'{comment}, method={method}')
+
+
+def test_dtmc__sparse_matrix():
+    """
+    Validate DTMC keeps sparse matrix and solves it with sparse LU.
+    """
+    dense_chain = dtmc9()
+    chain = DiscreteTimeMarkovChain(sp.csr_matrix(dense_chain.matrix))
+    assert sp.issparse(chain.matrix)
+    assert chain.order == 9
+    assert_allclose(chain.steady_pmf, dense_chain.steady_pmf, rtol=1e-8)
+    assert str(chain) == str(dense_chain)
+
+
+def test_dtmc__bad_sparse_matrix_fix_and_raise_error():
+    chain = DiscreteTimeMarkovChain(sp.csr_matrix([[.5, .5], [-.01, 1.01]]),
+                                    tol=0.1)
+    assert_allclose(chain.matrix.toarray(), [[.5, .5], [0, 1]])
+    with pytest.raises(RowSumError):
+        DiscreteTimeMarkovChain(sp.csr_matrix([[.5, .6], [0, 1]]), tol=0.05)
+
+
 # Testing DiscreteTimeMarkovChain.trace()
 # ---------------------------------------
 
@@ -373,6 +413,41 @@ def test_ctmc__steady_pmf(chain, pmf, comment):
     assert_allclose(chain.steady_pmf, pmf, rtol=0.01, err_msg=comment)
 
 
+@pytest.mark.parametrize('method', [
+    'dense', 'splu', 'gmres', 'bicgstab', 'power', 'gauss-seidel'
+])
+def test_ctmc__solve_steady_pmf(method):
+    """
+    Validate all steady-state PMF methods give the same result for CTMC.
+    """
+    chain = ctmc3()
+    assert_allclose(chain.solve_steady_pmf(method), chain.steady_pmf,
+                    rtol=1e-6, err_msg=f'method={method}')
+
+
+def test_ctmc__solve_steady_pmf_unknown_method_raise_error():
+    with pytest.raises(ValueError):
+        ctmc3().solve_steady_pmf('wrong')
+
+
+def test_ctmc__sparse_matrix():
+    """
+    Validate CTMC accepts sparse generator, fixes it and builds embedded DTMC.
+    """
+    dense_chain = ctmc3()
+    matrix = sp.csr_matrix(dense_chain.matrix)
+    matrix[0, 0] -= 1e-5  # will be fixed since tol = 1e-3 by default
+    chain = ContinuousTimeMarkovChain(matrix)
+    assert sp.issparse(chain.matrix)
+    assert_allclose(chain.matrix.toarray(), dense_chain.matrix)
+    assert_allclose(chain.rates, dense_chain.rates)
+    assert_allclose(chain.steady_pmf, dense_chain.steady_pmf, rtol=1e-8)
+    assert_allclose(chain.embedded_dtmc.matrix.toarray(),
+                    dense_chain.embedded_dtmc.matrix)
+    with pytest.raises(CellValueError):
+        ContinuousTimeMarkovChain(sp.csr_matrix([[-1, 1], [-1, 1]]))
+
+
 # Testing ContinuousTimeMarkovChain.trace()
 # -----------------------------------------
 @pytest.mark.parametrize('chain, size, init, ends, safe', [
@@ -412,3 +487,39 @@ def test_ctmc__trace_intervals_converge_to_matrix_means():
     intervals /= hits
     est_rates = 1 / intervals
     assert_allclose(est_rates, chain.rates, rtol=0.1)
+
+
+# Testing block_tridiagonal_steady_pmf()
+# --------------------------------------
+def test_block_tridiagonal_steady_pmf__matches_dense_ctmc():
+    """
+    Validate that level reduction gives the same PMF as the dense solver.
+    """
+    a0 = np.asarray([[-3., 1.], [2., -4.]])
+    a = np.asarray([[-5., 1.], [1., -6.]])
+    a_last = np.asarray([[-3., 1.], [1., -4.]])
+    up = np.asarray([[1., 1.], [0., 2.]])
+    down = np.asarray([[2., 0.], [1., 2.]])
+    num_levels = 5
+
+    diag = [a0] + [a] * (num_levels - 2) + [a_last]
+    upper = [up] * (num_levels - 1)
+    lower = [down] * (num_levels - 1)
+
+    matrix = np.zeros((2 * num_levels, 2 * num_levels))
+    for k in range(num_levels):
+        matrix[2*k:2*k+2, 2*k:2*k+2] = diag[k]
+        if k < num_levels - 1:
+            matrix[2*k:2*k+2, 2*k+2:2*k+4] = upper[k]
+            matrix[2*k+2:2*k+4, 2*k:2*k+2] = lower[k]
+    expected = ContinuousTimeMarkovChain(matrix).steady_pmf
+
+    pmf = block_tridiagonal_steady_pmf(diag, upper, lower)
+    assert len(pmf) == num_levels
+    assert_allclose(np.concatenate(pmf), expected, rtol=1e-8)
+
+
+def test_block_tridiagonal_steady_pmf__bad_blocks_number_raise_error():
+    a = np.asarray([[-1.]])
+    with pytest.raises(ValueError):
+        block_tridiagonal_steady_pmf([a, a, a], [a], [a, a])
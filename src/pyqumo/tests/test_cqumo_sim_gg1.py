@@ -95,3 +95,16 @@ def test_gg1(props):
                     rtol=tol, err_msg=f"response time mismatch ({desc})")
     assert_allclose(results.wait_time.avg, props.wait_time_avg, rtol=tol,
                     err_msg=f"waiting time mismatch ({desc})")
+
+
+def test_gg1_with_python_callables_fallback():
+    """
+    Validate that distributions without native random variables are
+    sampled using Python callbacks and give the same results.
+    """
+    arrival, service = Exponential(1), Exponential(2)
+    results = simulate_gg1n(
+        lambda: arrival(), lambda: service(), np.inf, max_packets=int(1e5))
+    assert_allclose(results.system_size.mean, 1.0, rtol=0.1)
+    assert_allclose(results.response_time.avg, 1.0, rtol=0.1)
+    assert_allclose(results.utilization, 0.5, rtol=0.1)
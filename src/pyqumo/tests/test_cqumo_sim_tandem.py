@@ -7,7 +7,7 @@ from numpy.testing import assert_allclose
 
 from pyqumo.arrivals import Poisson, MarkovArrival
 from pyqumo.random import HyperExponential, PhaseType, Distribution, Exponential
-from pyqumo.cqumo.sim import simulate_tandem
+from pyqumo.cqumo.sim import simulate_tandem, simulate_tandem_batch
 
 
 @dataclass
@@ -127,3 +127,40 @@ def test_mm1_tandem(props):
         assert_allclose(
             ret.delivery_delays[i].avg, props.delivery_delay_avg[i],
             rtol=tol, err_msg=f"average delivery delays mismatch ({desc})")
+
+
+def test_tandem_batch_is_reproducible_and_aggregated():
+    """
+    Validate that batch replications are independent of the number of
+    threads, and estimates cover the analytical values.
+    """
+    configs = [
+        {'arrival': Poisson(1), 'services': [Exponential(2)] * 2,
+         'queue_capacity': np.inf},
+        {'arrival': Poisson(1), 'services': [Exponential(4)],
+         'queue_capacity': 5, 'max_packets': 5000},
+    ]
+    results_1 = simulate_tandem_batch(
+        configs, num_replications=6, num_threads=1, base_seed=42,
+        max_packets=20000)
+    results_3 = simulate_tandem_batch(
+        configs, num_replications=6, num_threads=3, base_seed=42,
+        max_packets=20000)
+
+    assert len(results_1) == 2
+    assert results_1[0].num_replications == 6
+    assert len(results_1[0].system_size) == 2
+    assert len(results_1[1].system_size) == 1
+    for res_1, res_3 in zip(results_1, results_3):
+        for rep_1, rep_3 in zip(res_1.replications, res_3.replications):
+            assert rep_1.system_size[0].mean == rep_3.system_size[0].mean
+
+    # Replications are different:
+    sizes = [r.system_size[0].mean for r in results_1[0].replications]
+    assert len(set(sizes)) == len(sizes)
+
+    # M/M/1 with rho = 0.5 has mean system size 1:
+    estimate = results_1[0].system_size[0]
+    assert estimate.lower <= estimate.avg <= estimate.upper
+    assert_allclose(estimate.avg, 1.0, rtol=0.1)
+    assert_allclose(results_1[0].utilization[1].avg, 0.5, rtol=0.1)
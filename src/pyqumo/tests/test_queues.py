@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional, Sequence
 
+import numpy as np
 import pytest
 from numpy.testing import assert_allclose
 
@@ -202,3 +203,17 @@ def test_basic_props(
 
     # 4) Validate string representation:
     assert str(queue) == string
+
+
+def test_map_ph_1_n__levels_pmf_matches_departure_ctmc():
+    """
+    Validate that level-by-level solution of MAP/PH/1/N queue gives the same
+    probabilities as the steady-state PMF of the departure MAP CTMC.
+    """
+    arrival = MarkovArrival(
+        [[-3., 1.], [0.5, -2.]], [[1.5, 0.5], [0.5, 1.]])
+    service = PhaseType(
+        np.asarray([[-6., 2.], [1., -5.]]), np.asarray([0.3, 0.7]))
+    queue = MapPh1NQueue(arrival, service, queue_capacity=6)
+    expected = queue.departure.ctmc.steady_pmf
+    assert_allclose(queue.levels_pmf.flatten(), expected, rtol=1e-8)
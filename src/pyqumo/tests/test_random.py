@@ -1,10 +1,13 @@
+import pickle
+
 import numpy as np
 import pytest
 from numpy.testing import assert_allclose
 
 from pyqumo.random import Const, Exponential, Uniform, Normal, Erlang, \
     HyperExponential, PhaseType, Choice, SemiMarkovAbsorb, \
-    MixtureDistribution, CountableDistribution, HyperErlang
+    MixtureDistribution, CountableDistribution, HyperErlang, \
+    RandomsFactory, default_randoms_factory
 
 
 #
@@ -595,3 +598,77 @@ def test__as_ph__mixture_with_non_markovian_state_raise_runtime_error():
     ph = dist.as_ph(min_prob=0.1)
     assert_allclose(ph.s, [[-1, 0], [0, -8]])
     assert_allclose(ph.p, [0.5, 0.5])
+
+
+#
+# TESTING BATCHED SAMPLING
+# ----------------------------------------------------------------------------
+def test_variable_fill_and_eval_many():
+    """
+    Validate that Variable.fill() writes samples into the given buffer and
+    eval_many() returns an array of the requested size.
+    """
+    dist = Exponential(2.0)
+    buffer = np.full(10, -1.0)
+    dist.rnd.fill(buffer[2:8])
+    assert (buffer[:2] == -1).all() and (buffer[8:] == -1).all()
+    assert (buffer[2:8] > 0).all()
+
+    samples = dist.rnd.eval_many(50000)
+    assert samples.shape == (50000,)
+    assert_allclose(samples.mean(), 0.5, rtol=0.05)
+    assert Const(3.0).rnd.eval_many(0).shape == (0,)
+
+
+#
+# TESTING SEEDED FACTORIES
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize('dist', [
+    Exponential(2.0),
+    HyperExponential([1.0, 5.0], [0.3, 0.7]),
+    PhaseType.erlang(3, 4.0),
+    CountableDistribution(lambda k: 0.5 ** (k + 1)),
+], ids=['exp', 'hyperexp', 'ph', 'countable'])
+def test_with_factory_samples_with_seeded_engine(dist):
+    """
+    Validate that distribution copies built with factories having the same
+    seed (including nested distributions) generate the same samples, and
+    different seeds give different samples.
+    """
+    first = dist.with_factory(RandomsFactory(13))
+    second = dist.with_factory(RandomsFactory(13))
+    other = dist.with_factory(RandomsFactory(14))
+    samples = first.rnd.eval_many(100)
+    assert_allclose(second.rnd.eval_many(100), samples)
+    assert not np.allclose(other.rnd.eval_many(100), samples)
+    assert dist.factory is default_randoms_factory
+    assert_allclose(first.mean, dist.mean)
+
+
+@pytest.mark.parametrize('dist', [
+    Exponential(2.0),
+    Normal(1.0, 0.5),
+    HyperExponential([1.0, 5.0], [0.3, 0.7]),
+    PhaseType.erlang(3, 4.0),
+    CountableDistribution([0.5, 0.25, 0.25]),
+], ids=['exp', 'normal', 'hyperexp', 'ph', 'countable'])
+def test_distributions_are_picklable(dist):
+    """
+    Validate that distributions (with cached variables and functions) can
+    be pickled. Distributions with the default factory share it after
+    loading, and seeded factories continue the random sequence.
+    """
+    dist.rnd.eval_many(10)
+    if hasattr(dist, 'cdf'):
+        dist.cdf(1.0)
+    restored = pickle.loads(pickle.dumps(dist))
+    assert restored.factory is default_randoms_factory
+    assert_allclose(restored.mean, dist.mean)
+    assert restored.rnd.eval_many(10).shape == (10,)
+
+    seeded = dist.with_factory(RandomsFactory(7))
+    seeded.rnd.eval_many(10)
+    restored = pickle.loads(pickle.dumps(seeded))
+    assert restored.factory is not seeded.factory
+    if not isinstance(dist, Normal):  # normal variable caches a sample
+        assert_allclose(restored.rnd.eval_many(10), seeded.rnd.eval_many(10))
@@ -5,8 +5,8 @@ import numpy as np
 from numpy.testing import assert_allclose
 
 from pyqumo.arrivals import Poisson
-from pyqumo.random import Exponential, Distribution
-from pyqumo.sim.gg1 import simulate
+from pyqumo.random import Exponential, Distribution, Const
+from pyqumo.sim.gg1 import simulate, simulate_lindley
 
 
 @dataclass
@@ -63,9 +63,52 @@ class GG1Props:
     )
 ])
 def test_gg1(props):
-    tol = props.tol
     results = simulate(props.arrival, props.service, props.queue_capacity,
                        max_packets=props.max_packets)
+    _check_gg1_results(props, results)
+
+
+@pytest.mark.parametrize('props', [
+    GG1Props(
+        arrival=Poisson(1), service=Exponential(2),
+        queue_capacity=np.inf,
+        system_size_avg=1, system_size_std=2.0**0.5,
+        queue_size_avg=0.5, queue_size_std=1.25**0.5,
+        loss_prob=0, utilization=0.5, departure_rate=1.0,
+        response_time_avg=1.0, wait_time_avg=0.5, max_packets=int(1e5)
+    )
+])
+def test_gg1_lindley(props):
+    results = simulate(props.arrival, props.service, props.queue_capacity,
+                       max_packets=props.max_packets, method='lindley')
+    _check_gg1_results(props, results)
+
+
+def test_gg1_lindley_matches_events_for_deterministic_system():
+    """
+    Validate Lindley recursion gives exactly the same results as the event
+    model, including packets that are still in the system at the end.
+    Small chunks are used to check that chunks are properly joined.
+    """
+    expected = simulate(Const(1), Const(1.5), max_time=10.5)
+    results = simulate_lindley(Const(1), Const(1.5), max_time=10.5,
+                               chunk_size=3)
+    assert_allclose(
+        [results.system_size.pmf(x) for x in range(5)],
+        [expected.system_size.pmf(x) for x in range(5)])
+    assert_allclose(results.utilization, expected.utilization)
+    for field in ('departures', 'response_time', 'wait_time'):
+        assert_allclose(getattr(results, field), getattr(expected, field),
+                        err_msg=field)
+
+
+def test_gg1_lindley_with_finite_queue_raise_error():
+    with pytest.raises(ValueError):
+        simulate(Poisson(1), Poisson(2), queue_capacity=5, method='lindley')
+
+
+def _check_gg1_results(props, results):
+    tol = props.tol
     desc = f"arrival: {props.arrival}, " \
            f"service: {props.service}, " \
            f"queue capacity: {props.queue_capacity}"
@@ -1,7 +1,8 @@
 import pytest
 import numpy as np
 
-from pyqumo.sim.helpers import FiniteFifoQueue, Queue, InfiniteFifoQueue, Server
+from pyqumo.sim.helpers import FiniteFifoQueue, Queue, InfiniteFifoQueue, Server, \
+    build_estimate
 
 
 # ###########################################################################
@@ -142,3 +143,18 @@ def test_server():
     assert server.ready
     assert not server.busy
     assert server.size == 0
+
+
+def test_build_estimate():
+    est = build_estimate([1.0, 2.0, 3.0, 4.0], confidence=0.95)
+    assert est.count == 4
+    assert est.avg == pytest.approx(2.5)
+    assert est.std == pytest.approx(np.std([1, 2, 3, 4], ddof=1))
+    # t(0.975, 3) = 3.182446
+    delta = 3.182446 * est.std / 2
+    assert est.lower == pytest.approx(2.5 - delta, rel=1e-5)
+    assert est.upper == pytest.approx(2.5 + delta, rel=1e-5)
+
+    # Single sample and empty samples degenerate to zero-width intervals:
+    assert build_estimate([5.0]) == (5.0, 0.0, 1, 5.0, 5.0)
+    assert build_estimate([]) == (0.0, 0.0, 0, 0.0, 0.0)
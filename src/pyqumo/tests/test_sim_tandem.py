@@ -6,8 +6,9 @@ import numpy as np
 from numpy.testing import assert_allclose
 
 from pyqumo.arrivals import Poisson, MarkovArrival
-from pyqumo.random import HyperExponential, PhaseType, Distribution, Exponential
-from pyqumo.sim.tandem import simulate
+from pyqumo.random import HyperExponential, PhaseType, Distribution, \
+    Exponential, Const
+from pyqumo.sim.tandem import simulate, simulate_maxplus
 
 
 @dataclass
@@ -113,11 +114,14 @@ class TandemProps:
         max_packets=int(3e4), tol=.2
     ),
 ])
-def test_mm1_tandem(props):
+@pytest.mark.parametrize('method', ['events', 'maxplus'])
+def test_mm1_tandem(props, method):
+    if method == 'maxplus' and props.queue_capacity < np.inf:
+        pytest.skip('max-plus model requires infinite queues')
     tol = props.tol
     ret = simulate(props.arrival, props.service, props.queue_capacity,
                    num_stations=props.num_stations,
-                   max_packets=props.max_packets)
+                   max_packets=props.max_packets, method=method)
 
     # Check system and queue sizes:
     for i in range(props.num_stations):
@@ -173,3 +177,47 @@ def test_mm1_tandem(props):
         assert_allclose(
             ret.delivery_delays[i].avg, props.delivery_delay_avg[i],
             rtol=tol, err_msg=f"average delivery delays mismatch ({desc})")
+
+
+@pytest.mark.parametrize('arrivals, services, comment', [
+    ([Const(1), None], [Const(0.5), Const(0.5)], 'no cross traffic'),
+    ([Const(1), Const(2)], [Const(0.5), Const(0.3)], 'cross traffic'),
+])
+def test_maxplus_matches_events_for_deterministic_tandem(
+        arrivals, services, comment):
+    """
+    Validate max-plus model gives exactly the same results as the event
+    model. Small chunks are used to check that steps are properly joined.
+    """
+    expected = simulate(arrivals, services, num_stations=2, max_time=10)
+    ret = simulate_maxplus(arrivals, services, max_time=10, chunk_size=3)
+    for i in range(2):
+        desc = f"station {i}, {comment}"
+        assert_allclose(
+            [ret.system_size[i].pmf(x) for x in range(5)],
+            [expected.system_size[i].pmf(x) for x in range(5)],
+            err_msg=f"system size PMF mismatch ({desc})")
+        for field in ('response_time', 'wait_time', 'delivery_delays'):
+            assert_allclose(
+                getattr(ret, field)[i], getattr(expected, field)[i],
+                atol=1e-9, err_msg=f"{field} mismatch ({desc})")
+        # Event model builds intervals in packets creation order, that
+        # differs from the departure order with cross traffic, so only
+        # average intervals match:
+        for field in ('departures', 'arrivals'):
+            assert_allclose(
+                getattr(ret, field)[i].avg, getattr(expected, field)[i].avg,
+                err_msg=f"{field} mismatch ({desc})")
+            assert getattr(ret, field)[i].count == \
+                getattr(expected, field)[i].count
+
+
+def test_maxplus_with_finite_queue_raise_error():
+    with pytest.raises(ValueError):
+        simulate(Poisson(1), Poisson(2), queue_capacity=5, num_stations=2,
+                 method='maxplus')
+
+
+def test_maxplus_without_arrivals_raise_error():
+    with pytest.raises(ValueError):
+        simulate_maxplus([None, None], [Const(0.5), Const(0.5)], max_time=10)